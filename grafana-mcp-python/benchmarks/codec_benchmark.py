@@ -0,0 +1,98 @@
+"""
+JSON 코덱 벤치마크
+
+도구 호출 응답 하나를 만드는 비용을 기존 방식(결과를 `json.dumps`로 문자열화한 뒤 다시
+JSON-RPC 응답으로 감싸 `json.dumps`)과 코덱 방식(구조화된 결과를 응답에 넣어 한 번만
+인코딩)으로 비교합니다. 설치된 코덱 백엔드마다 측정합니다.
+
+실행:
+    python benchmarks/codec_benchmark.py [--panels 200] [--image-kb 2048] [--repeat 20]
+"""
+import os
+import sys
+import copy
+import json
+import time
+import base64
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from grafana_mcp import codec
+
+DASHBOARD_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "test_infra", "grafana", "provisioning",
+    "dashboards", "json", "spring-boot.json"
+)
+
+def build_dashboard(panels: int) -> dict:
+    """프로비저닝된 대시보드의 패널을 복제해 큰 대시보드를 만듭니다."""
+    with open(DASHBOARD_PATH, encoding="utf-8") as f:
+        dashboard = json.load(f)
+    source = dashboard["panels"]
+    dashboard["panels"] = []
+    for index in range(panels):
+        panel = copy.deepcopy(source[index % len(source)])
+        panel["id"] = index + 1
+        panel["title"] = f"{panel.get('title', '')} #{index + 1}"
+        dashboard["panels"].append(panel)
+    return {"dashboard": dashboard, "meta": {"uid": dashboard.get("uid"), "version": 1}}
+
+def build_screenshot(image_kb: int) -> dict:
+    """Base64 이미지를 담은 스크린샷 도구 결과를 만듭니다."""
+    raw = os.urandom(image_kb * 1024)
+    return {
+        "image_data": base64.b64encode(raw).decode("ascii"),
+        "image_type": "image/png",
+        "dashboard_uid": "bench",
+        "width": 1000,
+        "height": 500
+    }
+
+def legacy_encode(result) -> bytes:
+    """기존 방식: 결과를 문자열로 직렬화한 뒤 응답으로 한 번 더 직렬화"""
+    content = json.dumps(result)
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "result": {"content": content}}).encode("utf-8")
+
+def codec_encode(result) -> bytes:
+    """코덱 방식: 구조화된 결과를 응답에 넣어 한 번만 인코딩"""
+    return codec.dumps({"jsonrpc": "2.0", "id": 1, "result": {"content": result}})
+
+def measure(fn, value, repeat: int) -> float:
+    """한 번 호출의 평균 시간 (밀리초)"""
+    fn(value)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(value)
+    return (time.perf_counter() - started) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--panels", type=int, default=200, help="대시보드 패널 수")
+    parser.add_argument("--image-kb", type=int, default=2048, help="스크린샷 원본 크기 (KiB)")
+    parser.add_argument("--repeat", type=int, default=20, help="반복 횟수")
+    args = parser.parse_args()
+
+    payloads = {
+        f"dashboard ({args.panels} panels)": build_dashboard(args.panels),
+        f"screenshot ({args.image_kb} KiB)": build_screenshot(args.image_kb),
+    }
+
+    print(f"{'payload':<28} {'path':<22} {'encode ms':>10} {'decode ms':>10} {'bytes':>10} {'speedup':>8}")
+    for label, payload in payloads.items():
+        baseline = measure(legacy_encode, payload, args.repeat)
+        encoded = legacy_encode(payload)
+        decode = measure(lambda data: json.loads(json.loads(data)["result"]["content"]), encoded, args.repeat)
+        print(f"{label:<28} {'legacy json (x2)':<22} {baseline:>10.2f} {decode:>10.2f} {len(encoded):>10} {'1.0x':>8}")
+
+        for name in codec.available_backends():
+            codec.use_backend(name)
+            elapsed = measure(codec_encode, payload, args.repeat)
+            encoded = codec_encode(payload)
+            decode = measure(codec.loads, encoded, args.repeat)
+            print(f"{label:<28} {name + ' (x1)':<22} {elapsed:>10.2f} {decode:>10.2f} {len(encoded):>10} "
+                  f"{baseline / elapsed:>7.1f}x")
+    codec.use_backend()
+
+if __name__ == "__main__":
+    main()
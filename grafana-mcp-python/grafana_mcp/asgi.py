@@ -0,0 +1,72 @@
+"""
+HTTP 전송용 ASGI 앱 구성
+
+`grafana-mcp serve --transport sse --workers N`은 uvicorn이 워커 프로세스마다 `create_app`을
+호출해 앱을 만듭니다. 서버 설정은 부모 프로세스가 환경 변수 `GRAFANA_MCP_SERVE_CONFIG`에
+JSON으로 넣어 전달하고, 캐시와 검색 색인은 `shared_state_dir`를 통해 워커끼리 공유합니다.
+"""
+import os
+import logging
+from typing import Any, Dict, Optional
+
+from . import codec
+from . import metrics
+from . import tracing
+from .context import grafana_context
+from .server import GrafanaMCPServer
+
+logger = logging.getLogger("mcp-asgi")
+
+SERVE_CONFIG_ENV = "GRAFANA_MCP_SERVE_CONFIG"
+
+def setup_http(server: GrafanaMCPServer, public_url: str, resource_secret: Optional[bytes] = None):
+    """
+    HTTP 전송에 필요한 리소스 URL 저장소와 시작/종료 처리기를 연결합니다.
+
+    Args:
+        server: MCP 서버
+        public_url: 리소스 URL에 사용할 외부 주소
+        resource_secret: 리소스 토큰 서명 키 (워커끼리 같아야 함)
+    """
+    server.resource_store = grafana_context.enable_resources(public_url, secret=resource_secret)
+    # add_event_handler는 최신 FastAPI에서 제거되었으므로 라우터 목록에 직접 추가합니다
+    server.app.router.on_startup.append(grafana_context.start_background)
+    server.app.router.on_shutdown.append(grafana_context.aclose)
+    server.app.router.on_shutdown.append(tracing.shutdown)
+
+def create_app():
+    """워커 프로세스에서 설정을 읽어 FastAPI 앱을 만듭니다 (uvicorn 팩토리)."""
+    config: Dict[str, Any] = codec.loads(os.environ[SERVE_CONFIG_ENV])
+    codec.use_backend(config.get("json_codec"))
+    metrics.set_enabled(config.get("metrics", True))
+    tracing.configure(**config.get("tracing", {}))
+
+    grafana_context.initialize(**config["context"])
+    if not grafana_context.is_initialized:
+        raise RuntimeError("Grafana client could not be initialized")
+
+    from .cli import build_server
+    server = build_server(
+        "sse", config["max_concurrency"], config["disabled_tools"], announce=False,
+        batch_concurrency=config["batch_concurrency"],
+        max_batch_size=config["max_batch_size"],
+        tenant_routing=config.get("tenant_routing", False)
+    )
+    setup_http(server, config["public_url"], bytes.fromhex(config["resource_secret"]))
+    logger.info(f"Worker {os.getpid()} ready")
+    return server.app
+
+def run_workers(config: Dict[str, Any], host: str, port: int, workers: int):
+    """
+    여러 uvicorn 워커 프로세스로 HTTP 전송을 실행합니다.
+
+    Args:
+        config: `create_app`이 읽을 서버 설정
+        host: 바인드할 호스트
+        port: 바인드할 포트
+        workers: 워커 프로세스 수
+    """
+    import uvicorn
+    os.environ[SERVE_CONFIG_ENV] = codec.dumps(config).decode("utf-8")
+    logger.info(f"Starting MCP server with SSE transport on {host}:{port} ({workers} workers)")
+    uvicorn.run(f"{__name__}:create_app", factory=True, host=host, port=port, workers=workers)
@@ -0,0 +1,424 @@
+"""
+대시보드 일괄 내보내기/가져오기
+
+마이그레이션과 백업을 위해 수천 개의 대시보드를 한 줄에 하나씩 NDJSON으로 옮깁니다 (파일 이름이
+`.gz`로 끝나면 gzip 압축). 두 방향 모두 스트리밍으로 처리하므로 메모리에는 동시에 처리 중인
+대시보드와 검색 결과 한 페이지 정도만 남고, 아카이브 크기와 관계없이 사용량이 일정합니다.
+
+- 내보내기: 검색 결과를 페이지 단위로 받고, 페이지마다 대시보드를 동시에 가져와 끝나는 대로
+  아카이브에 씁니다. 페이지를 다 쓸 때마다 체크포인트(다음 페이지, 파일 위치)를 남깁니다.
+- 가져오기: 아카이브를 한 줄씩 읽어 대시보드를 동시에 저장합니다. 앞에서부터 끝난 줄 수를
+  체크포인트로 남기고, 이미 있는 대시보드는 건너뛰거나(`skip`) 덮어씁니다(`overwrite`).
+
+중단된 작업은 같은 체크포인트로 다시 실행하면 이어서 진행합니다.
+"""
+import os
+import gzip
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from . import codec
+from .client import GrafanaClient, SEARCH_PAGE_SIZE
+
+logger = logging.getLogger("grafana-bulk")
+
+DEFAULT_BULK_CONCURRENCY = 8
+# 체크포인트를 저장하는 최소 간격 (초)
+CHECKPOINT_INTERVAL = 2.0
+# 보고서에 남길 최대 실패 항목 수 (나머지는 개수만 셈)
+MAX_REPORTED_FAILURES = 100
+
+CONFLICT_POLICIES = ("skip", "overwrite")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+class BulkReport:
+    """일괄 작업 결과와 처리량"""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+        self.resumed_from: Optional[int] = None
+        self.failures: List[Dict[str, Any]] = []
+        self.started = time.monotonic()
+        self.seconds = 0.0
+        # 이어서 실행할 때 이전 실행에서 처리한 양 (처리량은 이번 실행분만으로 계산)
+        self._base_processed = 0
+        self._base_bytes = 0
+
+    def restore(self, state: Dict[str, Any], position: int):
+        """체크포인트의 누적 값을 이어받습니다."""
+        self.processed = int(state.get("processed", 0))
+        self.skipped = int(state.get("skipped", 0))
+        self.failed = int(state.get("failed", 0))
+        self.bytes = int(state.get("bytes", 0))
+        self._base_processed, self._base_bytes = self.processed, self.bytes
+        self.resumed_from = position
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """체크포인트에 함께 저장할 누적 값"""
+        return {"processed": self.processed, "skipped": self.skipped, "failed": self.failed, "bytes": self.bytes}
+
+    def fail(self, uid: Optional[str], error: BaseException):
+        self.failed += 1
+        if len(self.failures) < MAX_REPORTED_FAILURES:
+            self.failures.append({"uid": uid, "error": str(error) or type(error).__name__})
+
+    def finish(self):
+        self.seconds = time.monotonic() - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        seconds = self.seconds or (time.monotonic() - self.started)
+        processed = self.processed - self._base_processed
+        size = self.bytes - self._base_bytes
+        return {
+            "operation": self.operation,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "seconds": round(seconds, 3),
+            "dashboards_per_second": round(processed / seconds, 2) if seconds > 0 else 0.0,
+            "megabytes_per_second": round(size / seconds / 1e6, 3) if seconds > 0 else 0.0,
+            "resumed_from": self.resumed_from,
+            "failures": self.failures
+        }
+
+class Checkpoint:
+    """작업 위치를 담은 JSON 파일 (임시 파일에 쓴 뒤 바꿔치기)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._saved_at = 0.0
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, "rb") as f:
+                data = codec.loads(f.read())
+        except FileNotFoundError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def save(self, state: Dict[str, Any], force: bool = True) -> bool:
+        """
+        상태를 저장합니다.
+
+        Args:
+            state: 저장할 상태
+            force: 거짓이면 마지막 저장 뒤 `CHECKPOINT_INTERVAL`이 지났을 때만 저장
+
+        Returns:
+            저장했는지 여부
+        """
+        now = time.monotonic()
+        if not force and now - self._saved_at < CHECKPOINT_INTERVAL:
+            return False
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(codec.dumps(state))
+        os.replace(tmp_path, self.path)
+        self._saved_at = now
+        return True
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def default_checkpoint_path(archive_path: str) -> str:
+    """아카이브 옆에 두는 기본 체크포인트 경로"""
+    return f"{archive_path}.checkpoint"
+
+def _record(data: Dict[str, Any]) -> Dict[str, Any]:
+    """`/api/dashboards/uid/:uid` 응답을 아카이브 한 줄로 만듭니다."""
+    dashboard = data.get("dashboard", {})
+    meta = data.get("meta", {})
+    return {
+        "uid": dashboard.get("uid"),
+        "title": dashboard.get("title", ""),
+        "version": meta.get("version", dashboard.get("version")),
+        "folder_uid": meta.get("folderUid") or None,
+        "folder_title": meta.get("folderTitle", ""),
+        "dashboard": dashboard
+    }
+
+class _ArchiveWriter:
+    """
+    아카이브 파일에 줄을 덧붙입니다.
+
+    gzip이면 체크포인트마다 멤버를 닫고 새로 시작합니다. 여러 멤버로 된 gzip 파일은 하나로 읽히고,
+    체크포인트의 파일 위치가 항상 멤버 경계라서 이어서 쓸 때 그 위치에서 자르면 됩니다.
+    """
+
+    def __init__(self, path: str, offset: int):
+        self.compress = path.endswith(".gz")
+        self.raw = open(path, "r+b" if offset else "wb")
+        self.raw.truncate(offset)
+        self.raw.seek(offset)
+        self._member = None
+
+    def write(self, line: bytes):
+        if self.compress:
+            if self._member is None:
+                self._member = gzip.GzipFile(fileobj=self.raw, mode="wb")
+            self._member.write(line)
+        else:
+            self.raw.write(line)
+
+    def sync(self) -> int:
+        """지금까지 쓴 내용을 파일에 내보내고 이어서 쓸 수 있는 위치를 반환합니다."""
+        if self._member is not None:
+            self._member.close()
+            self._member = None
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        return self.raw.tell()
+
+    def close(self):
+        self.sync()
+        self.raw.close()
+
+async def export_dashboards(client: GrafanaClient, path: str, query: Optional[str] = None,
+                            tags: Optional[List[str]] = None, folder_ids: Optional[List[int]] = None,
+                            concurrency: int = DEFAULT_BULK_CONCURRENCY,
+                            checkpoint_path: Optional[str] = None, resume: bool = False,
+                            page_size: int = SEARCH_PAGE_SIZE,
+                            progress: Optional[Callable[[BulkReport], None]] = None) -> BulkReport:
+    """
+    검색 조건에 맞는 대시보드를 아카이브로 내보냅니다.
+
+    Args:
+        client: Grafana 클라이언트
+        path: 아카이브 경로 (`.gz`로 끝나면 gzip 압축)
+        query: 검색 쿼리
+        tags: 태그 필터
+        folder_ids: 폴더 ID 필터
+        concurrency: 동시에 가져올 최대 대시보드 수
+        checkpoint_path: 체크포인트 경로 (기본값: `<path>.checkpoint`)
+        resume: 체크포인트가 있으면 이어서 내보낼지 여부 (거짓이면 처음부터)
+        page_size: 검색 페이지 크기
+        progress: 페이지를 마칠 때마다 호출할 함수
+
+    Returns:
+        작업 결과
+    """
+    report = BulkReport("export")
+    checkpoint = Checkpoint(checkpoint_path or default_checkpoint_path(path))
+    fingerprint = [query, tags, folder_ids, page_size]
+
+    page, offset = 1, 0
+    state = checkpoint.load() if resume else None
+    if state is not None:
+        if state.get("conditions") != fingerprint:
+            raise ValueError("Checkpoint does not match the export conditions")
+        page, offset = int(state["page"]), int(state["offset"])
+        report.restore(state, page)
+        logger.info(f"Resuming export at search page {page} ({report.processed} dashboards already exported)")
+
+    writer = _ArchiveWriter(path, offset)
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(hit: Dict[str, Any]):
+        async with slots:
+            try:
+                # 일괄 작업이 응답 캐시를 밀어내지 않도록 직접 요청합니다
+                data = await client.request("GET", f"/api/dashboards/uid/{hit['uid']}")
+            except Exception as e:
+                report.fail(hit["uid"], e)
+                logger.warning(f"Failed to export dashboard {hit['uid']}: {e}")
+                return
+        line = codec.dumps(_record(data)) + b"\n"
+        writer.write(line)
+        report.processed += 1
+        report.bytes += len(line)
+
+    try:
+        async for hits in client.iter_search_pages(query, tags, folder_ids, page_size=page_size,
+                                                   start_page=page, use_cache=False):
+            await asyncio.gather(*(fetch(hit) for hit in hits if hit.get("uid")))
+            page += 1
+            checkpoint.save({
+                "conditions": fingerprint,
+                "page": page,
+                "offset": writer.sync(),
+                **report.checkpoint_state()
+            })
+            if progress is not None:
+                progress(report)
+    finally:
+        writer.close()
+
+    checkpoint.remove()
+    report.finish()
+    return report
+
+def _open_archive(path: str):
+    """아카이브를 엽니다 (gzip 여부는 내용으로 판단)."""
+    with open(path, "rb") as f:
+        compressed = f.read(2) == _GZIP_MAGIC
+    return gzip.open(path, "rb") if compressed else open(path, "rb")
+
+def _is_conflict(error: httpx.HTTPStatusError) -> bool:
+    """같은 UID나 제목의 대시보드가 이미 있어 저장이 거절되었는지 여부"""
+    return error.response.status_code == 412
+
+class _FolderResolver:
+    """가져올 대시보드의 폴더가 대상 Grafana에 없으면 같은 UID와 제목으로 만듭니다."""
+
+    def __init__(self, client: GrafanaClient):
+        self.client = client
+        self._folders: Dict[str, asyncio.Future] = {}
+        self.created = 0
+
+    async def ensure(self, uid: str, title: str):
+        future = self._folders.get(uid)
+        if future is None:
+            future = self._folders[uid] = asyncio.ensure_future(self._ensure(uid, title))
+        await asyncio.shield(future)
+
+    async def _ensure(self, uid: str, title: str):
+        try:
+            await self.client.request("GET", f"/api/folders/{uid}", expected_statuses=(404,))
+            return
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+        try:
+            await self.client.request("POST", "/api/folders", json_data={"uid": uid, "title": title or uid},
+                                      expected_statuses=(409, 412))
+            self.created += 1
+            logger.info(f"Created folder {title or uid} ({uid})")
+        except httpx.HTTPStatusError as e:
+            # 다른 가져오기 작업이 먼저 만든 경우
+            if e.response.status_code not in (409, 412):
+                raise
+
+async def import_dashboards(client: GrafanaClient, path: str,
+                            concurrency: int = DEFAULT_BULK_CONCURRENCY,
+                            on_conflict: str = "skip", message: str = "Imported via MCP",
+                            create_folders: bool = True,
+                            checkpoint_path: Optional[str] = None, resume: bool = False,
+                            progress: Optional[Callable[[BulkReport], None]] = None) -> BulkReport:
+    """
+    아카이브의 대시보드를 Grafana에 저장합니다.
+
+    Args:
+        client: Grafana 클라이언트
+        path: `export_dashboards`가 만든 아카이브 경로
+        concurrency: 동시에 저장할 최대 대시보드 수
+        on_conflict: 같은 UID/제목의 대시보드가 있을 때 처리 (skip: 건너뜀, overwrite: 덮어씀)
+        message: 대시보드 버전 기록에 남길 메시지
+        create_folders: 대상 Grafana에 없는 폴더를 만들지 여부 (거짓이면 General 폴더에 저장)
+        checkpoint_path: 체크포인트 경로 (기본값: `<path>.checkpoint`)
+        resume: 체크포인트가 있으면 이어서 가져올지 여부 (거짓이면 처음부터)
+        progress: 체크포인트를 저장할 때마다 호출할 함수
+
+    Returns:
+        작업 결과 (건너뛴 대시보드는 skipped에 셈)
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy: {on_conflict} (expected one of {', '.join(CONFLICT_POLICIES)})")
+
+    report = BulkReport("import")
+    checkpoint = Checkpoint(checkpoint_path or default_checkpoint_path(path))
+    folders = _FolderResolver(client) if create_folders else None
+
+    # 이 줄 번호 앞의 줄은 모두 처리됨 (뒤쪽에서 먼저 끝난 줄은 done에 모아 둠)
+    watermark = 0
+    state = checkpoint.load() if resume else None
+    if state is not None:
+        watermark = int(state["line"])
+        report.restore(state, watermark)
+        logger.info(f"Resuming import at line {watermark} ({report.processed} dashboards already imported)")
+    # 워터마크 뒤에서 먼저 끝난 줄 → (늘린 카운터 이름, 바이트 수)
+    done: Dict[int, Tuple[Optional[str], int]] = {}
+
+    def save_checkpoint(force: bool) -> bool:
+        # 체크포인트에는 워터마크 앞의 줄만 남으므로, done의 줄은 이어서 실행할 때 다시 처리합니다.
+        # 두 번 세지 않도록 누적 값도 워터마크 시점으로 되돌려 저장합니다.
+        state = report.checkpoint_state()
+        for counter, size in done.values():
+            if counter is not None:
+                state[counter] -= 1
+            state["bytes"] -= size
+        return checkpoint.save({"line": watermark, **state}, force=force)
+
+    def finished(number: int, counter: Optional[str] = None, size: int = 0):
+        nonlocal watermark
+        done[number] = (counter, size)
+        while watermark in done:
+            del done[watermark]
+            watermark += 1
+
+    async def save(number: int, line: bytes):
+        uid = None
+        counter = "failed"
+        try:
+            record = codec.loads(line)
+            dashboard = dict(record["dashboard"])
+            uid = dashboard.get("uid")
+            # 대시보드 ID는 인스턴스마다 다르므로 UID로만 찾게 합니다
+            dashboard["id"] = None
+            folder_uid = record.get("folder_uid") if folders is not None else None
+            if folder_uid:
+                await folders.ensure(folder_uid, record.get("folder_title", ""))
+            await client.update_dashboard(
+                dashboard, message=message, folder_uid=folder_uid, overwrite=on_conflict == "overwrite",
+                # 건너뛸 충돌은 예상한 응답이므로 오류로 기록하지 않습니다
+                expected_statuses=(412,) if on_conflict == "skip" else ()
+            )
+            report.processed += 1
+            counter = "processed"
+        except httpx.HTTPStatusError as e:
+            if _is_conflict(e) and on_conflict == "skip":
+                report.skipped += 1
+                counter = "skipped"
+            else:
+                report.fail(uid, e)
+                logger.warning(f"Failed to import dashboard {uid}: {e}")
+        except Exception as e:
+            report.fail(uid, e)
+            logger.warning(f"Failed to import dashboard {uid} (line {number + 1}): {e}")
+        finally:
+            slots.release()
+        # 취소된 줄은 처리되지 않은 것으로 남겨 이어서 가져올 때 다시 저장합니다
+        report.bytes += len(line)
+        finished(number, counter, len(line))
+
+    slots = asyncio.Semaphore(max(1, concurrency))
+    tasks: Set[asyncio.Task] = set()
+    try:
+        with _open_archive(path) as archive:
+            for number, line in enumerate(archive):
+                if number < watermark:
+                    continue
+                if not line.strip():
+                    finished(number)
+                    continue
+                # 자리가 날 때까지 다음 줄을 읽지 않으므로 메모리에는 최대 concurrency개의 줄만 남습니다
+                await slots.acquire()
+                task = asyncio.ensure_future(save(number, line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                if save_checkpoint(force=False) and progress is not None:
+                    progress(report)
+            if tasks:
+                await asyncio.gather(*tasks)
+    finally:
+        if tasks:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        save_checkpoint(force=True)
+
+    checkpoint.remove()
+    report.finish()
+    return report
@@ -0,0 +1,280 @@
+"""
+Grafana 응답 캐시 (TTL + LRU)
+"""
+import math
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Hashable, Tuple
+from . import codec
+
+logger = logging.getLogger("grafana-cache")
+
+# 엔드포인트별 기본 TTL (초)
+DEFAULT_TTLS: Dict[str, float] = {
+    "search": 30.0,
+    "dashboard": 300.0,
+    # 저장된 대시보드 버전은 바뀌지 않으므로 오래 둡니다
+    "dashboard_version": 3600.0,
+    "datasource": 600.0,
+}
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def parse_ttl_overrides(values) -> Dict[str, float]:
+    """
+    `endpoint=seconds` 형식의 문자열 목록을 TTL 딕셔너리로 변환합니다.
+
+    Args:
+        values: 예) ["dashboard=120", "search=10"]
+
+    Returns:
+        엔드포인트별 TTL
+    """
+    ttls: Dict[str, float] = {}
+    for value in values or []:
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            endpoint, sep, seconds = item.partition("=")
+            if not sep:
+                raise ValueError(f"Invalid cache TTL '{item}' (expected endpoint=seconds)")
+            ttls[endpoint.strip()] = float(seconds)
+    return ttls
+
+class CacheEntry:
+    """캐시 항목"""
+    __slots__ = ("endpoint", "value", "size", "version", "expires_at", "validated_at")
+
+    def __init__(self, endpoint: str, value: Any, size: int, version: Optional[int],
+                 expires_at: float, validated_at: float):
+        self.endpoint = endpoint
+        self.value = value
+        self.size = size
+        self.version = version
+        self.expires_at = expires_at
+        self.validated_at = validated_at
+
+class ResponseCache:
+    """
+    엔드포인트별 TTL과 항목 수/바이트 상한을 가진 LRU 캐시
+
+    값은 파싱된 JSON 객체를 그대로 보관하므로 호출자는 반환된 값을 수정하면 안 됩니다.
+    모든 연산은 이벤트 루프 안에서 동기적으로 실행되므로 별도 잠금이 필요 없습니다.
+
+    `shared`가 있으면 메모리에 없는 항목을 공유 캐시(다른 워커 프로세스가 저장한 값)에서
+    찾고, 저장/재검증/무효화도 공유 캐시에 함께 반영합니다.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttls: Optional[Dict[str, float]] = None, shared=None):
+        """
+        캐시 초기화
+
+        Args:
+            max_entries: 최대 항목 수
+            max_bytes: 응답 본문 크기 기준 최대 바이트 수
+            ttls: 엔드포인트별 TTL (기본값을 덮어씀, 0이면 해당 엔드포인트는 캐시하지 않음)
+            shared: 워커 프로세스 사이에서 공유하는 2단계 캐시 (`SharedCache`)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.shared = shared
+
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.revalidations = 0
+        self.revalidation_misses = 0
+
+    def ttl_for(self, endpoint: str) -> float:
+        """엔드포인트의 TTL을 반환합니다."""
+        return self.ttls.get(endpoint, 0.0)
+
+    def enabled_for(self, endpoint: str) -> bool:
+        """엔드포인트 캐시 사용 여부"""
+        return self.ttl_for(endpoint) > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        만료되지 않은 캐시 항목을 가져옵니다.
+
+        Args:
+            key: 캐시 키 (첫 번째 원소는 엔드포인트 이름)
+
+        Returns:
+            캐시 항목 또는 None
+        """
+        endpoint = key[0]
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            entry = self._get_shared(key)
+            if entry is None:
+                self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+            return entry
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def _get_shared(self, key: Hashable) -> Optional[CacheEntry]:
+        """공유 캐시에서 항목을 찾아 메모리 캐시로 가져옵니다."""
+        if self.shared is None:
+            return None
+        found = self.shared.get(repr(key), key[0])
+        if found is None:
+            return None
+        data, version, expires_at = found
+        try:
+            value = codec.loads(data)
+        except codec.decode_errors():
+            self.shared.delete(repr(key))
+            return None
+
+        # 공유 캐시의 벽시계 만료 시각을 이 프로세스의 monotonic 시각으로 옮기고,
+        # 다른 워커가 언제 확인한 값인지 모르므로 재검증 시각은 비워 둡니다
+        now = time.monotonic()
+        entry = CacheEntry(key[0], value, len(data), version, now + (expires_at - time.time()), -math.inf)
+        self._insert(key, entry)
+        return entry
+
+    def record_hit(self, key: Hashable):
+        """캐시 적중을 기록합니다 (재검증이 끝난 뒤에 호출)."""
+        endpoint = key[0]
+        self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+
+    def record_miss(self, key: Hashable):
+        """캐시 실패를 기록합니다 (재검증 결과 값이 바뀐 경우)."""
+        endpoint = key[0]
+        self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+
+    def set(self, key: Hashable, value: Any, size: int, version: Optional[int] = None):
+        """
+        값을 캐시에 저장합니다.
+
+        Args:
+            key: 캐시 키 (첫 번째 원소는 엔드포인트 이름)
+            value: 파싱된 응답 값
+            size: 응답 본문 크기 (바이트)
+            version: 재검증에 사용할 버전 (대시보드의 meta.version)
+        """
+        endpoint = key[0]
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        now = time.monotonic()
+        self._insert(key, CacheEntry(endpoint, value, size, version, now + ttl, now))
+        if self.shared is not None:
+            try:
+                data = codec.dumps(value)
+            except (TypeError, ValueError):
+                return
+            self.shared.set(repr(key), endpoint, data, version, time.time() + ttl)
+
+    def _insert(self, key: Hashable, entry: CacheEntry):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def touch(self, key: Hashable):
+        """재검증에 성공한 항목의 TTL을 갱신합니다."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            now = time.monotonic()
+            entry.validated_at = now
+            entry.expires_at = now + self.ttl_for(entry.endpoint)
+            if self.shared is not None:
+                self.shared.touch(repr(key), time.time() + self.ttl_for(entry.endpoint))
+
+    def invalidate(self, key: Hashable) -> bool:
+        """항목 하나를 무효화합니다."""
+        if self.shared is not None:
+            self.shared.delete(repr(key))
+        if key in self._entries:
+            self._remove(key)
+            self.invalidations += 1
+            return True
+        return False
+
+    def invalidate_endpoint(self, endpoint: str) -> int:
+        """엔드포인트에 속한 모든 항목을 무효화합니다."""
+        if self.shared is not None:
+            self.shared.delete_endpoint(endpoint)
+        keys = [key for key, entry in self._entries.items() if entry.endpoint == endpoint]
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        """캐시를 비웁니다."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """튜닝을 위한 캐시 통계를 반환합니다."""
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        total = hits + misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttls": dict(self.ttls),
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "hit_ratio": hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "revalidations": self.revalidations,
+            "revalidation_misses": self.revalidation_misses,
+            "shared": self.shared.stats() if self.shared is not None else None,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self):
+        """항목 수와 바이트 상한을 넘지 않도록 가장 오래 사용되지 않은 항목부터 제거합니다."""
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+def make_key(endpoint: str, path: str, params: Optional[Dict[str, Any]] = None, namespace: str = "") -> Tuple:
+    """
+    엔드포인트, 경로, 매개변수로 해시 가능한 캐시 키를 만듭니다.
+
+    여러 테넌트가 캐시를 함께 쓸 때는 `namespace`를 키 끝에 붙여 서로의 응답을 구분합니다.
+    """
+    items = []
+    for name in sorted(params or ()):
+        value = params[name]
+        if isinstance(value, list):
+            value = tuple(value)
+        items.append((name, value))
+    key = (endpoint, path, tuple(items))
+    return key + (namespace,) if namespace else key
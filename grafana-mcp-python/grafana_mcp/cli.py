@@ -12,20 +12,38 @@ from rich.logging import RichHandler
 from dotenv import load_dotenv
 
 from . import __version__
-from .server import GrafanaMCPServer
-from .context import grafana_context
+from .server import GrafanaMCPServer, DEFAULT_MAX_CONCURRENCY, DEFAULT_BATCH_CONCURRENCY, DEFAULT_MAX_BATCH_SIZE
+from .client import GrafanaClient
+from .context import grafana_context, default_cache_dir, parse_instances, get_grafana_info_from_env
+from .tenants import DEFAULT_MAX_TENANTS, DEFAULT_TENANT_IDLE_TIMEOUT, DEFAULT_TENANT_MAX_CONNECTIONS
+from .cache import parse_ttl_overrides, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
+from .image_cache import DEFAULT_IMAGE_CACHE_MAX_BYTES, DEFAULT_TIME_BUCKET
+from .imaging import DEFAULT_TRANSCODE_WORKERS
+from .index import DEFAULT_REFRESH_INTERVAL, DEFAULT_CHECK_BUDGET
+from .limits import GrafanaLimits, parse_rate_limits, DEFAULT_MAX_UPSTREAM_CONCURRENCY
+from .warmup import DEFAULT_WARMUP_CONCURRENCY
+from .resilience import (
+    Resilience, RetryPolicy,
+    DEFAULT_RETRIES, DEFAULT_BREAKER_THRESHOLD, DEFAULT_BREAKER_RESET, DEFAULT_HEDGE_MIN_DELAY
+)
+from .bulk import export_dashboards, import_dashboards, DEFAULT_BULK_CONCURRENCY
 from . import tools
+from . import codec
+from . import metrics
+from . import tracing
 
 # 타이퍼 앱 생성
 app = typer.Typer(help="Grafana MCP 서버")
 console = Console()
+# STDIO 전송에서는 stdout이 프로토콜 전용이므로 상태 메시지와 로그는 stderr로 보냅니다
+err_console = Console(stderr=True)
 
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
     format="%(message)s",
     datefmt="[%X]",
-    handlers=[RichHandler(rich_tracebacks=True)]
+    handlers=[RichHandler(console=err_console, rich_tracebacks=True)]
 )
 logger = logging.getLogger("mcp-cli")
 
@@ -44,59 +62,483 @@ def version():
     """버전 정보 표시"""
     console.print(f"Grafana MCP 서버 버전: [bold]{__version__}[/]")
 
+async def _run_stdio(server: GrafanaMCPServer, metrics_host: str = "localhost", metrics_port: int = 0):
+    """STDIO 서버를 실행하고 종료 시 Grafana 연결 풀을 정리합니다."""
+    metrics_server = None
+    try:
+        await grafana_context.start_background()
+        if metrics_port:
+            metrics_server = await metrics.serve(server.metrics_text, metrics_host, metrics_port)
+        await server.start_stdio()
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        await grafana_context.aclose()
+        tracing.shutdown()
+
+def _split(values: List[str]) -> List[str]:
+    """쉼표로 구분한 옵션 값들을 하나의 목록으로 펼칩니다."""
+    return [item.strip() for value in values for item in value.split(",") if item.strip()]
+
+def build_server(transport: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 disabled_tools: List[str] = (), announce: bool = True,
+                 batch_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 tenant_routing: bool = False) -> GrafanaMCPServer:
+    """
+    MCP 서버를 만들고 활성화된 카테고리의 도구만 불러와 등록합니다.
+
+    Args:
+        transport: 전송 유형 (sse이면 FastAPI 앱도 미리 만듦)
+        max_concurrency: STDIO 전송에서 동시에 처리할 최대 요청 수
+        disabled_tools: 비활성화할 도구 카테고리
+        announce: 카테고리별 활성화 여부를 stderr에 출력할지 여부
+        batch_concurrency: 배치 요청 하나 안에서 동시에 실행할 최대 요청 수
+        max_batch_size: 배치 요청의 최대 크기
+        tenant_routing: `grafana` 도구 인자와 X-Grafana-* 헤더로 인스턴스/조직을 고를 수 있게 할지 여부
+
+    Returns:
+        도구가 등록된 서버
+    """
+    server = GrafanaMCPServer(
+        "grafana-mcp", __version__,
+        max_concurrency=max_concurrency,
+        batch_concurrency=batch_concurrency,
+        max_batch_size=max_batch_size
+    )
+    server.tenant_routing = tenant_routing
+    server.add_stats_provider("cache", grafana_context.cache_stats)
+    server.add_stats_provider("coalescing", grafana_context.coalescing_stats)
+    server.add_stats_provider("image_cache", grafana_context.image_cache_stats)
+    server.add_stats_provider("transcode", grafana_context.transcode_stats)
+    server.add_stats_provider("index", grafana_context.index_stats)
+    server.add_stats_provider("limits", grafana_context.limits_stats)
+    server.add_stats_provider("resilience", grafana_context.resilience_stats)
+    server.add_stats_provider("tracing", tracing.stats)
+    server.add_stats_provider("tenants", grafana_context.tenants_stats)
+    server.add_stats_provider("warmup", grafana_context.warmup_stats)
+
+    # 비활성화된 카테고리의 모듈은 불러오지 않습니다
+    disabled_categories = set(cat.strip() for value in disabled_tools for cat in value.split(","))
+    for name, label in tools.TOOL_CATEGORIES.items():
+        if name in disabled_categories:
+            if announce:
+                err_console.print(f"- [yellow]{label} 도구 비활성화됨[/]")
+            continue
+        tools.load_category(name).add_tools(server)
+        if announce:
+            err_console.print(f"- [green]{label} 도구 활성화됨[/]")
+
+    if transport == "sse":
+        # SSE 전송에서만 FastAPI를 불러와 라우트를 구성합니다
+        server.app
+    return server
+
 @app.command()
 def serve(
     transport: str = typer.Option("stdio", help="전송 유형 (stdio 또는 sse)"),
     host: str = typer.Option("localhost", help="SSE 전송을 위한 호스트"),
     port: int = typer.Option(8000, help="SSE 전송을 위한 포트"),
+    public_url: str = typer.Option(None, help="리소스 URL에 사용할 외부 주소 (기본값: http://<host>:<port>)"),
     debug: bool = typer.Option(False, help="디버그 모드 활성화"),
     grafana_url: str = typer.Option(None, help="Grafana URL (기본값: 환경 변수 GRAFANA_URL 또는 http://localhost:3000)"),
     grafana_api_key: str = typer.Option(None, help="Grafana API 키 (기본값: 환경 변수 GRAFANA_API_KEY)"),
+    max_connections: int = typer.Option(100, help="Grafana 연결 풀의 최대 동시 연결 수"),
+    max_keepalive_connections: int = typer.Option(20, help="유지할 최대 keep-alive 연결 수"),
+    keepalive_expiry: float = typer.Option(30.0, help="유휴 keep-alive 연결 유지 시간 (초)"),
+    http2: bool = typer.Option(True, help="Grafana와 HTTP/2로 통신 (h2 패키지 필요)"),
+    max_concurrency: int = typer.Option(DEFAULT_MAX_CONCURRENCY, help="STDIO 전송에서 동시에 처리할 최대 요청 수"),
+    batch_concurrency: int = typer.Option(DEFAULT_BATCH_CONCURRENCY, help="JSON-RPC 배치 하나 안에서 동시에 실행할 최대 요청 수"),
+    max_batch_size: int = typer.Option(DEFAULT_MAX_BATCH_SIZE, help="JSON-RPC 배치의 최대 요청 수"),
+    coalesce: bool = typer.Option(True, help="진행 중인 동일한 Grafana 요청을 하나로 합치기"),
+    cache: bool = typer.Option(True, help="대시보드/검색/데이터소스 응답 캐시 사용"),
+    cache_max_entries: int = typer.Option(DEFAULT_MAX_ENTRIES, help="응답 캐시 최대 항목 수"),
+    cache_max_bytes: int = typer.Option(DEFAULT_MAX_BYTES, help="응답 캐시 최대 크기 (바이트)"),
+    cache_ttl: List[str] = typer.Option(
+        [], help="엔드포인트별 캐시 TTL (예: dashboard=300,search=30,datasource=600)"
+    ),
+    cache_revalidate_after: float = typer.Option(
+        0.0, help="캐시된 대시보드를 버전 확인 없이 제공할 시간 (초, 0이면 매번 meta.version 확인)"
+    ),
+    image_cache: bool = typer.Option(True, help="렌더링 이미지 디스크 캐시 사용"),
+    image_cache_dir: str = typer.Option(None, help="렌더링 이미지 캐시 디렉터리 (기본값: ~/.cache/grafana-mcp/images)"),
+    image_cache_max_bytes: int = typer.Option(DEFAULT_IMAGE_CACHE_MAX_BYTES, help="렌더링 이미지 캐시 최대 크기 (바이트)"),
+    render_time_bucket: int = typer.Option(
+        DEFAULT_TIME_BUCKET, help="now-6h 같은 상대 시간 범위를 묶는 단위 (초)"
+    ),
+    transcode_workers: int = typer.Option(
+        DEFAULT_TRANSCODE_WORKERS, help="이미지 포맷 변환/축소 워커 프로세스 수"
+    ),
+    json_codec: str = typer.Option(
+        "auto", help="JSON 코덱 (auto, orjson, msgspec, json)"
+    ),
+    search_index: bool = typer.Option(
+        False, "--search-index/--no-search-index",
+        help="대시보드를 로컬 색인에 수집해 패널 제목, 쿼리, 데이터소스까지 검색"
+    ),
+    index_refresh_interval: float = typer.Option(
+        DEFAULT_REFRESH_INTERVAL, help="검색 색인 변경 확인 주기 (초)"
+    ),
+    index_check_budget: int = typer.Option(
+        DEFAULT_CHECK_BUDGET, help="검색 색인 갱신 한 번에 버전 번호를 확인할 최대 대시보드 수"
+    ),
+    upstream_limits: bool = typer.Option(
+        True, help="Grafana로 보내는 요청에 엔드포인트 종류별 속도/동시성 제한 적용"
+    ),
+    rate_limit: List[str] = typer.Option(
+        [], help="엔드포인트 종류별 초당 요청 수 (예: render=2,search=50)"
+    ),
+    adaptive_limits: bool = typer.Option(
+        True, help="지연 시간과 429/5xx에 따라 종류별 동시성 한도를 자동 조절 (AIMD)"
+    ),
+    max_upstream_concurrency: int = typer.Option(
+        DEFAULT_MAX_UPSTREAM_CONCURRENCY, help="모든 종류를 합친 Grafana 최대 동시 요청 수"
+    ),
+    retries: int = typer.Option(
+        DEFAULT_RETRIES, help="GET 요청이 연결 오류/타임아웃/429/5xx로 실패했을 때 재시도 횟수 (0이면 재시도하지 않음)"
+    ),
+    circuit_breaker: bool = typer.Option(
+        True, help="Grafana가 연속으로 실패하면 잠시 요청을 보내지 않고 바로 실패"
+    ),
+    breaker_threshold: int = typer.Option(
+        DEFAULT_BREAKER_THRESHOLD, help="서킷 브레이커를 여는 연속 실패 횟수"
+    ),
+    breaker_reset: float = typer.Option(
+        DEFAULT_BREAKER_RESET, help="서킷 브레이커가 열린 뒤 다시 시험 요청을 보내기까지의 시간 (초)"
+    ),
+    hedge: bool = typer.Option(
+        False, help="검색/대시보드 조회가 최근 p95 지연 시간보다 느리면 같은 요청을 한 번 더 보냄"
+    ),
+    hedge_min_delay: float = typer.Option(
+        DEFAULT_HEDGE_MIN_DELAY, help="헤지 요청을 보내기 전 최소 대기 시간 (초)"
+    ),
+    metrics_enabled: bool = typer.Option(
+        True, "--metrics/--no-metrics", help="Prometheus 지표 기록 (SSE 전송은 /metrics로 제공)"
+    ),
+    metrics_port: int = typer.Option(
+        0, help="STDIO 전송에서 /metrics를 제공할 포트 (--host에 바인드, 0이면 제공하지 않음)"
+    ),
+    instance: List[str] = typer.Option(
+        [], help="이름으로 고를 수 있는 Grafana 인스턴스 (예: prod=https://grafana.example.com, API 키는 GRAFANA_API_KEY_PROD)"
+    ),
+    tenant_routing: bool = typer.Option(
+        False, help="도구 인자 grafana와 X-Grafana-* 헤더로 인스턴스/조직을 골라 요청"
+    ),
+    max_tenants: int = typer.Option(
+        DEFAULT_MAX_TENANTS, help="기본 인스턴스 외에 유지할 최대 테넌트 클라이언트 수"
+    ),
+    tenant_idle_timeout: float = typer.Option(
+        DEFAULT_TENANT_IDLE_TIMEOUT, help="쓰이지 않은 테넌트 클라이언트를 닫을 시간 (초)"
+    ),
+    tenant_max_connections: int = typer.Option(
+        DEFAULT_TENANT_MAX_CONNECTIONS, help="테넌트 클라이언트 하나의 최대 연결 수"
+    ),
+    tenant_url_allowlist: List[str] = typer.Option(
+        [], help="X-Grafana-Url 헤더로 고를 수 있는 Grafana URL (쉼표로 여러 개, 없으면 등록한 인스턴스만 허용)"
+    ),
+    tenant_org_switching: bool = typer.Option(
+        False, help="서버의 API 키로 요청마다 다른 조직(org_id)을 고를 수 있게 함"
+    ),
+    warmup_dashboard: List[str] = typer.Option(
+        [], help="시작할 때 미리 가져올 대시보드 UID (쉼표로 여러 개)"
+    ),
+    warmup_tag: List[str] = typer.Option(
+        [], help="시작할 때 이 태그가 붙은 대시보드를 미리 가져옴 (쉼표로 여러 개)"
+    ),
+    warmup_recent: int = typer.Option(
+        0, help="시작할 때 최근에 조회한 대시보드 N개를 미리 가져옴"
+    ),
+    warmup_connections: int = typer.Option(
+        0, help="시작할 때 Grafana 연결 풀에 미리 열어 둘 연결 수"
+    ),
+    warmup_render_panels: int = typer.Option(
+        0, help="미리 가져온 대시보드마다 앞쪽 패널 N개를 미리 렌더링 (이미지 캐시 필요)"
+    ),
+    warmup_concurrency: int = typer.Option(
+        DEFAULT_WARMUP_CONCURRENCY, help="시작 시 준비 작업의 동시 요청 수"
+    ),
+    trace_file: str = typer.Option(
+        None, help="요청별 span을 OTLP/JSON으로 덧붙일 파일 (지정하지 않으면 추적하지 않음)"
+    ),
+    trace_sample_rate: float = typer.Option(
+        1.0, help="추적할 요청의 비율 (0~1)"
+    ),
+    profile_slow_calls: float = typer.Option(
+        0.0, help="이 시간(초)보다 오래 걸린 도구 호출의 스택 프로파일을 남김 (0이면 프로파일링하지 않음)"
+    ),
+    profile_dir: str = typer.Option(
+        None, help="느린 호출 프로파일 디렉터리 (기본값: ~/.cache/grafana-mcp/profiles)"
+    ),
+    workers: int = typer.Option(
+        1, help="SSE 전송의 워커 프로세스 수 (2 이상이면 캐시와 검색 색인을 공유 상태 디렉터리에 둠)"
+    ),
+    shared_state_dir: str = typer.Option(
+        None, help="워커/프로세스 사이에서 공유할 캐시와 색인 디렉터리 (기본값: 워커가 2 이상이면 ~/.cache/grafana-mcp/shared)"
+    ),
     disabled_tools: List[str] = typer.Option(
         [], help="비활성화할 도구 카테고리 (예: dashboard,search)"
     )
 ):
     """Grafana MCP 서버 실행"""
-    # Grafana 컨텍스트 초기화
-    grafana_context.initialize(
+    metrics.set_enabled(metrics_enabled)
+    tracing_options = dict(
+        trace_file=trace_file,
+        sample_rate=trace_sample_rate,
+        profile_threshold=profile_slow_calls,
+        profile_dir=profile_dir or os.path.join(default_cache_dir(), "profiles")
+    )
+    try:
+        cache_ttls = parse_ttl_overrides(cache_ttl)
+        rate_limits = parse_rate_limits(rate_limit)
+        instances = parse_instances(instance)
+        codec.use_backend(None if json_codec == "auto" else json_codec)
+    except ValueError as e:
+        err_console.print(f"[bold red]오류:[/] {e}")
+        raise typer.Exit(1)
+    
+    if workers > 1 and transport != "sse":
+        err_console.print("[bold red]오류:[/] --workers는 SSE 전송에서만 사용할 수 있습니다.")
+        raise typer.Exit(1)
+    if workers > 1 and not shared_state_dir:
+        shared_state_dir = os.path.join(default_cache_dir(), "shared")
+    
+    # Grafana 컨텍스트 초기화 (여러 워커로 실행하면 각 워커가 같은 설정으로 다시 초기화)
+    context_options = dict(
         url=grafana_url,
         api_key=grafana_api_key,
-        debug=debug
+        debug=debug,
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+        http2=http2,
+        cache_enabled=cache,
+        cache_max_entries=cache_max_entries,
+        cache_max_bytes=cache_max_bytes,
+        cache_ttls=cache_ttls,
+        dashboard_revalidate_after=cache_revalidate_after,
+        coalesce=coalesce,
+        image_cache_enabled=image_cache,
+        image_cache_dir=image_cache_dir,
+        image_cache_max_bytes=image_cache_max_bytes,
+        render_time_bucket=render_time_bucket,
+        transcode_workers=transcode_workers,
+        search_index=search_index,
+        index_refresh_interval=index_refresh_interval,
+        index_check_budget=index_check_budget,
+        shared_state_dir=shared_state_dir,
+        upstream_limits=upstream_limits,
+        rate_limits=rate_limits,
+        adaptive_limits=adaptive_limits,
+        max_upstream_concurrency=max_upstream_concurrency,
+        retries=retries,
+        circuit_breaker=circuit_breaker,
+        breaker_threshold=breaker_threshold,
+        breaker_reset=breaker_reset,
+        hedge=hedge,
+        hedge_min_delay=hedge_min_delay,
+        instances=instances,
+        max_tenants=max_tenants,
+        tenant_idle_timeout=tenant_idle_timeout,
+        tenant_max_connections=tenant_max_connections,
+        tenant_url_allowlist=_split(tenant_url_allowlist),
+        tenant_org_switching=tenant_org_switching,
+        warmup_dashboards=_split(warmup_dashboard),
+        warmup_tags=_split(warmup_tag),
+        warmup_recent=warmup_recent,
+        warmup_connections=warmup_connections,
+        warmup_render_panels=warmup_render_panels,
+        warmup_concurrency=warmup_concurrency
     )
+    grafana_context.initialize(**context_options)
+    # 여러 워커로 실행하면 추적 파일과 프로파일러 스레드는 각 워커가 create_app에서 엽니다
+    if workers <= 1:
+        tracing.configure(**tracing_options)
     
     if not grafana_context.is_initialized:
-        console.print("[bold red]오류:[/] Grafana 클라이언트를 초기화할 수 없습니다. API 키를 확인하세요.")
+        err_console.print("[bold red]오류:[/] Grafana 클라이언트를 초기화할 수 없습니다. API 키를 확인하세요.")
         raise typer.Exit(1)
     
-    # MCP 서버 생성
-    server = GrafanaMCPServer("grafana-mcp", __version__)
-    
-    # 도구 등록
-    disabled_categories = set(cat.strip() for cat in disabled_tools)
-    
-    # 활성화된 카테고리를 기반으로 도구 추가
-    if "search" not in disabled_categories:
-        tools.search.add_tools(server)
-        console.print("- [green]검색 도구 활성화됨[/]")
-    else:
-        console.print("- [yellow]검색 도구 비활성화됨[/]")
-        
-    if "dashboard" not in disabled_categories:
-        tools.dashboard.add_tools(server)
-        console.print("- [green]대시보드 도구 활성화됨[/]")
-    else:
-        console.print("- [yellow]대시보드 도구 비활성화됨[/]")
+    server = build_server(
+        transport, max_concurrency, disabled_tools,
+        batch_concurrency=batch_concurrency,
+        max_batch_size=max_batch_size,
+        tenant_routing=tenant_routing
+    )
     
     # 서버 시작
     if transport == "stdio":
-        console.print(f"Grafana MCP 서버를 [bold]STDIO[/] 전송으로 시작 중...")
+        err_console.print(f"Grafana MCP 서버를 [bold]STDIO[/] 전송으로 시작 중...")
         # 비동기 실행
-        asyncio.run(server.start_stdio())
+        asyncio.run(_run_stdio(server, host, metrics_port if metrics_enabled else 0))
     elif transport == "sse":
-        console.print(f"Grafana MCP 서버를 [bold]SSE[/] 전송으로 시작 중 ([bold]{host}:{port}[/])...")
-        server.start_sse(host, port)
+        from .asgi import setup_http, run_workers
+        err_console.print(f"Grafana MCP 서버를 [bold]SSE[/] 전송으로 시작 중 ([bold]{host}:{port}[/], 워커 {workers}개)...")
+        public_url = public_url or f"http://{host}:{port}"
+        if workers > 1:
+            run_workers({
+                "context": context_options,
+                "json_codec": None if json_codec == "auto" else json_codec,
+                "max_concurrency": max_concurrency,
+                "batch_concurrency": batch_concurrency,
+                "max_batch_size": max_batch_size,
+                "tenant_routing": tenant_routing,
+                "disabled_tools": disabled_tools,
+                "public_url": public_url,
+                "metrics": metrics_enabled,
+                "tracing": tracing_options,
+                "resource_secret": os.urandom(32).hex()
+            }, host, port, workers)
+        else:
+            setup_http(server, public_url)
+            server.start_sse(host, port)
     else:
-        console.print(f"[bold red]오류:[/] 알 수 없는 전송: {transport}")
+        err_console.print(f"[bold red]오류:[/] 알 수 없는 전송: {transport}")
+        raise typer.Exit(1)
+
+# import-time 명령이 하위 프로세스에서 실행하는 코드 (serve가 서버를 띄우기 직전까지)
+_IMPORT_TIME_CODE = """
+import sys
+from grafana_mcp import cli
+cli.build_server(sys.argv[1], disabled_tools=sys.argv[2:], announce=False)
+"""
+
+def _parse_import_time(output: str) -> List[tuple]:
+    """`-X importtime` 출력에서 (누적 마이크로초, 자체 마이크로초, 모듈) 목록을 뽑습니다."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), int(parts[0]), parts[2].strip()))
+    return rows
+
+@app.command("import-time")
+def import_time(
+    transport: str = typer.Option("stdio", help="측정할 전송 유형 (stdio 또는 sse)"),
+    disabled_tools: List[str] = typer.Option(
+        [], help="비활성화할 도구 카테고리 (예: dashboard,search)"
+    ),
+    top: int = typer.Option(15, help="표시할 모듈 수 (누적 시간 순)"),
+    repeat: int = typer.Option(3, help="반복 측정 횟수 (가장 빠른 값을 사용)")
+):
+    """서버 시작까지의 모듈 불러오기 시간 측정"""
+    import subprocess
+    import time
+
+    best = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _IMPORT_TIME_CODE, transport, *disabled_tools],
+            capture_output=True, text=True
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            err_console.print(result.stderr)
+            err_console.print("[bold red]오류:[/] 서버를 구성하는 중 실패했습니다.")
+            raise typer.Exit(1)
+        if best is None or elapsed < best[0]:
+            best = (elapsed, result.stderr)
+
+    elapsed, output = best
+    rows = _parse_import_time(output)
+    package = sum(self_us for _, self_us, name in rows if name.startswith("grafana_mcp"))
+    console.print(f"[bold]{transport}[/] 서버 구성까지 걸린 시간: [bold]{elapsed * 1000:.0f} ms[/] "
+                  f"(인터프리터 시작 포함, 모듈 {len(rows)}개, grafana_mcp 자체 {package / 1000:.1f} ms)")
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:top]:
+        console.print(f"  {cumulative / 1000:8.1f} ms  {self_us / 1000:7.1f} ms  {name}")
+
+def _bulk_client(grafana_url: str, grafana_api_key: str, concurrency: int, retries: int):
+    """일괄 작업용 Grafana 클라이언트 (응답 캐시 없이, 요청 제한과 재시도는 서버와 같은 방식)"""
+    env_url, env_api_key = get_grafana_info_from_env()
+    api_key = grafana_api_key or env_api_key
+    if not api_key:
+        err_console.print("[bold red]오류:[/] Grafana API 키가 없습니다 (--grafana-api-key 또는 GRAFANA_API_KEY).")
+        raise typer.Exit(1)
+    return GrafanaClient(
+        base_url=grafana_url or env_url,
+        api_key=api_key,
+        max_connections=concurrency * 2,
+        max_keepalive_connections=concurrency * 2,
+        limits=GrafanaLimits(),
+        resilience=Resilience(retry=RetryPolicy(retries) if retries > 0 else None)
+    )
+
+def _print_report(report) -> bool:
+    """일괄 작업 결과를 출력하고 실패가 없었는지 반환합니다."""
+    data = report.to_dict()
+    console.print(
+        f"[bold]{data['processed']}[/]개 처리, 건너뜀 {data['skipped']}, 실패 {data['failed']} "
+        f"({data['seconds']:.1f}초, 초당 {data['dashboards_per_second']}개, {data['megabytes_per_second']} MB/s)"
+    )
+    for failure in data["failures"]:
+        console.print(f"  [red]실패[/] {failure['uid']}: {failure['error']}")
+    if data["failed"] > len(data["failures"]):
+        console.print(f"  ... 외 {data['failed'] - len(data['failures'])}개")
+    return data["failed"] == 0
+
+def _progress(report):
+    data = report.to_dict()
+    err_console.print(f"{data['processed']}개 처리 (초당 {data['dashboards_per_second']}개)")
+
+@app.command("export")
+def export_command(
+    output: str = typer.Argument(..., help="아카이브 경로 (.ndjson 또는 .ndjson.gz)"),
+    query: str = typer.Option(None, help="내보낼 대시보드 검색 쿼리"),
+    tag: List[str] = typer.Option([], help="내보낼 대시보드 태그 (여러 번 지정 가능)"),
+    folder_id: List[int] = typer.Option([], help="내보낼 폴더 ID (여러 번 지정 가능)"),
+    concurrency: int = typer.Option(DEFAULT_BULK_CONCURRENCY, help="동시에 가져올 최대 대시보드 수"),
+    resume: bool = typer.Option(False, help="체크포인트가 있으면 중단된 곳부터 이어서 내보냄"),
+    checkpoint: str = typer.Option(None, help="체크포인트 파일 (기본값: <output>.checkpoint)"),
+    retries: int = typer.Option(DEFAULT_RETRIES, help="실패한 조회의 재시도 횟수"),
+    grafana_url: str = typer.Option(None, help="Grafana URL (기본값: 환경 변수 GRAFANA_URL)"),
+    grafana_api_key: str = typer.Option(None, help="Grafana API 키 (기본값: 환경 변수 GRAFANA_API_KEY)")
+):
+    """대시보드를 NDJSON 아카이브로 일괄 내보내기"""
+    async def run():
+        async with _bulk_client(grafana_url, grafana_api_key, concurrency, retries) as client:
+            return await export_dashboards(
+                client, output, query=query, tags=tag or None, folder_ids=folder_id or None,
+                concurrency=concurrency, checkpoint_path=checkpoint, resume=resume, progress=_progress
+            )
+
+    try:
+        report = asyncio.run(run())
+    except (ValueError, OSError) as e:
+        err_console.print(f"[bold red]오류:[/] {e}")
+        raise typer.Exit(1)
+    if not _print_report(report):
+        raise typer.Exit(1)
+
+@app.command("import")
+def import_command(
+    archive: str = typer.Argument(..., help="export로 만든 아카이브 경로"),
+    concurrency: int = typer.Option(DEFAULT_BULK_CONCURRENCY, help="동시에 저장할 최대 대시보드 수"),
+    on_conflict: str = typer.Option("skip", help="같은 UID/제목의 대시보드가 있을 때 (skip 또는 overwrite)"),
+    message: str = typer.Option("Imported via MCP", help="버전 기록에 남길 메시지"),
+    create_folders: bool = typer.Option(True, help="대상 Grafana에 없는 폴더를 같은 UID로 만듦"),
+    resume: bool = typer.Option(False, help="체크포인트가 있으면 중단된 곳부터 이어서 가져옴"),
+    checkpoint: str = typer.Option(None, help="체크포인트 파일 (기본값: <archive>.checkpoint)"),
+    grafana_url: str = typer.Option(None, help="Grafana URL (기본값: 환경 변수 GRAFANA_URL)"),
+    grafana_api_key: str = typer.Option(None, help="Grafana API 키 (기본값: 환경 변수 GRAFANA_API_KEY)")
+):
+    """NDJSON 아카이브의 대시보드를 일괄 가져오기"""
+    async def run():
+        # 저장은 재시도하지 않으므로 (중복 저장 방지) 재시도 정책은 조회에만 적용됩니다
+        async with _bulk_client(grafana_url, grafana_api_key, concurrency, DEFAULT_RETRIES) as client:
+            return await import_dashboards(
+                client, archive, concurrency=concurrency, on_conflict=on_conflict, message=message,
+                create_folders=create_folders, checkpoint_path=checkpoint, resume=resume, progress=_progress
+            )
+
+    try:
+        report = asyncio.run(run())
+    except (ValueError, OSError) as e:
+        err_console.print(f"[bold red]오류:[/] {e}")
+        raise typer.Exit(1)
+    if not _print_report(report):
         raise typer.Exit(1)
 
 if __name__ == "__main__":
@@ -2,59 +2,197 @@
 Grafana API 클라이언트
 """
 import httpx
+import asyncio
 import os
 import json
 import logging
-from typing import Dict, Any, Optional, List, Union
+import time
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Callable, Collection, Optional, List, Tuple, Union
 from urllib.parse import urljoin
+from . import codec
+from . import metrics
+from . import tracing
+from .cache import ResponseCache, CacheEntry, make_key
+from .limits import GrafanaLimits, Permit, endpoint_class
+from .resilience import Resilience, HEDGE_CLASSES
+from .singleflight import SingleFlight, request_key
+from .warmup import RecentDashboards
 
 # 로깅 설정
 logger = logging.getLogger("grafana-client")
 
+# 진행 중인 동일 요청을 합칠 수 있는 (부수 효과가 없는) 메서드
+COALESCE_METHODS = frozenset({"GET", "HEAD"})
+
+# 연결 풀 기본값
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# 검색 결과 페이지 크기 기본값 (Grafana 최대 5000)
+SEARCH_PAGE_SIZE = 1000
+
+# 렌더링 응답 스트리밍 청크 크기
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+
+def _http2_available() -> bool:
+    """HTTP/2 사용에 필요한 h2 패키지가 설치되어 있는지 확인"""
+    return importlib.util.find_spec("h2") is not None
+
 class GrafanaClient:
-    """Grafana API와 통신하는 클라이언트"""
-    
-    def __init__(self, base_url: str, api_key: str, debug: bool = False):
+    """Grafana API와 통신하는 비동기 클라이언트"""
+
+    def __init__(self, base_url: str, api_key: str, debug: bool = False,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+                 http2: bool = True,
+                 cache: Optional[ResponseCache] = None,
+                 dashboard_revalidate_after: float = 0.0,
+                 coalesce: bool = True,
+                 limits: Optional[GrafanaLimits] = None,
+                 resilience: Optional[Resilience] = None,
+                 org_id: Optional[int] = None,
+                 cache_namespace: str = "",
+                 recent_dashboards: Optional[RecentDashboards] = None):
         """
         Grafana 클라이언트 초기화
-        
+
         Args:
             base_url: Grafana 서버 URL (예: http://localhost:3000)
             api_key: Grafana API 키
             debug: 디버그 모드 활성화 여부
+            timeout: 요청 타임아웃 (초)
+            max_connections: 연결 풀의 최대 동시 연결 수
+            max_keepalive_connections: 유지할 최대 keep-alive 연결 수
+            keepalive_expiry: 유휴 keep-alive 연결 유지 시간 (초)
+            http2: HTTP/2 사용 여부 (h2 패키지가 없으면 HTTP/1.1로 대체)
+            cache: 응답 캐시 (None이면 캐시하지 않음)
+            dashboard_revalidate_after: 캐시된 대시보드를 버전 확인 없이 제공할 시간 (초, 0이면 매번 확인)
+            coalesce: 진행 중인 동일 요청을 하나의 업스트림 요청으로 합칠지 여부
+            limits: 엔드포인트 종류별 속도/동시성 제한 (None이면 제한하지 않음)
+            resilience: 재시도/서킷 브레이커/헤지 요청 설정 (None이면 요청을 한 번만 보냄)
+            org_id: 요청할 Grafana 조직 ID (None이면 API 키의 기본 조직)
+            cache_namespace: 다른 클라이언트와 캐시를 함께 쓸 때 키를 구분할 이름공간
+            recent_dashboards: 조회한 대시보드를 기록할 곳 (다음 시작 때 미리 가져올 대상)
         """
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.debug = debug
-        self.http_client = httpx.Client(
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            timeout=30.0  # 30초 타임아웃
+        self.cache = cache
+        self.dashboard_revalidate_after = dashboard_revalidate_after
+        self.singleflight = SingleFlight() if coalesce else None
+        self.limits = limits
+        self.resilience = resilience
+        self.org_id = org_id
+        self.cache_namespace = cache_namespace
+        self.recent_dashboards = recent_dashboards
+
+        if http2 and not _http2_available():
+            logger.warning("h2 패키지가 없어 HTTP/1.1로 연결합니다 (pip install 'httpx[http2]')")
+            http2 = False
+        self.http2 = http2
+
+        self.pool_limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        if org_id is not None:
+            headers["X-Grafana-Org-Id"] = str(org_id)
+        self.http_client = httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            limits=self.pool_limits,
+            http2=http2
         )
-    
-    def __del__(self):
-        """클라이언트 정리"""
-        if hasattr(self, 'http_client'):
-            self.http_client.close()
-    
-    def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, 
-                json_data: Optional[Dict[str, Any]] = None) -> Any:
+
+    async def aclose(self):
+        """연결 풀 정리"""
+        await self.http_client.aclose()
+
+    async def __aenter__(self) -> "GrafanaClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    @asynccontextmanager
+    async def _slot(self, path: str) -> AsyncIterator[Optional[Permit]]:
+        """요청 제한이 있으면 실행 자리를 얻습니다 (없으면 None)."""
+        if self.limits is None:
+            yield None
+            return
+        async with self.limits.slot(path) as permit:
+            yield permit
+
+    async def _send(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                    json_data: Optional[Dict[str, Any]] = None, coalesce: Optional[bool] = None) -> httpx.Response:
         """
-        Grafana API에 요청을 보냅니다.
-        
+        Grafana API에 요청을 보내고 상태 코드를 검사한 응답을 반환합니다.
+
+        (메서드, 경로, 매개변수, 본문)이 같은 요청이 이미 진행 중이면 새 요청을 보내지 않고
+        그 응답을 공유합니다. 공유된 응답은 본문을 모두 읽은 상태이므로 읽기 전용으로 다뤄야 합니다.
+
         Args:
             method: HTTP 메서드 (GET, POST, PUT, DELETE)
             path: API 경로
             params: URL 매개변수
             json_data: 요청 본문 데이터
-            
+            coalesce: 동일 요청 합치기 여부 (None이면 GET/HEAD만 합침)
+
         Returns:
-            응답 데이터 (JSON)
+            httpx 응답 객체
+        """
+        if coalesce is None:
+            coalesce = method.upper() in COALESCE_METHODS
+        if not coalesce or self.singleflight is None:
+            return await self._send_resilient(method, path, params, json_data)
+
+        key = request_key(method, path, params, json_data)
+        return await self.singleflight.do(
+            key, lambda: self._send_resilient(method, path, params, json_data)
+        )
+
+    async def _send_resilient(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                              json_data: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """
+        서킷 브레이커를 확인하고, 멱등 요청은 실패 시 재시도하며 검색/대시보드 조회는 헤지합니다.
+
+        합쳐진 요청은 재시도도 한 번만 하도록 single-flight 안쪽에서 호출됩니다.
+        """
+        if self.resilience is None:
+            return await self._send_once(method, path, params, json_data)
+
+        idempotent = method.upper() in COALESCE_METHODS
+        hedge = idempotent and self.resilience.hedger is not None and endpoint_class(path) in HEDGE_CLASSES
+        return await self.resilience.execute(
+            lambda: self._send_once(method, path, params, json_data, hedge=hedge),
+            idempotent=idempotent
+        )
+
+    def _may_hedge(self, endpoint: str) -> bool:
+        """헤지 요청을 보내도 되는지 여부 (요청 제한에 기다리는 요청이 있으면 보내지 않음)"""
+        return self.limits is None or self.limits.has_capacity(endpoint)
+
+    async def _send_once(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                         json_data: Optional[Dict[str, Any]] = None, hedge: bool = False) -> httpx.Response:
+        """
+        Grafana API에 실제 HTTP 요청을 한 번 보냅니다.
+
+        `hedge`가 참이면 요청 제한의 자리를 얻은 뒤의 HTTP 요청만 헤지하므로, 대기열에서 기다린
+        시간은 헤지 지연 시간에 들어가지 않고 헤지 요청이 대기열에 다시 들어가지도 않습니다.
         """
         url = urljoin(self.base_url, path)
-        
+
         if self.debug:
             debug_info = {
                 "method": method,
@@ -63,29 +201,81 @@ class GrafanaClient:
                 "json_data": json_data
             }
             logger.debug(f"Grafana API 요청: {json.dumps(debug_info)}")
-        
+
+        async with self._slot(path) as permit:
+            endpoint = permit.endpoint if permit is not None else endpoint_class(path)
+            started = metrics.upstream_started(endpoint)
+            with tracing.span("grafana.request", tracing.SPAN_KIND_CLIENT, **{
+                "http.request.method": method, "url.path": path, "grafana.endpoint": endpoint
+            }) as span:
+                def send():
+                    return self.http_client.request(
+                        method=method,
+                        url=url,
+                        params=params,
+                        json=json_data
+                    )
+
+                try:
+                    if hedge:
+                        response = await self.resilience.hedger.run(
+                            endpoint, send, may_hedge=lambda: self._may_hedge(endpoint)
+                        )
+                    else:
+                        response = await send()
+                except BaseException as e:
+                    metrics.upstream_finished(endpoint, started, error=e)
+                    if permit is not None and isinstance(e, httpx.TimeoutException):
+                        permit.done(overloaded=True)
+                    raise
+                if span is not None:
+                    span.set_attribute("http.response.status_code", response.status_code)
+                    span.set_attribute("http.response.body.size", len(response.content))
+            metrics.upstream_finished(endpoint, started, response.status_code, len(response.content))
+            if permit is not None:
+                permit.done(response.status_code)
+
+        if self.debug:
+            logger.debug(f"Grafana API 응답 상태: {response.status_code} ({response.http_version})")
+
+        response.raise_for_status()
+        return response
+
+    async def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                       json_data: Optional[Dict[str, Any]] = None,
+                       coalesce: Optional[bool] = None,
+                       expected_statuses: Collection[int] = ()) -> Tuple[Any, int]:
+        """
+        Grafana API에 요청을 보내고 파싱된 응답과 응답 본문 크기를 반환합니다.
+
+        Args:
+            method: HTTP 메서드 (GET, POST, PUT, DELETE)
+            path: API 경로
+            params: URL 매개변수
+            json_data: 요청 본문 데이터
+            coalesce: 동일 요청 합치기 여부 (None이면 GET/HEAD만 합침)
+            expected_statuses: 호출한 쪽이 처리하는 오류 상태 코드 (예외는 그대로 올리고 디버그로만 기록)
+
+        Returns:
+            (응답 데이터, 응답 본문 바이트 수)
+        """
         try:
-            response = self.http_client.request(
-                method=method,
-                url=url,
-                params=params,
-                json=json_data
-            )
-            
+            response = await self._send(method, path, params=params, json_data=json_data, coalesce=coalesce)
+
             if self.debug:
-                logger.debug(f"Grafana API 응답 상태: {response.status_code}")
                 logger.debug(f"Grafana API 응답 내용: {response.text[:1000]}")
-            
-            response.raise_for_status()
-            
+
             # 응답이 JSON인 경우 파싱
             if response.headers.get("content-type", "").startswith("application/json"):
-                return response.json()
-            
-            return response.text
-        
+                return codec.loads(response.content), len(response.content)
+
+            return response.text, len(response.content)
+
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP 오류: {e.response.status_code} - {e.response.text}")
+            if e.response.status_code in expected_statuses:
+                logger.debug(f"HTTP 오류: {e.response.status_code} - {e.response.text}")
+            else:
+                logger.error(f"HTTP 오류: {e.response.status_code} - {e.response.text}")
             raise
         except httpx.HTTPError as e:
             logger.error(f"HTTP 요청 오류: {str(e)}")
@@ -94,117 +284,464 @@ class GrafanaClient:
             logger.error(f"요청 중 오류 발생: {str(e)}")
             raise
 
-    # Dashboard 관련 메서드
-    def search_dashboards(self, query: Optional[str] = None, 
-                         tags: Optional[List[str]] = None, 
-                         folder_ids: Optional[List[int]] = None,
-                         limit: int = 100) -> List[Dict[str, Any]]:
+    async def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                      json_data: Optional[Dict[str, Any]] = None, coalesce: Optional[bool] = None,
+                      expected_statuses: Collection[int] = ()) -> Any:
         """
-        대시보드 검색
-        
+        Grafana API에 요청을 보냅니다.
+
         Args:
-            query: 검색 쿼리
-            tags: 태그 필터
-            folder_ids: 폴더 ID 필터
-            limit: 결과 제한
-            
+            method: HTTP 메서드 (GET, POST, PUT, DELETE)
+            path: API 경로
+            params: URL 매개변수
+            json_data: 요청 본문 데이터
+            coalesce: 동일 요청 합치기 여부 (None이면 GET/HEAD만 합침)
+            expected_statuses: 호출한 쪽이 처리하는 오류 상태 코드 (오류 로그를 남기지 않음)
+
         Returns:
-            대시보드 목록
+            응답 데이터 (JSON)
         """
+        data, _ = await self._request(method, path, params=params, json_data=json_data, coalesce=coalesce,
+                                      expected_statuses=expected_statuses)
+        return data
+
+    async def _cached_get(self, endpoint: str, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        응답 캐시를 거쳐 GET 요청을 보냅니다.
+
+        Args:
+            endpoint: 캐시 TTL을 결정하는 엔드포인트 이름 (search, datasource 등)
+            path: API 경로
+            params: URL 매개변수
+
+        Returns:
+            응답 데이터 (JSON)
+        """
+        cache = self.cache
+        if cache is None or not cache.enabled_for(endpoint):
+            return await self.request("GET", path, params=params)
+
+        key = make_key(endpoint, path, params, self.cache_namespace)
+        entry = cache.get(key)
+        if entry is not None:
+            cache.record_hit(key)
+            return entry.value
+
+        data, size = await self._request("GET", path, params=params)
+        cache.set(key, data, size)
+        return data
+
+    # Dashboard 관련 메서드
+    def _search_params(self, query: Optional[str], tags: Optional[List[str]],
+                       folder_ids: Optional[List[int]], limit: int,
+                       page: Optional[int] = None) -> Dict[str, Any]:
+        """`/api/search` 요청 매개변수를 만듭니다."""
         params = {
             "type": "dash-db",
             "limit": limit
         }
-        
+
         if query:
             params["query"] = query
         if tags:
             params["tag"] = tags
         if folder_ids:
             params["folderIds"] = folder_ids
-        
-        return self.request("GET", "/api/search", params=params)
-    
-    def get_dashboard_by_uid(self, uid: str) -> Dict[str, Any]:
+        if page is not None:
+            params["page"] = page
+
+        return params
+
+    async def search_dashboards(self, query: Optional[str] = None,
+                                tags: Optional[List[str]] = None,
+                                folder_ids: Optional[List[int]] = None,
+                                limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        대시보드 검색
+
+        Args:
+            query: 검색 쿼리
+            tags: 태그 필터
+            folder_ids: 폴더 ID 필터
+            limit: 결과 제한
+
+        Returns:
+            대시보드 목록
+        """
+        params = self._search_params(query, tags, folder_ids, limit)
+        return await self._cached_get("search", "/api/search", params=params)
+
+    async def search_dashboards_page(self, query: Optional[str] = None,
+                                     tags: Optional[List[str]] = None,
+                                     folder_ids: Optional[List[int]] = None,
+                                     page: int = 1, page_size: int = SEARCH_PAGE_SIZE,
+                                     use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        대시보드 검색 결과의 한 페이지 조회
+
+        Args:
+            query: 검색 쿼리
+            tags: 태그 필터
+            folder_ids: 폴더 ID 필터
+            page: 페이지 번호 (1부터)
+            page_size: 페이지 크기 (Grafana 최대 5000)
+            use_cache: 응답 캐시 사용 여부
+
+        Returns:
+            대시보드 목록 (page_size보다 짧으면 마지막 페이지)
+        """
+        params = self._search_params(query, tags, folder_ids, page_size, page=page)
+        if use_cache:
+            return await self._cached_get("search", "/api/search", params=params) or []
+        return await self.request("GET", "/api/search", params=params) or []
+
+    async def iter_search_pages(self, query: Optional[str] = None,
+                                tags: Optional[List[str]] = None,
+                                folder_ids: Optional[List[int]] = None,
+                                page_size: int = SEARCH_PAGE_SIZE, start_page: int = 1,
+                                use_cache: bool = True) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        대시보드 검색 결과를 페이지 단위로 순회
+
+        현재 페이지를 넘겨주는 동안 다음 페이지를 미리 요청하므로, 첫 페이지는 바로 받고
+        이후 페이지는 처리 시간과 겹쳐 받습니다. 메모리에는 최대 두 페이지만 유지합니다.
+
+        Args:
+            query: 검색 쿼리
+            tags: 태그 필터
+            folder_ids: 폴더 ID 필터
+            page_size: 페이지 크기 (Grafana 최대 5000)
+            start_page: 시작 페이지 번호
+            use_cache: 응답 캐시 사용 여부
+
+        Returns:
+            페이지(대시보드 목록) 비동기 이터레이터
+        """
+        def fetch(page: int):
+            return asyncio.ensure_future(self.search_dashboards_page(
+                query, tags, folder_ids, page=page, page_size=page_size, use_cache=use_cache
+            ))
+
+        page = start_page
+        pending = fetch(page)
+        try:
+            while True:
+                hits = await pending
+                pending = None
+                if len(hits) >= page_size:
+                    pending = fetch(page + 1)
+                if hits:
+                    yield hits
+                if pending is None:
+                    return
+                page += 1
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def iter_dashboards(self, query: Optional[str] = None,
+                              tags: Optional[List[str]] = None,
+                              folder_ids: Optional[List[int]] = None,
+                              page_size: int = SEARCH_PAGE_SIZE,
+                              use_cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        검색 결과 대시보드를 하나씩 순회 (`iter_search_pages` 참고)
+
+        Returns:
+            대시보드 항목 비동기 이터레이터
+        """
+        async for hits in self.iter_search_pages(query, tags, folder_ids, page_size=page_size,
+                                                 use_cache=use_cache):
+            for hit in hits:
+                yield hit
+
+    async def get_dashboard_by_uid(self, uid: str) -> Dict[str, Any]:
         """
         UID로 대시보드 가져오기
-        
+
         Args:
             uid: 대시보드 UID
-            
+
         Returns:
             대시보드 데이터
         """
-        return self.request("GET", f"/api/dashboards/uid/{uid}")
-    
-    def get_dashboard_screenshot(self, dashboard_uid: str, panel_id: Optional[int] = None, 
-                               width: int = 1000, height: int = 500, 
-                               from_time: Optional[str] = None, to_time: Optional[str] = None, 
-                               theme: str = "light") -> bytes:
+        path = f"/api/dashboards/uid/{uid}"
+        if self.recent_dashboards is not None:
+            self.recent_dashboards.record(uid)
+        cache = self.cache
+        if cache is None or not cache.enabled_for("dashboard"):
+            return await self.request("GET", path)
+
+        key = make_key("dashboard", path, namespace=self.cache_namespace)
+        entry = cache.get(key)
+        if entry is not None:
+            if await self._is_dashboard_current(uid, key, entry):
+                cache.record_hit(key)
+                return entry.value
+            cache.record_miss(key)
+
+        data, size = await self._request("GET", path)
+        version = data.get("meta", {}).get("version") if isinstance(data, dict) else None
+        cache.set(key, data, size, version=version)
+        return data
+
+    async def _is_dashboard_current(self, uid: str, key, entry: CacheEntry) -> bool:
+        """
+        캐시된 대시보드가 최신 버전인지 확인합니다.
+
+        `dashboard_revalidate_after` 이내에 확인한 항목은 그대로 사용하고, 그 외에는
+        버전 목록 API로 최신 버전만 가볍게 조회해 meta.version과 비교합니다.
         """
-        대시보드 또는 패널 스크린샷 가져오기
-        
+        if time.monotonic() - entry.validated_at < self.dashboard_revalidate_after:
+            return True
+        if entry.version is None:
+            return False
+
+        self.cache.revalidations += 1
+        try:
+            latest = await self.get_latest_dashboard_version(uid)
+        except httpx.HTTPError:
+            # 버전 조회 권한이 없거나 실패하면 전체 대시보드를 다시 가져옵니다
+            latest = None
+
+        if latest is not None and latest == entry.version:
+            self.cache.touch(key)
+            return True
+
+        self.cache.revalidation_misses += 1
+        return False
+
+    async def get_dashboard_versions(self, uid: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        대시보드 버전 목록 가져오기 (최신 버전부터)
+
         Args:
-            dashboard_uid: 대시보드 UID
-            panel_id: 패널 ID (None인 경우 전체 대시보드)
-            width: 이미지 너비
-            height: 이미지 높이
-            from_time: 시작 시간 (예: "now-6h")
-            to_time: 종료 시간 (예: "now")
-            theme: 테마 (light 또는 dark)
-            
+            uid: 대시보드 UID
+            limit: 가져올 버전 수
+
         Returns:
-            스크린샷 이미지 바이너리 데이터
+            버전 정보 목록
         """
-        url = f"/api/dashboards/uid/{dashboard_uid}/panels"
-        
-        if panel_id is not None:
-            url = f"{url}/{panel_id}/render"
-        else:
-            url = f"/render/d-solo/{dashboard_uid}"
-            
+        data = await self.request("GET", f"/api/dashboards/uid/{uid}/versions", params={"limit": limit})
+        # Grafana 11부터는 {"versions": [...], "continueToken": ...} 형식으로 응답합니다
+        if isinstance(data, dict):
+            return data.get("versions", [])
+        return data or []
+
+    async def get_latest_dashboard_version(self, uid: str) -> Optional[int]:
+        """
+        대시보드의 최신 버전 번호 가져오기
+
+        Args:
+            uid: 대시보드 UID
+
+        Returns:
+            최신 버전 번호 (버전 정보가 없으면 None)
+        """
+        versions = await self.get_dashboard_versions(uid, limit=1)
+        if not versions:
+            return None
+        return versions[0].get("version")
+
+    async def get_dashboard_version(self, uid: str, version: int) -> Dict[str, Any]:
+        """
+        특정 버전의 대시보드 모델 가져오기
+
+        저장된 버전은 바뀌지 않으므로 버전별로 캐시합니다. 응답 캐시에 같은 버전의 현재 대시보드가
+        있으면 요청하지 않고 그 모델을 사용합니다.
+
+        Args:
+            uid: 대시보드 UID
+            version: 버전 번호
+
+        Returns:
+            대시보드 모델 (`dashboard` 필드 내용)
+        """
+        cache = self.cache
+        if cache is not None and cache.enabled_for("dashboard"):
+            key = make_key("dashboard", f"/api/dashboards/uid/{uid}", namespace=self.cache_namespace)
+            entry = cache.get(key)
+            if entry is not None and entry.version == version and isinstance(entry.value, dict):
+                cache.record_hit(key)
+                return entry.value.get("dashboard", {})
+
+        data = await self._cached_get("dashboard_version", f"/api/dashboards/uid/{uid}/versions/{version}")
+        return data.get("data", {}) if isinstance(data, dict) else {}
+
+    def _render_request(self, dashboard_uid: str, panel_id: Optional[int], width: int, height: int,
+                        from_time: Optional[str], to_time: Optional[str],
+                        theme: str, scale: float = 1.0) -> Tuple[str, Dict[str, Any]]:
+        """렌더링 API 경로와 매개변수를 만듭니다."""
         params = {
             "width": width,
             "height": height,
             "theme": theme
         }
-        
+        if scale != 1.0:
+            # 렌더러의 deviceScaleFactor (출력 픽셀 = 너비/높이 x scale)
+            params["scale"] = scale
+
+        # 패널은 d-solo, 전체 대시보드는 d 경로로 렌더링합니다
+        if panel_id is not None:
+            url = f"/render/d-solo/{dashboard_uid}"
+            params["panelId"] = panel_id
+        else:
+            url = f"/render/d/{dashboard_uid}"
+
         if from_time:
             params["from"] = from_time
         if to_time:
             params["to"] = to_time
-            
+
+        return url, params
+
+    async def get_dashboard_screenshot(self, dashboard_uid: str, panel_id: Optional[int] = None,
+                                       width: int = 1000, height: int = 500,
+                                       from_time: Optional[str] = None, to_time: Optional[str] = None,
+                                       theme: str = "light") -> bytes:
+        """
+        대시보드 또는 패널 스크린샷 가져오기
+
+        Args:
+            dashboard_uid: 대시보드 UID
+            panel_id: 패널 ID (None인 경우 전체 대시보드)
+            width: 이미지 너비
+            height: 이미지 높이
+            from_time: 시작 시간 (예: "now-6h")
+            to_time: 종료 시간 (예: "now")
+            theme: 테마 (light 또는 dark)
+
+        Returns:
+            스크린샷 이미지 바이너리 데이터
+        """
+        url, params = self._render_request(dashboard_uid, panel_id, width, height, from_time, to_time, theme)
+
         # 바이너리 응답을 직접 처리
-        full_url = urljoin(self.base_url, url)
-        
         try:
-            response = self.http_client.request(
-                method="GET",
-                url=full_url,
-                params=params
-            )
-            
-            response.raise_for_status()
+            response = await self._send("GET", url, params=params)
             return response.content
-            
+
         except httpx.HTTPStatusError as e:
             logger.error(f"스크린샷 요청 오류: {e.response.status_code} - {e.response.text}")
             raise
         except Exception as e:
             logger.error(f"스크린샷 요청 중 오류 발생: {str(e)}")
             raise
-    
-    def update_dashboard(self, dashboard_model: Dict[str, Any], message: str = "Updated via MCP", 
-                        folder_id: Optional[int] = None, overwrite: bool = False) -> Dict[str, Any]:
+
+    async def stream_dashboard_screenshot(self, dashboard_uid: str, panel_id: Optional[int] = None,
+                                          width: int = 1000, height: int = 500,
+                                          from_time: Optional[str] = None, to_time: Optional[str] = None,
+                                          theme: str = "light", scale: float = 1.0,
+                                          chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+                                          timeout: Optional[float] = None,
+                                          on_slot: Optional[Callable[[], None]] = None) -> AsyncIterator[bytes]:
+        """
+        대시보드 또는 패널 스크린샷을 청크 단위로 스트리밍
+
+        응답 본문을 한 번에 메모리에 올리지 않고 `chunk_size` 단위로 넘겨줍니다.
+        `scale` 외의 매개변수는 `get_dashboard_screenshot`과 같습니다.
+
+        Args:
+            scale: 렌더러 배율 (deviceScaleFactor)
+            timeout: 렌더링 제한 시간 (초, 요청 제한의 자리를 얻은 뒤부터 재며 넘으면 asyncio.TimeoutError)
+            on_slot: 요청 제한의 자리를 얻었을 때 호출할 함수 (이후 작업의 제한 시간을 같이 재는 데 사용)
+
+        Returns:
+            이미지 바이트 청크 이터레이터
+        """
+        url, params = self._render_request(dashboard_uid, panel_id, width, height, from_time, to_time,
+                                           theme, scale)
+
+        if self.debug:
+            logger.debug(f"Grafana 렌더링 스트림 요청: {url} {json.dumps(params)}")
+
+        # 스트리밍은 이미 넘긴 청크를 되돌릴 수 없으므로 재시도하지 않고 브레이커만 적용합니다
+        if self.resilience is not None:
+            self.resilience.guard()
+        error: Optional[BaseException] = None
+        try:
+            async with self._slot(url) as permit:
+                endpoint = endpoint_class(url)
+                started = metrics.upstream_started(endpoint)
+                status_code: Optional[int] = None
+                failure: Optional[BaseException] = None
+                size = 0
+                # 제한 시간은 자리를 얻은 뒤부터 잽니다 (대기열에서 기다린 시간은 넣지 않음)
+                deadline = None if timeout is None else time.monotonic() + timeout
+                if on_slot is not None:
+                    on_slot()
+
+                async def bounded(awaitable):
+                    if deadline is None:
+                        return await awaitable
+                    return await asyncio.wait_for(awaitable, max(0.0, deadline - time.monotonic()))
+
+                try:
+                    request = self.http_client.build_request("GET", urljoin(self.base_url, url), params=params)
+                    response = await bounded(self.http_client.send(request, stream=True))
+                    try:
+                        status_code = response.status_code
+                        if response.is_error:
+                            await bounded(response.aread())
+                            if permit is not None:
+                                permit.done(response.status_code)
+                            response.raise_for_status()
+                        chunks = response.aiter_bytes(chunk_size)
+                        while True:
+                            try:
+                                chunk = await bounded(chunks.__anext__())
+                            except StopAsyncIteration:
+                                break
+                            size += len(chunk)
+                            yield chunk
+                        # 렌더링의 지연 시간은 본문을 모두 받을 때까지입니다
+                        if permit is not None:
+                            permit.done(response.status_code)
+                    finally:
+                        await response.aclose()
+                except BaseException as e:
+                    if status_code is None:
+                        failure = e
+                    if permit is not None and isinstance(e, (httpx.TimeoutException, asyncio.TimeoutError)):
+                        permit.done(overloaded=True)
+                    raise
+                finally:
+                    metrics.upstream_finished(
+                        endpoint, started, status_code, size if status_code is not None else None, failure
+                    )
+
+        except httpx.HTTPStatusError as e:
+            error = e
+            logger.error(f"스크린샷 요청 오류: {e.response.status_code} - {e.response.text}")
+            raise
+        except asyncio.TimeoutError as e:
+            error = e
+            logger.warning(f"스크린샷 요청이 제한 시간({timeout}s)을 넘었습니다: {url}")
+            raise
+        except BaseException as e:
+            error = e
+            if not isinstance(e, (asyncio.CancelledError, GeneratorExit)):
+                logger.error(f"스크린샷 요청 중 오류 발생: {str(e)}")
+            raise
+        finally:
+            if self.resilience is not None:
+                self.resilience.record(error)
+
+    async def update_dashboard(self, dashboard_model: Dict[str, Any], message: str = "Updated via MCP",
+                               folder_id: Optional[int] = None, overwrite: bool = False,
+                               folder_uid: Optional[str] = None,
+                               expected_statuses: Collection[int] = ()) -> Dict[str, Any]:
         """
         대시보드 업데이트 또는 생성
-        
+
         Args:
             dashboard_model: 대시보드 모델
             message: 변경 메시지
             folder_id: 폴더 ID
             overwrite: 덮어쓰기 여부
-            
+            folder_uid: 폴더 UID (인스턴스가 달라도 유지되므로 옮길 때는 ID 대신 사용)
+            expected_statuses: 호출한 쪽이 처리하는 오류 상태 코드 (예: 건너뛸 충돌 412)
+
         Returns:
             업데이트 결과
         """
@@ -213,42 +750,89 @@ class GrafanaClient:
             "message": message,
             "overwrite": overwrite
         }
-        
+
         if folder_id is not None:
             payload["folderId"] = folder_id
-        
-        return self.request("POST", "/api/dashboards/db", json_data=payload)
+        if folder_uid is not None:
+            payload["folderUid"] = folder_uid
+
+        result = await self.request("POST", "/api/dashboards/db", json_data=payload,
+                                    expected_statuses=expected_statuses)
+        self._invalidate_dashboard(result.get("uid") if isinstance(result, dict) else None)
+        self._invalidate_dashboard(dashboard_model.get("uid"))
+        return result
+
+    def _invalidate_dashboard(self, uid: Optional[str]):
+        """대시보드 쓰기 후 해당 대시보드와 검색 결과 캐시를 무효화합니다."""
+        if self.cache is None:
+            return
+        if uid:
+            self.cache.invalidate(make_key("dashboard", f"/api/dashboards/uid/{uid}", namespace=self.cache_namespace))
+        # 제목, 태그, 폴더가 바뀌었을 수 있으므로 검색 결과는 모두 버립니다
+        self.cache.invalidate_endpoint("search")
 
     # 데이터소스 관련 메서드
-    def list_datasources(self) -> List[Dict[str, Any]]:
+    async def query_datasources(self, queries: List[Dict[str, Any]], from_time: str = "now-6h",
+                                to_time: str = "now") -> Dict[str, Any]:
+        """
+        여러 데이터소스 쿼리를 한 번의 `/api/ds/query` 요청으로 실행
+
+        쿼리 실행은 부수 효과가 없으므로 POST지만 동일한 진행 중 요청은 하나로 합칩니다.
+
+        Args:
+            queries: 쿼리 목록 (각 쿼리에 refId와 datasource 포함)
+            from_time: 시작 시간
+            to_time: 종료 시간
+
+        Returns:
+            refId별 결과 (`{"results": {...}}`)
+        """
+        payload = {
+            "queries": queries,
+            "from": from_time,
+            "to": to_time
+        }
+        try:
+            return await self.request("POST", "/api/ds/query", json_data=payload, coalesce=True)
+        except httpx.HTTPStatusError as e:
+            # 일부 쿼리가 실패하면 Grafana는 4xx/5xx와 함께 refId별 결과를 반환합니다
+            try:
+                body = codec.loads(e.response.content)
+            except codec.decode_errors():
+                raise e
+            if isinstance(body, dict) and "results" in body:
+                return body
+            raise
+
+    async def list_datasources(self) -> List[Dict[str, Any]]:
         """
         데이터소스 목록 조회
-        
+
         Returns:
             데이터소스 목록
         """
-        return self.request("GET", "/api/datasources")
-    
-    def get_datasource_by_uid(self, uid: str) -> Dict[str, Any]:
+        return await self._cached_get("datasource", "/api/datasources")
+
+    async def get_datasource_by_uid(self, uid: str) -> Dict[str, Any]:
         """
         UID로 데이터소스 가져오기
-        
+
         Args:
             uid: 데이터소스 UID
-            
+
         Returns:
             데이터소스 데이터
         """
-        return self.request("GET", f"/api/datasources/uid/{uid}")
-    
-    def get_datasource_by_name(self, name: str) -> Dict[str, Any]:
+        return await self._cached_get("datasource", f"/api/datasources/uid/{uid}")
+
+    async def get_datasource_by_name(self, name: str) -> Dict[str, Any]:
         """
         이름으로 데이터소스 가져오기
-        
+
         Args:
             name: 데이터소스 이름
-            
+
         Returns:
             데이터소스 데이터
         """
-        return self.request("GET", f"/api/datasources/name/{name}") 
\ No newline at end of file
+        return await self._cached_get("datasource", f"/api/datasources/name/{name}")
@@ -0,0 +1,108 @@
+"""
+JSON 인코딩/디코딩 계층
+
+설치된 라이브러리 중 가장 빠른 구현(orjson → msgspec → 표준 json)을 골라 사용합니다.
+서버 응답, STDIO 입출력, Grafana API 응답 파싱이 모두 이 모듈을 거치므로, 빠른 구현을
+설치하면 (`pip install 'grafana-mcp-python[speedups]'`) 코드 변경 없이 전체 경로가 빨라집니다.
+"""
+import json
+import logging
+import importlib.util
+from typing import Any, Callable, Optional, Tuple, Type, Union
+
+logger = logging.getLogger("mcp-codec")
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+class _Codec:
+    """백엔드별 인코딩/디코딩 함수 묶음"""
+
+    def __init__(self, name: str, dumps: Callable[[Any], bytes], loads: Callable[[Union[bytes, str]], Any],
+                 decode_errors: Tuple[Type[BaseException], ...]):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+        self.decode_errors = decode_errors
+
+def _orjson_codec() -> _Codec:
+    import orjson
+
+    # 표준 json처럼 정수 키 등 문자열이 아닌 dict 키를 허용합니다
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=options)
+
+    return _Codec("orjson", dumps, orjson.loads, (orjson.JSONDecodeError,))
+
+def _msgspec_codec() -> _Codec:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+    return _Codec("msgspec", encoder.encode, decoder.decode, (msgspec.DecodeError,))
+
+def _json_codec() -> _Codec:
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(value: Any) -> bytes:
+        return encoder.encode(value).encode("utf-8")
+
+    return _Codec("json", dumps, json.loads, (json.JSONDecodeError,))
+
+_FACTORIES = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _json_codec,
+}
+
+def available_backends() -> Tuple[str, ...]:
+    """설치되어 사용할 수 있는 백엔드 목록 (빠른 순)"""
+    return tuple(name for name in BACKENDS if name == "json" or importlib.util.find_spec(name) is not None)
+
+def _create(name: Optional[str] = None) -> _Codec:
+    if name is None:
+        name = available_backends()[0]
+    if name not in _FACTORIES:
+        raise ValueError(f"Unknown JSON codec: {name}")
+    try:
+        return _FACTORIES[name]()
+    except ImportError:
+        raise ValueError(f"JSON codec is not installed: {name}")
+
+_codec = _create()
+
+def use_backend(name: Optional[str] = None) -> str:
+    """
+    사용할 백엔드를 바꿉니다.
+
+    Args:
+        name: orjson, msgspec, json (None이면 설치된 것 중 가장 빠른 백엔드)
+
+    Returns:
+        선택된 백엔드 이름
+    """
+    global _codec
+    _codec = _create(name)
+    logger.debug(f"JSON codec: {_codec.name}")
+    return _codec.name
+
+def backend() -> str:
+    """현재 백엔드 이름"""
+    return _codec.name
+
+def dumps(value: Any) -> bytes:
+    """값을 UTF-8 JSON 바이트로 인코딩합니다."""
+    return _codec.dumps(value)
+
+def dumps_str(value: Any) -> str:
+    """값을 JSON 문자열로 인코딩합니다."""
+    return _codec.dumps(value).decode("utf-8")
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """JSON 바이트 또는 문자열을 디코딩합니다."""
+    return _codec.loads(data)
+
+def decode_errors() -> Tuple[Type[BaseException], ...]:
+    """현재 백엔드의 디코딩 오류 타입 (표준 json 오류도 포함)"""
+    return _codec.decode_errors + (json.JSONDecodeError,)
@@ -2,10 +2,34 @@
 Grafana 클라이언트 컨텍스트 관리
 """
 import os
-from typing import Optional, Dict, Any
+import asyncio
+import tempfile
+from typing import Optional, Dict, Any, List
 import logging
 from urllib.parse import urlparse
-from .client import GrafanaClient
+from .client import (
+    GrafanaClient,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_KEEPALIVE_EXPIRY,
+)
+from .cache import ResponseCache, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
+from .shared_cache import SharedCache
+from .limits import GrafanaLimits, DEFAULT_MAX_UPSTREAM_CONCURRENCY
+from .resilience import (
+    Resilience, RetryPolicy, CircuitBreaker, Hedger,
+    DEFAULT_RETRIES, DEFAULT_BREAKER_THRESHOLD, DEFAULT_BREAKER_RESET, DEFAULT_HEDGE_MIN_DELAY
+)
+from .image_cache import ImageCache, DEFAULT_IMAGE_CACHE_MAX_BYTES, DEFAULT_TIME_BUCKET
+from .streaming import ResourceStore
+from .imaging import Transcoder, DEFAULT_TRANSCODE_WORKERS
+from .index import DashboardIndex, DEFAULT_REFRESH_INTERVAL, DEFAULT_CHECK_BUDGET
+from .warmup import Warmup, RecentDashboards, DEFAULT_WARMUP_CONCURRENCY
+from . import tenants
+from .tenants import (
+    ClientPool, Tenant,
+    DEFAULT_MAX_TENANTS, DEFAULT_TENANT_IDLE_TIMEOUT, DEFAULT_TENANT_MAX_CONNECTIONS
+)
 
 logger = logging.getLogger("grafana-context")
 
@@ -13,9 +37,40 @@ logger = logging.getLogger("grafana-context")
 GRAFANA_URL_ENV = "GRAFANA_URL"
 GRAFANA_API_KEY_ENV = "GRAFANA_API_KEY"
 
+# 이미지 캐시를 끈 경우 렌더링 결과를 잠시 보관하는 임시 저장소 크기
+DEFAULT_RENDER_SPOOL_MAX_BYTES = 64 * 1024 * 1024
+
 # 기본 Grafana URL
 DEFAULT_GRAFANA_URL = "http://localhost:3000"
 
+def default_cache_dir() -> str:
+    """기본 캐시 디렉터리 ($XDG_CACHE_HOME/grafana-mcp)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "grafana-mcp")
+
+def instance_api_key_env(name: str) -> str:
+    """인스턴스 API 키를 읽을 환경 변수 이름 (예: prod → GRAFANA_API_KEY_PROD)"""
+    return f"{GRAFANA_API_KEY_ENV}_{name.upper().replace('-', '_')}"
+
+def parse_instances(values) -> Dict[str, str]:
+    """
+    `--instance` 값(`이름=URL`, 쉼표로 여러 개)을 파싱합니다.
+
+    Returns:
+        인스턴스 이름 → Grafana URL
+    """
+    instances: Dict[str, str] = {}
+    for value in values or ():
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            name, sep, url = item.partition("=")
+            if not sep or not name.strip() or not url.strip():
+                raise ValueError(f"Invalid instance '{item}' (expected name=url)")
+            instances[name.strip()] = url.strip().rstrip("/")
+    return instances
+
 def get_grafana_info_from_env() -> tuple[str, str]:
     """환경 변수에서 Grafana 정보 추출"""
     url = os.environ.get(GRAFANA_URL_ENV, DEFAULT_GRAFANA_URL).rstrip('/')
@@ -42,10 +97,80 @@ class GrafanaContext:
         self._grafana_api_key = None
         self._debug_mode = False
         self._client = None
+        self._cache = None
+        self._image_cache = None
+        self._render_store = None
+        self._render_time_bucket = DEFAULT_TIME_BUCKET
+        self._resources = None
+        self._transcoder = None
+        self._index = None
+        self._limits = None
+        self._resilience = None
+        self._instances: Dict[str, tuple] = {}
+        self._tenant_url_allowlist: List[str] = []
+        self._tenant_org_switching = False
+        self._pool = None
+        self._client_options: Dict[str, Any] = {}
+        self._recent = None
+        self._warmup = None
         self._initialized = True
     
-    def initialize(self, url: Optional[str] = None, api_key: Optional[str] = None, debug: bool = False):
-        """컨텍스트 초기화"""
+    def initialize(self, url: Optional[str] = None, api_key: Optional[str] = None, debug: bool = False,
+                   max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                   max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                   keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+                   http2: bool = True,
+                   cache_enabled: bool = True,
+                   cache_max_entries: int = DEFAULT_MAX_ENTRIES,
+                   cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                   cache_ttls: Optional[Dict[str, float]] = None,
+                   dashboard_revalidate_after: float = 0.0,
+                   coalesce: bool = True,
+                   image_cache_enabled: bool = True,
+                   image_cache_dir: Optional[str] = None,
+                   image_cache_max_bytes: int = DEFAULT_IMAGE_CACHE_MAX_BYTES,
+                   render_time_bucket: int = DEFAULT_TIME_BUCKET,
+                   transcode_workers: int = DEFAULT_TRANSCODE_WORKERS,
+                   search_index: bool = False,
+                   index_refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+                   index_check_budget: int = DEFAULT_CHECK_BUDGET,
+                   shared_state_dir: Optional[str] = None,
+                   upstream_limits: bool = True,
+                   rate_limits: Optional[Dict[str, float]] = None,
+                   adaptive_limits: bool = True,
+                   max_upstream_concurrency: int = DEFAULT_MAX_UPSTREAM_CONCURRENCY,
+                   retries: int = DEFAULT_RETRIES,
+                   circuit_breaker: bool = True,
+                   breaker_threshold: int = DEFAULT_BREAKER_THRESHOLD,
+                   breaker_reset: float = DEFAULT_BREAKER_RESET,
+                   hedge: bool = False,
+                   hedge_min_delay: float = DEFAULT_HEDGE_MIN_DELAY,
+                   instances: Optional[Dict[str, str]] = None,
+                   max_tenants: int = DEFAULT_MAX_TENANTS,
+                   tenant_idle_timeout: float = DEFAULT_TENANT_IDLE_TIMEOUT,
+                   tenant_max_connections: int = DEFAULT_TENANT_MAX_CONNECTIONS,
+                   tenant_url_allowlist: Optional[List[str]] = None,
+                   tenant_org_switching: bool = False,
+                   warmup_dashboards: Optional[List[str]] = None,
+                   warmup_tags: Optional[List[str]] = None,
+                   warmup_recent: int = 0,
+                   warmup_connections: int = 0,
+                   warmup_render_panels: int = 0,
+                   warmup_concurrency: int = DEFAULT_WARMUP_CONCURRENCY):
+        """
+        컨텍스트 초기화
+
+        `shared_state_dir`를 지정하면 응답 캐시의 2단계 저장소(SQLite)와 검색 색인 스냅숏을
+        그 디렉터리에 두어 여러 워커 프로세스가 함께 사용합니다.
+
+        `instances`(이름 → URL)는 요청이 이름으로 고를 수 있는 다른 Grafana 인스턴스이며,
+        API 키는 `GRAFANA_API_KEY_<이름>` 환경 변수에서 읽습니다. 기본 인스턴스가 아닌 테넌트의
+        클라이언트는 최대 `max_tenants`개까지 풀에 두고 캐시와 요청 제한은 함께 씁니다.
+        `X-Grafana-Url` 헤더는 `tenant_url_allowlist`에 있는 주소만 받고, 서버의 API 키로 다른
+        조직을 고르는 것은 `tenant_org_switching`이 참일 때만 허용합니다.
+
+        `warmup_*`를 지정하면 `start_background`에서 연결을 미리 열고 대시보드를 미리 가져옵니다.
+        """
         # 환경 변수나 기본값으로부터 URL과 API 키 설정
         env_url, env_api_key = get_grafana_info_from_env()
         
@@ -67,26 +192,310 @@ class GrafanaContext:
         
         logger.info(f"Grafana URL: {self._grafana_url}, API key set: {bool(self._grafana_api_key)}")
         
+        # 응답 캐시 생성
+        self._cache = None
+        if cache_enabled:
+            shared = None
+            if shared_state_dir:
+                try:
+                    shared = SharedCache(os.path.join(shared_state_dir, "cache.sqlite3"))
+                except Exception as e:
+                    logger.warning(f"Shared cache disabled, cannot use {shared_state_dir}: {e}")
+            self._cache = ResponseCache(
+                max_entries=cache_max_entries,
+                max_bytes=cache_max_bytes,
+                ttls=cache_ttls,
+                shared=shared
+            )
+        
+        # 렌더링 이미지 디스크 캐시 생성
+        self._image_cache = None
+        self._render_time_bucket = render_time_bucket
+        if image_cache_enabled:
+            directory = image_cache_dir or os.path.join(default_cache_dir(), "images")
+            try:
+                self._image_cache = ImageCache(directory, max_bytes=image_cache_max_bytes)
+            except OSError as e:
+                logger.warning(f"Image cache disabled, cannot use {directory}: {e}")
+        
+        # 캐시를 쓰지 않아도 렌더링은 파일로 스트리밍하므로 임시 저장소를 둡니다
+        self._render_store = self._image_cache
+        if self._render_store is None:
+            self._render_store = ImageCache(
+                tempfile.mkdtemp(prefix="grafana-mcp-render-"),
+                max_bytes=DEFAULT_RENDER_SPOOL_MAX_BYTES
+            )
+        
+        # 포맷 변환/축소 워커 풀 (첫 변환 때 워커를 띄움)
+        if self._transcoder is not None:
+            self._transcoder.shutdown()
+        self._transcoder = Transcoder(workers=transcode_workers)
+        
+        # 로컬 대시보드 검색 색인 (수집은 이벤트 루프가 시작된 뒤 start_background에서 시작)
+        self._index = None
+        if search_index:
+            snapshot_path = os.path.join(shared_state_dir, "index.snapshot") if shared_state_dir else None
+            self._index = DashboardIndex(refresh_interval=index_refresh_interval, snapshot_path=snapshot_path,
+                                         check_budget=index_check_budget)
+        
+        # Grafana로 보내는 요청의 속도/동시성 제한
+        self._limits = None
+        if upstream_limits:
+            self._limits = GrafanaLimits(
+                rates=rate_limits,
+                max_concurrency=max_upstream_concurrency,
+                adaptive=adaptive_limits
+            )
+        
+        # 재시도/서킷 브레이커/헤지 요청 (서킷 브레이커는 클라이언트마다 따로 둠)
+        def make_resilience() -> Resilience:
+            return Resilience(
+                retry=RetryPolicy(retries) if retries > 0 else None,
+                breaker=CircuitBreaker(breaker_threshold, breaker_reset) if circuit_breaker else None,
+                hedger=Hedger(min_delay=hedge_min_delay) if hedge else None
+            )
+        self._resilience = make_resilience()
+        
+        # 테넌트 클라이언트도 같은 설정으로 만듭니다
+        self._client_options = dict(
+            debug=self._debug_mode,
+            keepalive_expiry=keepalive_expiry,
+            http2=http2,
+            cache=self._cache,
+            dashboard_revalidate_after=dashboard_revalidate_after,
+            coalesce=coalesce,
+            limits=self._limits
+        )
+        
+        # 이름으로 고를 수 있는 Grafana 인스턴스와 테넌트 클라이언트 풀
+        self._instances = {}
+        for name, instance_url in (instances or {}).items():
+            instance_key = os.environ.get(instance_api_key_env(name), "")
+            if not instance_key:
+                logger.warning(f"Grafana instance '{name}' has no API key ({instance_api_key_env(name)} is not set)")
+            self._instances[name] = (instance_url, instance_key)
+        self._tenant_url_allowlist = list(tenant_url_allowlist or ())
+        self._tenant_org_switching = tenant_org_switching
+        self._pool = ClientPool(
+            lambda tenant: GrafanaClient(
+                base_url=tenant.url,
+                api_key=tenant.api_key,
+                max_connections=tenant_max_connections,
+                max_keepalive_connections=tenant_max_connections,
+                resilience=make_resilience(),
+                org_id=tenant.org_id,
+                cache_namespace=tenant.namespace,
+                **self._client_options
+            ),
+            max_clients=max_tenants,
+            idle_timeout=tenant_idle_timeout
+        )
+        
+        # 기본 인스턴스에서 최근에 조회한 대시보드 기록 (다음 시작 때 미리 가져올 대상)
+        self._recent = RecentDashboards(
+            os.path.join(shared_state_dir or default_cache_dir(), "recent-dashboards.json"),
+            self._grafana_url
+        )
+        
+        # 시작 시 연결/대시보드 미리 준비 (실행은 이벤트 루프가 시작된 뒤 start_background에서)
+        self._warmup = Warmup(
+            dashboard_uids=warmup_dashboards or (),
+            tags=warmup_tags or (),
+            recent=warmup_recent,
+            connections=warmup_connections,
+            render_panels=warmup_render_panels,
+            concurrency=warmup_concurrency,
+            recent_dashboards=self._recent
+        )
+        
         # 클라이언트 생성
         if self._grafana_api_key:
             self._client = GrafanaClient(
                 base_url=self._grafana_url,
                 api_key=self._grafana_api_key,
-                debug=self._debug_mode
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                resilience=self._resilience,
+                recent_dashboards=self._recent,
+                **self._client_options
             )
     
+    def _resolve_tenant(self, selection: Dict[str, Any]) -> Optional[Tenant]:
+        """
+        테넌트 선택을 실제 (URL, 조직, API 키)로 바꿉니다.
+
+        Returns:
+            테넌트 (기본 클라이언트를 쓰면 되면 None)
+        """
+        instance = selection.get("instance")
+        if instance is not None:
+            if instance not in self._instances:
+                raise ValueError(f"Unknown Grafana instance: {instance}")
+            url, api_key = self._instances[instance]
+            server_key = True
+        else:
+            url = selection.get("url")
+            # 서버가 임의의 주소로 요청을 보내고 응답을 돌려주지 않도록 허용한 주소만 받습니다
+            if url and not tenants.url_allowed(url, self._tenant_url_allowlist):
+                raise ValueError(f"Grafana URL is not allowed: {url} (see --tenant-url-allowlist)")
+            url = url or self._grafana_url
+            api_key = selection.get("api_key") or self._grafana_api_key
+            server_key = not selection.get("api_key")
+        org_id = selection.get("org_id")
+        if org_id is not None and server_key and not self._tenant_org_switching:
+            raise ValueError("Switching Grafana organization with the server's API key is disabled "
+                             "(see --tenant-org-switching)")
+        if url.rstrip("/") == self._grafana_url.rstrip("/") and api_key == self._grafana_api_key and org_id is None:
+            return None
+        if not api_key:
+            raise ValueError(f"No API key for Grafana at {url}")
+        return Tenant(url, org_id, api_key)
+    
     @property
     def client(self) -> Optional[GrafanaClient]:
-        """Grafana 클라이언트 반환"""
+        """현재 요청이 고른 테넌트의 Grafana 클라이언트 반환 (고르지 않았으면 기본 클라이언트)"""
         if self._client is None:
             self.initialize()
-        return self._client
+        selection = tenants.current_selection()
+        if selection is None or self._pool is None:
+            return self._client
+        tenant = self._resolve_tenant(selection)
+        return self._client if tenant is None else self._pool.get(tenant)
     
     @property
     def is_initialized(self) -> bool:
         """컨텍스트가 초기화되었는지 확인"""
         return self._client is not None
     
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        """응답 캐시 반환"""
+        return self._cache
+    
+    @property
+    def image_cache(self) -> Optional[ImageCache]:
+        """렌더링 이미지 캐시 반환"""
+        return self._image_cache
+    
+    @property
+    def render_time_bucket(self) -> int:
+        """렌더링 캐시 키의 상대 시간 양자화 단위 (초)"""
+        return self._render_time_bucket
+    
+    def render_options(self) -> Dict[str, Any]:
+        """`render_image`에 넘길 저장소 관련 인자"""
+        return {
+            "image_cache": self._render_store,
+            "use_cache": self._image_cache is not None,
+            "time_bucket": self._render_time_bucket,
+            "transcoder": self._transcoder
+        }
+    
+    @property
+    def resources(self) -> Optional[ResourceStore]:
+        """URL로 제공하는 단기 리소스 저장소 (HTTP 전송에서만 사용 가능)"""
+        return self._resources
+    
+    def enable_resources(self, base_url: Optional[str] = None, secret: Optional[bytes] = None) -> ResourceStore:
+        """
+        HTTP 서버가 리소스 URL을 제공할 수 있을 때 리소스 저장소를 만듭니다.
+
+        Args:
+            base_url: 리소스 URL 앞에 붙일 서버 주소
+            secret: 토큰 서명 키 (여러 워커가 같은 토큰을 확인하려면 모두 같은 값이어야 함)
+        """
+        if self._resources is None:
+            self._resources = ResourceStore(base_url=base_url, secret=secret)
+        return self._resources
+    
+    def image_cache_stats(self) -> Dict[str, Any]:
+        """렌더링 이미지 캐시 통계 반환"""
+        if self._image_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._image_cache.stats()}
+    
+    @property
+    def index(self) -> Optional[DashboardIndex]:
+        """로컬 대시보드 검색 색인 (비활성화되었거나 기본 인스턴스가 아닌 테넌트를 고른 경우 None)"""
+        selection = tenants.current_selection()
+        if selection is not None and self._resolve_tenant(selection) is not None:
+            return None
+        return self._index
+    
+    async def start_background(self):
+        """이벤트 루프가 필요한 백그라운드 작업(검색 색인 수집, 시작 시 준비)을 시작합니다."""
+        if self._index is not None and self._client is not None:
+            self._index.start(self._client)
+        if self._warmup is not None and self._client is not None:
+            self._warmup.start(self._client, self.render_options())
+    
+    def index_stats(self) -> Dict[str, Any]:
+        """검색 색인 통계 반환"""
+        if self._index is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._index.stats()}
+    
+    def transcode_stats(self) -> Dict[str, Any]:
+        """이미지 변환 워커 풀 통계 반환"""
+        if self._transcoder is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._transcoder.stats()}
+    
+    def warmup_stats(self) -> Dict[str, Any]:
+        """시작 시 준비 작업 통계 반환"""
+        if self._warmup is None or not self._warmup.enabled:
+            return {"enabled": False}
+        return {"enabled": True, **self._warmup.stats()}
+    
+    def tenants_stats(self) -> Dict[str, Any]:
+        """테넌트 클라이언트 풀 통계 반환"""
+        if self._pool is None:
+            return {"enabled": False}
+        return {"enabled": True, "instances": sorted(self._instances), **self._pool.stats()}
+    
+    def limits_stats(self) -> Dict[str, Any]:
+        """Grafana 요청 속도/동시성 제한 통계 반환"""
+        if self._limits is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._limits.stats()}
+    
+    def resilience_stats(self) -> Dict[str, Any]:
+        """재시도/서킷 브레이커/헤지 요청 통계 반환"""
+        if self._resilience is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._resilience.stats()}
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """응답 캐시 통계 반환"""
+        if self._cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._cache.stats()}
+    
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """동일 요청 합치기(single-flight) 통계 반환"""
+        if self._client is None or self._client.singleflight is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._client.singleflight.stats()}
+    
+    async def aclose(self):
+        """클라이언트 연결 풀, 변환 워커, 백그라운드 작업 정리"""
+        if self._warmup is not None:
+            await self._warmup.stop()
+        if self._recent is not None:
+            self._recent.save()
+        if self._index is not None:
+            await self._index.stop()
+        if self._transcoder is not None:
+            self._transcoder.shutdown()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._pool is not None:
+            await self._pool.aclose()
+        if self._cache is not None and self._cache.shared is not None:
+            # 남은 쓰기를 처리하는 동안 이벤트 루프를 막지 않도록 스레드에서 닫습니다
+            await asyncio.to_thread(self._cache.shared.close)
+    
     def set_debug_mode(self, debug: bool):
         """디버그 모드 설정"""
         self._debug_mode = debug
@@ -0,0 +1,123 @@
+"""
+대시보드 모델의 구조적 차이 계산
+
+두 JSON 값을 함께 순회하며 바뀐 위치만 `{"op", "path", "old", "new"}` 목록으로 돌려줍니다.
+패널처럼 `id`가 있는 객체 목록은 위치가 아니라 식별자로 짝을 지으므로, 패널 하나를 끼워 넣어도
+뒤쪽 패널 전체가 바뀐 것으로 나오지 않습니다.
+
+경로는 필드 선택자와 비슷하게 `panels[id=4].targets[refId=A].expr` 형식으로 씁니다.
+식별자가 없는 목록의 항목은 `links[0]`처럼 위치로 나타냅니다.
+"""
+from typing import Any, Dict, List, Optional
+
+# 목록 항목의 식별자로 쓸 키 (앞에 있는 것부터 시도)
+IDENTITY_KEYS = ("id", "refId", "uid", "name")
+
+# 버전마다 항상 바뀌어 차이로 보고하지 않는 최상위 필드
+IGNORED_ROOT_KEYS = frozenset({"version"})
+
+class _LimitReached(Exception):
+    """차이 수가 상한을 넘어 계산을 멈춤"""
+
+def _child(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+def _identity_key(old: List[Any], new: List[Any]) -> Optional[str]:
+    """두 목록의 모든 항목이 같은 키로 서로 구분되면 그 키를 반환합니다."""
+    if not old and not new:
+        return None
+    for key in IDENTITY_KEYS:
+        usable = True
+        for items in (old, new):
+            seen = set()
+            for item in items:
+                value = item.get(key) if isinstance(item, dict) else None
+                if value is None or isinstance(value, (dict, list)) or value in seen:
+                    usable = False
+                    break
+                seen.add(value)
+            if not usable:
+                break
+        if usable:
+            return key
+    return None
+
+class _Differ:
+    def __init__(self, max_changes: Optional[int]):
+        self.max_changes = max_changes
+        self.changes: List[Dict[str, Any]] = []
+
+    def emit(self, op: str, path: str, old: Any = None, new: Any = None):
+        if self.max_changes is not None and len(self.changes) >= self.max_changes:
+            raise _LimitReached()
+        change: Dict[str, Any] = {"op": op, "path": path}
+        if op != "add":
+            change["old"] = old
+        if op != "remove":
+            change["new"] = new
+        self.changes.append(change)
+
+    def walk(self, old: Any, new: Any, path: str, ignore=frozenset()):
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key, value in old.items():
+                if key not in new and key not in ignore:
+                    self.emit("remove", _child(path, key), old=value)
+            for key, value in new.items():
+                if key in ignore:
+                    continue
+                if key not in old:
+                    self.emit("add", _child(path, key), new=value)
+                else:
+                    self.walk(old[key], value, _child(path, key))
+        elif isinstance(old, list) and isinstance(new, list):
+            self.walk_list(old, new, path)
+        elif type(old) is not type(new) or old != new:
+            self.emit("replace", path, old=old, new=new)
+
+    def walk_list(self, old: List[Any], new: List[Any], path: str):
+        key = _identity_key(old, new)
+        if key is None:
+            for index in range(min(len(old), len(new))):
+                self.walk(old[index], new[index], f"{path}[{index}]")
+            for index in range(len(new), len(old)):
+                self.emit("remove", f"{path}[{index}]", old=old[index])
+            for index in range(len(old), len(new)):
+                self.emit("add", f"{path}[{index}]", new=new[index])
+            return
+
+        old_items = {item[key]: item for item in old}
+        new_ids = {item[key] for item in new}
+        for item in old:
+            if item[key] not in new_ids:
+                self.emit("remove", f"{path}[{key}={item[key]}]", old=item)
+        for item in new:
+            item_path = f"{path}[{key}={item[key]}]"
+            if item[key] not in old_items:
+                self.emit("add", item_path, new=item)
+            else:
+                self.walk(old_items[item[key]], item, item_path)
+
+def diff_models(old: Dict[str, Any], new: Dict[str, Any],
+                max_changes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    두 대시보드 모델의 차이를 계산합니다.
+
+    Args:
+        old: 기준 대시보드 모델
+        new: 비교할 대시보드 모델
+        max_changes: 돌려줄 최대 변경 수 (넘으면 계산을 멈추고 truncated를 참으로 표시)
+
+    Returns:
+        `changes`(변경 목록), `summary`(종류별 개수), `truncated`
+    """
+    differ = _Differ(max_changes)
+    truncated = False
+    try:
+        differ.walk(old, new, "", IGNORED_ROOT_KEYS)
+    except _LimitReached:
+        truncated = True
+
+    summary = {"add": 0, "remove": 0, "replace": 0}
+    for change in differ.changes:
+        summary[change["op"]] += 1
+    return {"changes": differ.changes, "summary": summary, "truncated": truncated}
@@ -0,0 +1,350 @@
+"""
+Grafana 데이터 프레임 디코딩과 다운샘플링
+
+`/api/ds/query` 응답의 데이터 프레임(JSON)을 열 단위 배열로 바꾸고, 시계열을 목표 점 개수로
+줄입니다. 숫자 열은 `array` 모듈(NumPy가 설치되어 있으면 NumPy 배열)에 담아 파이썬 객체
+리스트보다 메모리를 적게 쓰고, 다운샘플링도 배열 위에서 수행합니다.
+"""
+import math
+import array
+import logging
+import importlib.util
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("grafana-frames")
+
+# NumPy는 불러오는 데 시간이 걸리므로 처음 디코딩할 때 불러옵니다
+_numpy = None
+_numpy_checked = False
+
+def _np():
+    """NumPy 모듈 (설치되어 있지 않으면 None)"""
+    global _numpy, _numpy_checked
+    if not _numpy_checked:
+        if importlib.util.find_spec("numpy") is not None:
+            import numpy
+            _numpy = numpy
+        _numpy_checked = True
+    return _numpy
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax", "none")
+DEFAULT_MAX_POINTS = 1000
+
+# 숫자 열로 취급하는 Grafana 필드 타입
+_NUMERIC_TYPES = frozenset({"number", "time"})
+
+# data.entities에 담겨 오는 특수 값 (JSON은 NaN/Inf를 표현할 수 없음)
+_ENTITY_VALUES = {
+    "NaN": math.nan,
+    "Inf": math.inf,
+    "NegInf": -math.inf,
+}
+
+def numpy_available() -> bool:
+    """NumPy 사용 가능 여부"""
+    return _np() is not None
+
+def _to_column(values: Sequence[Any], field_type: str, entities: Optional[Dict[str, List[int]]]):
+    """JSON 값 목록을 열 배열로 변환합니다 (숫자가 아니면 리스트 그대로)."""
+    if field_type not in _NUMERIC_TYPES:
+        return list(values)
+
+    np = _np()
+    if np is not None:
+        column = np.array([math.nan if v is None else v for v in values], dtype=np.float64)
+    else:
+        column = array.array("d", (math.nan if v is None else v for v in values))
+    for name, indexes in (entities or {}).items():
+        special = _ENTITY_VALUES.get(name)
+        if special is None or not indexes:
+            continue
+        for index in indexes:
+            column[index] = special
+    return column
+
+class Frame:
+    """
+    열 단위로 저장한 데이터 프레임
+
+    숫자/시간 열은 float64 배열, 나머지 열은 파이썬 리스트입니다.
+    """
+
+    def __init__(self, ref_id: str, name: Optional[str], fields: List[Dict[str, Any]],
+                 columns: List[Any]):
+        """
+        Args:
+            ref_id: 쿼리 참조 ID
+            name: 프레임 이름
+            fields: 필드 메타데이터 (name, type, labels, unit)
+            columns: 필드별 값 배열
+        """
+        self.ref_id = ref_id
+        self.name = name
+        self.fields = fields
+        self.columns = columns
+        self.source_rows = self.row_count
+
+    @property
+    def row_count(self) -> int:
+        """행 수"""
+        return len(self.columns[0]) if self.columns else 0
+
+    def time_index(self) -> Optional[int]:
+        """첫 번째 시간 열의 위치"""
+        for index, field in enumerate(self.fields):
+            if field["type"] == "time":
+                return index
+        return None
+
+    def value_indexes(self) -> List[int]:
+        """시간 열을 제외한 숫자 열의 위치"""
+        return [index for index, field in enumerate(self.fields) if field["type"] == "number"]
+
+    def take(self, indexes: Sequence[int]):
+        """주어진 행만 남깁니다."""
+        np = _np()
+        if np is not None:
+            selector = np.asarray(indexes, dtype=np.intp)
+        self.columns = [
+            column[selector] if np is not None and isinstance(column, np.ndarray)
+            else _take(column, indexes)
+            for column in self.columns
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON으로 직렬화할 수 있는 딕셔너리로 변환합니다."""
+        return {
+            "ref_id": self.ref_id,
+            "name": self.name,
+            "fields": self.fields,
+            "columns": [_column_to_list(column, field["type"]) for column, field in zip(self.columns, self.fields)],
+            "rows": self.row_count,
+            "source_rows": self.source_rows,
+            "downsampled": self.row_count < self.source_rows
+        }
+
+def _take(column, indexes: Sequence[int]):
+    if isinstance(column, array.array):
+        return array.array(column.typecode, (column[i] for i in indexes))
+    return [column[i] for i in indexes]
+
+def _column_to_list(column, field_type: str) -> List[Any]:
+    """열을 JSON 값 목록으로 변환합니다 (NaN/Inf는 JSON에 없으므로 None)."""
+    values = column.tolist() if not isinstance(column, list) else column
+    if field_type == "time":
+        return [None if v is None or not math.isfinite(v) else int(v) for v in values]
+    if field_type == "number":
+        return [v if v is None or math.isfinite(v) else None for v in values]
+    return values
+
+def decode_frame(ref_id: str, frame: Dict[str, Any]) -> Frame:
+    """
+    data plane JSON 프레임 하나를 디코딩합니다.
+
+    Args:
+        ref_id: 프레임이 속한 쿼리 참조 ID
+        frame: `{"schema": {...}, "data": {"values": [...]}}` 형태의 프레임
+
+    Returns:
+        열 단위 프레임
+    """
+    schema = frame.get("schema") or {}
+    data = frame.get("data") or {}
+    values = data.get("values") or []
+    entities = data.get("entities") or []
+
+    fields = []
+    columns = []
+    for index, field in enumerate(schema.get("fields") or []):
+        field_type = field.get("type", "other")
+        config = field.get("config") or {}
+        fields.append({
+            "name": config.get("displayNameFromDS") or field.get("name", ""),
+            "type": field_type,
+            "labels": field.get("labels") or {},
+            "unit": config.get("unit")
+        })
+        column_values = values[index] if index < len(values) else []
+        column_entities = entities[index] if index < len(entities) else None
+        columns.append(_to_column(column_values or [], field_type, column_entities))
+
+    return Frame(schema.get("refId") or ref_id, schema.get("name"), fields, columns)
+
+def decode_results(response: Dict[str, Any]) -> Tuple[List[Frame], List[Dict[str, Any]]]:
+    """
+    `/api/ds/query` 응답을 프레임 목록과 쿼리별 오류 목록으로 나눕니다.
+
+    Args:
+        response: `{"results": {"A": {"frames": [...], "error": ...}}}` 형태의 응답
+
+    Returns:
+        (프레임 목록, 오류 목록)
+    """
+    frames = []
+    errors = []
+    for ref_id, result in (response.get("results") or {}).items():
+        if result.get("error"):
+            errors.append({"ref_id": ref_id, "error": result["error"]})
+        for frame in result.get("frames") or []:
+            frames.append(decode_frame(ref_id, frame))
+    return frames, errors
+
+def lttb_indexes(x: Sequence[float], ys: List[Sequence[float]], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets로 남길 행 위치를 고릅니다.
+
+    열이 여러 개면 각 열을 값 범위로 정규화한 삼각형 넓이의 합이 가장 큰 점을 고르므로,
+    공통 시간 열을 유지하면서 모든 열의 모양을 함께 보존합니다.
+
+    Args:
+        x: 시간 열
+        ys: 값 열 목록
+        threshold: 목표 점 개수 (3 이상)
+
+    Returns:
+        오름차순 행 위치 목록
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3 or not ys:
+        return list(range(n))
+
+    np = _np()
+    if np is not None:
+        return _lttb_numpy(np.asarray(x, dtype=np.float64),
+                           [np.asarray(y, dtype=np.float64) for y in ys], threshold)
+
+    spans = []
+    for y in ys:
+        finite = [v for v in y if math.isfinite(v)]
+        spans.append((max(finite) - min(finite)) or 1.0 if finite else 1.0)
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = min(int((i + 1) * every) + 1, n - 1)
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        count = next_end - next_start
+        avg_x = sum(x[next_start:next_end]) / count
+        avg_ys = []
+        for y in ys:
+            finite = [v for v in y[next_start:next_end] if math.isfinite(v)]
+            avg_ys.append(sum(finite) / len(finite) if finite else math.nan)
+
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = 0.0
+            for y, avg_y, span in zip(ys, avg_ys, spans):
+                part = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) / span
+                if math.isfinite(part):
+                    area += part
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+
+    selected.append(n - 1)
+    return selected
+
+def _lttb_numpy(x, ys, threshold: int) -> List[int]:
+    np = _np()
+    n = len(x)
+    matrix = np.vstack(ys)
+    with np.errstate(all="ignore"):
+        spans = np.nanmax(matrix, axis=1) - np.nanmin(matrix, axis=1)
+    spans = np.where(np.isfinite(spans) & (spans > 0), spans, 1.0)[:, None]
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = min(int((i + 1) * every) + 1, n - 1)
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        with np.errstate(all="ignore"):
+            avg_x = x[end:next_end].mean()
+            avg_y = np.nanmean(matrix[:, end:next_end], axis=1)[:, None]
+            areas = np.abs(
+                (x[a] - avg_x) * (matrix[:, start:end] - matrix[:, a:a + 1])
+                - (x[a] - x[start:end]) * (avg_y - matrix[:, a:a + 1])
+            ) / spans
+        areas = np.nansum(areas, axis=0)
+        a = start + int(np.argmax(areas))
+        selected.append(a)
+
+    selected.append(n - 1)
+    return selected
+
+def minmax_indexes(ys: List[Sequence[float]], threshold: int) -> List[int]:
+    """
+    구간마다 최솟값과 최댓값 행을 남깁니다 (스파이크 보존).
+
+    Args:
+        ys: 값 열 목록
+        threshold: 목표 점 개수
+
+    Returns:
+        오름차순 행 위치 목록 (열이 여러 개면 목표보다 약간 많을 수 있음)
+    """
+    n = len(ys[0]) if ys else 0
+    if threshold >= n or threshold < 4 or not ys:
+        return list(range(n))
+
+    np = _np()
+    buckets = max(1, (threshold - 2) // (2 * len(ys)))
+    every = (n - 2) / buckets
+    selected = {0, n - 1}
+    for i in range(buckets):
+        start = int(i * every) + 1
+        end = min(int((i + 1) * every) + 1, n - 1)
+        if start >= end:
+            continue
+        for y in ys:
+            if np is not None:
+                window = np.asarray(y[start:end], dtype=np.float64)
+                if np.isnan(window).all():
+                    continue
+                selected.add(start + int(np.nanargmin(window)))
+                selected.add(start + int(np.nanargmax(window)))
+            else:
+                finite = [(v, j) for j, v in enumerate(y[start:end], start) if math.isfinite(v)]
+                if finite:
+                    selected.add(min(finite)[1])
+                    selected.add(max(finite)[1])
+    return sorted(selected)
+
+def downsample(frame: Frame, max_points: int, method: str = "lttb") -> Frame:
+    """
+    시계열 프레임을 목표 점 개수로 줄입니다.
+
+    시간 열과 숫자 열이 있는 프레임만 줄이고, 그 밖의 프레임(테이블 등)은 그대로 둡니다.
+
+    Args:
+        frame: 프레임
+        max_points: 목표 점 개수
+        method: lttb, minmax, none
+
+    Returns:
+        같은 프레임 (행이 줄어든 상태)
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsample method: {method}")
+    if method == "none" or frame.row_count <= max_points:
+        return frame
+
+    time_index = frame.time_index()
+    value_indexes = frame.value_indexes()
+    if time_index is None or not value_indexes:
+        return frame
+
+    ys = [frame.columns[index] for index in value_indexes]
+    if method == "lttb":
+        indexes = lttb_indexes(frame.columns[time_index], ys, max_points)
+    else:
+        indexes = minmax_indexes(ys, max_points)
+    frame.take(indexes)
+    return frame
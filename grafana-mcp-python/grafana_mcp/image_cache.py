@@ -0,0 +1,540 @@
+"""
+렌더링 이미지 디스크 캐시 (content-addressed)
+"""
+import os
+import re
+import json
+import mmap
+import time
+import base64
+import hashlib
+import logging
+import threading
+import tempfile
+from typing import Dict, Any, Optional, Tuple
+from .streaming import Base64Encoder, BlobStream, read_ascii
+
+logger = logging.getLogger("grafana-image-cache")
+
+DEFAULT_IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_TIME_BUCKET = 60
+
+# 상한을 넘으면 이 비율까지 줄입니다 (매 저장마다 정리가 일어나지 않도록)
+_EVICT_LOW_WATERMARK = 0.9
+
+# 이보다 오래된 임시 파일은 중단된 렌더링이 남긴 것으로 보고 지웁니다
+# (다른 워커가 쓰고 있는 임시 파일을 지우지 않도록 시작 시에도 바로 지우지 않음)
+_STALE_TMP_SECONDS = 3600
+_TMP_PREFIX = ".tmp-"
+
+# 본문 파일의 수정 시각은 마지막 사용 시각(또는 리소스 URL이 끝나는 시각)입니다.
+# 이 시간 안에 쓰인 본문은 다른 요청이나 워커가 아직 읽고 있을 수 있으므로 정리하지 않습니다.
+_IN_USE_SECONDS = 120
+# 다른 워커가 쓴 양을 반영하도록 디렉터리 크기를 다시 세는 간격 (초)
+_RESCAN_SECONDS = 30
+
+_UNIT_SECONDS = {
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 7 * 86400,
+    "M": 30 * 86400,
+    "y": 365 * 86400,
+}
+_RELATIVE_TIME = re.compile(r"^now(?:(?P<op>[+-])(?P<amount>\d+)(?P<unit>[smhdwMy]))?(?:/(?P<round>[smhdwMy]))?$")
+
+def resolve_time(value: str, now: float) -> Optional[int]:
+    """
+    Grafana 시간 표현을 epoch 밀리초로 변환합니다.
+
+    Args:
+        value: "now", "now-6h", "now-1d/d" 같은 상대 시간 또는 epoch 밀리초 문자열
+        now: 기준 시각 (epoch 초)
+
+    Returns:
+        epoch 밀리초 (해석할 수 없으면 None)
+    """
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+
+    match = _RELATIVE_TIME.match(value)
+    if not match:
+        return None
+
+    seconds = now
+    if match.group("op"):
+        delta = int(match.group("amount")) * _UNIT_SECONDS[match.group("unit")]
+        seconds = seconds + delta if match.group("op") == "+" else seconds - delta
+    if match.group("round"):
+        unit = _UNIT_SECONDS[match.group("round")]
+        seconds = seconds - (seconds % unit)
+    return int(seconds * 1000)
+
+def quantize_time_range(from_time: Optional[str], to_time: Optional[str],
+                        bucket: int = DEFAULT_TIME_BUCKET,
+                        now: Optional[float] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    시간 범위를 절대 시각으로 바꾸고 상대 시간은 `bucket` 초 단위로 맞춥니다.
+
+    `now-6h` 같은 상대 범위는 요청 시각마다 달라지므로, 기준 시각을 버킷 경계로 내려
+    같은 버킷 안의 요청이 같은 캐시 키와 같은 렌더링 결과를 갖게 합니다.
+
+    Args:
+        from_time: 시작 시간
+        to_time: 종료 시간
+        bucket: 상대 시간 양자화 단위 (초)
+        now: 기준 시각 (epoch 초, 기본값: 현재 시각)
+
+    Returns:
+        (시작, 종료) epoch 밀리초 문자열. 해석할 수 없는 값은 그대로 반환합니다.
+    """
+    now = time.time() if now is None else now
+    if bucket > 0:
+        now = now - (now % bucket)
+
+    def resolve(value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        resolved = resolve_time(value, now)
+        return str(resolved) if resolved is not None else value
+
+    return resolve(from_time), resolve(to_time)
+
+def image_cache_key(**parts: Any) -> str:
+    """렌더링 매개변수로 캐시 키(sha256 hex)를 만듭니다."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class CachedImage:
+    """캐시에 저장된 이미지"""
+
+    def __init__(self, digest: str, path: str, b64_path: str, size: int, mime_type: str):
+        self.digest = digest
+        self.path = path
+        self.b64_path = b64_path
+        self.size = size
+        self.mime_type = mime_type
+
+    def read_base64(self) -> str:
+        """미리 인코딩해 둔 Base64 문자열을 메모리 매핑으로 읽습니다."""
+        return read_ascii(self.b64_path)
+
+    def as_blob(self) -> BlobStream:
+        """도구 결과에 넣을 지연 전송 값으로 변환합니다."""
+        return BlobStream(self.path, self.mime_type, self.size, b64_path=self.b64_path)
+
+    def read_bytes(self) -> bytes:
+        """원본 이미지 바이트를 메모리 매핑으로 읽습니다."""
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:]
+
+class ImageWriter:
+    """
+    스트리밍으로 받은 이미지를 원본 파일과 Base64 파일에 동시에 씁니다.
+
+    청크마다 sha256과 Base64를 점진적으로 계산하므로 이미지 전체를 메모리에 올리지 않습니다.
+    `ImageCache.commit`으로 캐시에 넣거나 `abort`로 버립니다.
+    """
+
+    def __init__(self, directory: str):
+        raw_fd, self.raw_path = tempfile.mkstemp(dir=directory, prefix=_TMP_PREFIX)
+        b64_fd, self.b64_path = tempfile.mkstemp(dir=directory, prefix=_TMP_PREFIX)
+        self._raw = os.fdopen(raw_fd, "wb")
+        self._b64 = os.fdopen(b64_fd, "wb")
+        self._hash = hashlib.sha256()
+        self._encoder = Base64Encoder()
+        self.size = 0
+        self.encoded_size = 0
+        self.digest: Optional[str] = None
+
+    def write(self, chunk: bytes):
+        """청크를 씁니다."""
+        self._raw.write(chunk)
+        self._hash.update(chunk)
+        encoded = self._encoder.feed(chunk)
+        self._b64.write(encoded)
+        self.size += len(chunk)
+        self.encoded_size += len(encoded)
+
+    def close(self) -> str:
+        """쓰기를 마치고 내용의 sha256 digest를 반환합니다."""
+        if self.digest is None:
+            tail = self._encoder.finish()
+            self._b64.write(tail)
+            self.encoded_size += len(tail)
+            self._raw.close()
+            self._b64.close()
+            self.digest = self._hash.hexdigest()
+        return self.digest
+
+    def abort(self):
+        """쓰던 파일을 삭제합니다."""
+        self._raw.close()
+        self._b64.close()
+        ImageCache._unlink(self.raw_path)
+        ImageCache._unlink(self.b64_path)
+
+class ImageCache:
+    """
+    렌더링된 이미지를 디스크에 저장하는 캐시
+
+    이미지 본문은 내용의 sha256으로 `objects/` 아래에 한 번만 저장하고(content-addressed),
+    렌더링 키는 `keys/` 아래의 작은 파일이 본문 digest를 가리킵니다. Base64 인코딩 결과도
+    함께 저장하므로 캐시 적중 시 렌더링과 재인코딩을 모두 건너뜁니다. 전체 크기가 상한을
+    넘으면 가장 오래 사용되지 않은 본문부터 지웁니다.
+
+    여러 워커가 같은 디렉터리를 쓰므로 사용 상태는 파일 시스템에 둡니다. 본문의 수정 시각이
+    마지막 사용 시각이고(`BlobStream.hold`로 앞으로 미룰 수 있음), 최근에 쓰인 본문은 읽는
+    쪽이 있을 수 있어 지우지 않습니다. 전체 크기도 정리할 때와 주기적으로 디렉터리에서 다시
+    세어 다른 워커가 쓴 양까지 반영합니다.
+
+    메서드는 블로킹 파일 I/O를 하므로 이벤트 루프에서는 `asyncio.to_thread`로 호출합니다.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_IMAGE_CACHE_MAX_BYTES):
+        """
+        이미지 캐시 초기화
+
+        Args:
+            directory: 캐시 디렉터리
+            max_bytes: 본문과 Base64 파일을 합친 최대 크기 (바이트)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._objects_dir = os.path.join(directory, "objects")
+        self._keys_dir = os.path.join(directory, "keys")
+        self._tmp_dir = os.path.join(directory, "tmp")
+        os.makedirs(self._objects_dir, exist_ok=True)
+        os.makedirs(self._keys_dir, exist_ok=True)
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._remove_stale_tmp()
+        self._bytes = self._scan_size()
+        self._scanned_at = time.monotonic()
+        # 사용 중인 본문 때문에 상한 아래로 줄이지 못했는지 (다음 재계산 때까지 다시 정리하지 않음)
+        self._pinned_over = False
+        # 다음 정리 때 확인할 키 디렉터리 (한 번에 하나씩 돌아가며 확인)
+        self._key_shard = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _object_paths(self, digest: str) -> Tuple[str, str]:
+        base = os.path.join(self._objects_dir, digest[:2], digest)
+        return base + ".img", base + ".b64"
+
+    def _key_path(self, key: str) -> str:
+        return os.path.join(self._keys_dir, key[:2], key)
+
+    def _scan_size(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self._objects_dir):
+            for name in files:
+                if name.startswith(_TMP_PREFIX):
+                    continue
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+    def _remove_stale_tmp(self):
+        """중단된 렌더링/저장이 남긴 오래된 임시 파일을 지웁니다."""
+        cutoff = time.time() - _STALE_TMP_SECONDS
+        removed = 0
+        for directory in (self._tmp_dir, self._objects_dir, self._keys_dir):
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if directory != self._tmp_dir and not name.startswith(_TMP_PREFIX):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        if os.stat(path).st_mtime < cutoff:
+                            os.unlink(path)
+                            removed += 1
+                    except OSError:
+                        pass
+        if removed:
+            logger.info(f"Removed {removed} stale temporary files from image cache")
+
+    def get(self, key: str) -> Optional[CachedImage]:
+        """
+        캐시된 이미지를 찾습니다.
+
+        Args:
+            key: `image_cache_key`로 만든 키
+
+        Returns:
+            캐시된 이미지 또는 None
+        """
+        key_path = self._key_path(key)
+        try:
+            with open(key_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        digest = meta.get("digest", "")
+        path, b64_path = self._object_paths(digest)
+        try:
+            size = os.path.getsize(path)
+            # LRU 정리를 위해 사용 시각 갱신
+            now = time.time()
+            os.utime(path, (now, now))
+            os.utime(b64_path, (now, now))
+        except OSError:
+            # 본문이 정리된 경우 키도 제거
+            self._unlink(key_path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return CachedImage(digest, path, b64_path, size, meta.get("mime_type", "image/png"))
+
+    def put(self, key: str, data: bytes, mime_type: str = "image/png",
+            encoded: Optional[bytes] = None) -> CachedImage:
+        """
+        이미지를 저장합니다.
+
+        Args:
+            key: `image_cache_key`로 만든 키
+            data: 이미지 바이트
+            mime_type: 이미지 MIME 타입
+            encoded: 이미 계산한 Base64 바이트 (없으면 여기서 인코딩)
+
+        Returns:
+            저장된 이미지
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path, b64_path = self._object_paths(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        added = 0
+        if os.path.exists(path):
+            self._touch(path, b64_path)
+        else:
+            if encoded is None:
+                encoded = base64.b64encode(data)
+            self._atomic_write(b64_path, encoded)
+            self._atomic_write(path, data)
+            added = len(data) + len(encoded)
+            self.stores += 1
+
+        self._write_key(key, digest, mime_type)
+
+        with self._lock:
+            self._bytes += added
+            # 다른 워커가 쓴 양은 이 프로세스의 합계에 없으므로 때때로 디렉터리를 다시 셉니다
+            over = ((self._bytes > self.max_bytes and not self._pinned_over)
+                    or time.monotonic() - self._scanned_at >= _RESCAN_SECONDS)
+        if over:
+            self.evict()
+
+        return CachedImage(digest, path, b64_path, len(data), mime_type)
+
+    def writer(self) -> ImageWriter:
+        """스트리밍 저장용 writer를 만듭니다 (임시 파일은 캐시와 같은 파일 시스템에 생성)."""
+        return ImageWriter(self._tmp_dir)
+
+    @property
+    def tmp_dir(self) -> str:
+        """캐시에 넣을 임시 파일을 만들 디렉터리"""
+        return self._tmp_dir
+
+    def commit(self, key: str, writer: ImageWriter, mime_type: str = "image/png") -> CachedImage:
+        """
+        writer로 쓴 이미지를 캐시에 넣습니다.
+
+        Args:
+            key: `image_cache_key`로 만든 키
+            writer: 쓰기가 끝난 writer
+            mime_type: 이미지 MIME 타입
+
+        Returns:
+            저장된 이미지
+        """
+        digest = writer.close()
+        return self.commit_files(key, digest, writer.raw_path, writer.b64_path,
+                                 writer.size, writer.encoded_size, mime_type)
+
+    def commit_files(self, key: str, digest: str, raw_path: str, b64_path: str,
+                     size: int, encoded_size: int, mime_type: str = "image/png") -> CachedImage:
+        """
+        `tmp_dir`에 다 쓴 원본/Base64 파일을 캐시로 옮깁니다.
+
+        Args:
+            key: `image_cache_key`로 만든 키
+            digest: 원본 내용의 sha256
+            raw_path: 원본 임시 파일
+            b64_path: Base64 임시 파일
+            size: 원본 크기
+            encoded_size: Base64 크기
+            mime_type: 이미지 MIME 타입
+
+        Returns:
+            저장된 이미지
+        """
+        path, final_b64_path = self._object_paths(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        added = 0
+        if os.path.exists(path):
+            # 같은 내용이 이미 있으면 새로 쓴 파일은 버리고 사용 시각만 갱신합니다
+            self._unlink(raw_path)
+            self._unlink(b64_path)
+            self._touch(path, final_b64_path)
+        else:
+            os.replace(b64_path, final_b64_path)
+            os.replace(raw_path, path)
+            added = size + encoded_size
+            self.stores += 1
+
+        self._write_key(key, digest, mime_type)
+
+        with self._lock:
+            self._bytes += added
+            # 다른 워커가 쓴 양은 이 프로세스의 합계에 없으므로 때때로 디렉터리를 다시 셉니다
+            over = ((self._bytes > self.max_bytes and not self._pinned_over)
+                    or time.monotonic() - self._scanned_at >= _RESCAN_SECONDS)
+        if over:
+            self.evict()
+
+        return CachedImage(digest, path, final_b64_path, size, mime_type)
+
+    def _write_key(self, key: str, digest: str, mime_type: str):
+        key_path = self._key_path(key)
+        os.makedirs(os.path.dirname(key_path), exist_ok=True)
+        self._atomic_write(key_path, json.dumps({"digest": digest, "mime_type": mime_type}).encode("utf-8"))
+
+    def evict(self):
+        """
+        전체 크기가 상한 이하가 될 때까지 가장 오래 사용되지 않은 본문을 지웁니다.
+
+        크기는 디렉터리에서 다시 세고, 최근에 쓰였거나 리소스 URL이 붙잡고 있는 본문은 건너뜁니다.
+        """
+        with self._lock:
+            objects = []
+            total = 0
+            for root, _, files in os.walk(self._objects_dir):
+                for name in files:
+                    if name.startswith(_TMP_PREFIX):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    total += stat.st_size
+                    if name.endswith(".img"):
+                        objects.append((stat.st_mtime, path, stat.st_size))
+            objects.sort()
+            self._bytes = total
+            self._scanned_at = time.monotonic()
+
+            target = int(self.max_bytes * _EVICT_LOW_WATERMARK)
+            in_use_after = time.time() - _IN_USE_SECONDS
+            for mtime, path, size in objects:
+                if self._bytes <= target or mtime > in_use_after:
+                    break
+                try:
+                    # 목록을 만든 뒤 누군가 사용했으면 남깁니다
+                    if os.stat(path).st_mtime > in_use_after:
+                        continue
+                except OSError:
+                    continue
+                b64_path = path[:-len(".img")] + ".b64"
+                freed = size + self._size_of(b64_path)
+                self._unlink(path)
+                self._unlink(b64_path)
+                self._bytes -= freed
+                self.evictions += 1
+            pinned_over = self._bytes > self.max_bytes
+            if pinned_over and not self._pinned_over:
+                logger.info(f"Image cache is over its limit ({self._bytes} bytes) because recent images are still in use")
+            self._pinned_over = pinned_over
+
+            shard = f"{self._key_shard:02x}"
+            self._key_shard = (self._key_shard + 1) % 256
+        self._remove_dangling_keys(shard)
+
+    def _remove_dangling_keys(self, shard: str):
+        """
+        본문이 지워진 키 파일을 지웁니다 (키 파일이 끝없이 쌓이지 않도록).
+
+        정리할 때마다 키 디렉터리 하나(`keys/<shard>`)만 확인하므로, 256번 정리하면 한 바퀴 돕니다.
+        """
+        directory = os.path.join(self._keys_dir, shard)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(_TMP_PREFIX):
+                continue
+            key_path = os.path.join(directory, name)
+            try:
+                with open(key_path, "r", encoding="utf-8") as f:
+                    digest = json.load(f).get("digest", "")
+            except (OSError, ValueError):
+                self._unlink(key_path)
+                continue
+            if not os.path.exists(self._object_paths(digest)[0]):
+                self._unlink(key_path)
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계를 반환합니다."""
+        total = self.hits + self.misses
+        return {
+            "directory": self.directory,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    @staticmethod
+    def _touch(*paths: str):
+        now = time.time()
+        for path in paths:
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+
+    @staticmethod
+    def _size_of(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        """임시 파일에 쓴 뒤 교체해 다른 프로세스가 쓰다 만 파일을 읽지 않게 합니다."""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=_TMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            ImageCache._unlink(tmp_path)
+            raise
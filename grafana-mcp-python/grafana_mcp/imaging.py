@@ -0,0 +1,221 @@
+"""
+렌더링 이미지 변환 (크기 축소, 포맷 변환)
+
+Grafana 렌더러는 PNG만 반환하므로 WebP/JPEG 변환, 크기 상한 맞추기, 렌더러가 적용하지
+못한 배율 조정은 서버가 직접 수행합니다. 변환은 CPU를 많이 쓰므로 워커 프로세스 풀에서
+실행하며, Pillow가 필요합니다 (`pip install 'grafana-mcp-python[imaging]'`).
+"""
+import os
+import io
+import asyncio
+import logging
+import importlib.util
+import concurrent.futures
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger("grafana-imaging")
+
+MIME_TYPES: Dict[str, str] = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+DEFAULT_QUALITY = 80
+DEFAULT_TRANSCODE_WORKERS = min(4, os.cpu_count() or 1)
+
+# 크기 상한을 맞출 때 사용하는 하한값
+_MIN_QUALITY = 30
+_MIN_DIMENSION = 64
+_MAX_SHRINK_STEPS = 6
+
+# JPEG처럼 알파 채널이 없는 포맷으로 바꿀 때 테마별 배경색
+_BACKGROUNDS = {
+    "light": (255, 255, 255),
+    "dark": (17, 18, 23),
+}
+
+def pillow_available() -> bool:
+    """Pillow 설치 여부"""
+    return importlib.util.find_spec("PIL") is not None
+
+def png_dimensions(path: str) -> Optional[Tuple[int, int]]:
+    """PNG 헤더(IHDR)에서 이미지 크기를 읽습니다 (전체 디코딩 없음)."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(24)
+    except OSError:
+        return None
+    if len(header) < 24 or header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        return None
+    return int.from_bytes(header[16:20], "big"), int.from_bytes(header[20:24], "big")
+
+def needs_transcode(path: str, size: int, image_format: str, max_bytes: Optional[int],
+                    target_size: Optional[Tuple[int, int]]) -> bool:
+    """
+    렌더링 결과를 그대로 쓸 수 없어 변환이 필요한지 확인합니다.
+
+    Args:
+        path: 렌더링된 PNG 경로
+        size: 파일 크기
+        image_format: 요청한 출력 포맷
+        max_bytes: 최대 크기 (바이트)
+        target_size: 요청한 출력 픽셀 크기 (배율 적용 후)
+
+    Returns:
+        변환 필요 여부
+    """
+    if image_format != "png":
+        return True
+    if max_bytes is not None and size > max_bytes:
+        return True
+    if target_size is not None:
+        dimensions = png_dimensions(path)
+        if dimensions is not None and dimensions != target_size:
+            return True
+    return False
+
+def _encode(image, image_format: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    if image_format == "png":
+        image.save(buffer, format="PNG", optimize=True)
+    elif image_format == "webp":
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+    else:
+        image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+def transcode_file(src_path: str, tmp_dir: str, image_format: str, quality: int,
+                   max_bytes: Optional[int], target_size: Optional[Tuple[int, int]],
+                   theme: str = "light") -> Tuple[str, str, str, int, int]:
+    """
+    이미지를 변환해 임시 파일로 씁니다 (워커 프로세스에서 실행).
+
+    큰 이미지를 프로세스 사이로 복사하지 않도록 입력과 출력은 파일 경로로 주고받습니다.
+    `max_bytes`를 넘으면 손실 포맷은 품질을, PNG는 팔레트를 줄이고, 그래도 크면
+    해상도를 단계적으로 낮춥니다.
+
+    Args:
+        src_path: 원본 PNG 경로
+        tmp_dir: 출력 임시 파일을 만들 디렉터리 (캐시와 같은 파일 시스템)
+        image_format: 출력 포맷 (png, webp, jpeg)
+        quality: 손실 포맷 품질 (1-100)
+        max_bytes: 최대 크기 (바이트)
+        target_size: 출력 픽셀 크기 (None이면 원본 크기)
+        theme: 알파 채널 합성에 사용할 배경 테마
+
+    Returns:
+        (digest, 원본 경로, Base64 경로, 크기, Base64 크기)
+    """
+    from PIL import Image
+    from .image_cache import ImageWriter
+
+    with Image.open(src_path) as source:
+        image = source.copy()
+
+    if target_size is not None and image.size != target_size:
+        image = image.resize(target_size, Image.LANCZOS)
+
+    if image_format == "jpeg" and image.mode != "RGB":
+        background = Image.new("RGB", image.size, _BACKGROUNDS.get(theme, _BACKGROUNDS["light"]))
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background.paste(image, mask=image.getchannel("A"))
+        else:
+            background.paste(image.convert("RGB"))
+        image = background
+
+    data = _encode(image, image_format, quality)
+
+    if max_bytes is not None and len(data) > max_bytes:
+        if image_format == "png":
+            # 대시보드 이미지는 색이 적어 팔레트 변환만으로도 크게 줄어듭니다
+            image = image.convert("RGBA").quantize(colors=256)
+            data = _encode(image, image_format, quality)
+        else:
+            while len(data) > max_bytes and quality > _MIN_QUALITY:
+                quality = max(_MIN_QUALITY, quality - 15)
+                data = _encode(image, image_format, quality)
+
+        steps = 0
+        while len(data) > max_bytes and steps < _MAX_SHRINK_STEPS:
+            ratio = max(0.5, min(0.9, (max_bytes / len(data)) ** 0.5))
+            width, height = image.size
+            new_size = (max(_MIN_DIMENSION, int(width * ratio)), max(_MIN_DIMENSION, int(height * ratio)))
+            if new_size == image.size:
+                break
+            image = image.resize(new_size, Image.LANCZOS)
+            data = _encode(image, image_format, quality)
+            steps += 1
+
+    writer = ImageWriter(tmp_dir)
+    try:
+        writer.write(data)
+        digest = writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    return digest, writer.raw_path, writer.b64_path, writer.size, writer.encoded_size
+
+class Transcoder:
+    """이미지 변환 워커 풀"""
+
+    def __init__(self, workers: int = DEFAULT_TRANSCODE_WORKERS, use_processes: bool = True):
+        """
+        Args:
+            workers: 워커 수
+            use_processes: 프로세스 풀 사용 여부 (거짓이면 스레드 풀)
+        """
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+        self._pool: Optional[concurrent.futures.Executor] = None
+        self.transcodes = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _executor(self) -> concurrent.futures.Executor:
+        # 변환이 처음 필요할 때 워커를 띄워 서버 시작 시간을 늘리지 않습니다
+        if self._pool is None:
+            if self.use_processes:
+                self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="grafana-transcode"
+                )
+        return self._pool
+
+    async def transcode(self, src_path: str, src_size: int, tmp_dir: str, image_format: str,
+                        quality: int, max_bytes: Optional[int],
+                        target_size: Optional[Tuple[int, int]],
+                        theme: str = "light") -> Tuple[str, str, str, int, int]:
+        """
+        워커 풀에서 이미지를 변환합니다. 인자와 반환값은 `transcode_file`과 같습니다.
+        """
+        if not pillow_available():
+            raise ValueError("Image transcoding requires Pillow (pip install 'grafana-mcp-python[imaging]')")
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self._executor(), transcode_file,
+            src_path, tmp_dir, image_format, quality, max_bytes, target_size, theme
+        )
+        self.transcodes += 1
+        self.bytes_in += src_size
+        self.bytes_out += result[3]
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """변환 통계"""
+        return {
+            "workers": self.workers,
+            "transcodes": self.transcodes,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "compression_ratio": self.bytes_in / self.bytes_out if self.bytes_out else 0.0,
+        }
+
+    def shutdown(self):
+        """워커 풀을 종료합니다."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
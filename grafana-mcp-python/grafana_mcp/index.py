@@ -0,0 +1,607 @@
+"""
+대시보드 로컬 검색 인덱스
+
+Grafana의 `/api/search`는 제목과 태그만 검색하고 대시보드가 많으면 느립니다. 이 모듈은
+전체 대시보드를 한 번 수집한 뒤 버전 변화만 주기적으로 반영하는 메모리 역색인을 만들어,
+제목, 패널 제목, 쿼리 식, 태그를 대상으로 순위가 매겨진 전문 검색과 태그/폴더/데이터소스
+필터를 프로세스 안에서 처리합니다.
+
+여러 워커 프로세스가 함께 실행될 때는 스냅숏 파일을 지정합니다. 파일 잠금을 얻은 워커 하나만
+Grafana에서 수집/갱신하고 색인을 스냅숏으로 저장하며, 나머지 워커는 스냅숏이 바뀔 때마다
+불러오기만 합니다. 수집을 맡은 워커가 종료되면 잠금이 풀려 다른 워커가 이어받습니다.
+"""
+import os
+import re
+import math
+import time
+import bisect
+import heapq
+import pickle
+import asyncio
+import logging
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from .panels import iter_panels
+
+logger = logging.getLogger("grafana-index")
+
+DEFAULT_REFRESH_INTERVAL = 300.0
+DEFAULT_CRAWL_CONCURRENCY = 8
+# 갱신 한 번에 버전 번호를 확인할 최대 대시보드 수 (나머지는 다음 갱신에서 확인)
+DEFAULT_CHECK_BUDGET = 200
+
+# 필드별 가중치 (BM25F 방식으로 필드 빈도를 합산)
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "tags": 2.0,
+    "panel": 1.5,
+    "folder": 1.0,
+    "expr": 1.0,
+}
+
+# BM25 매개변수
+_K1 = 1.2
+_B = 0.75
+
+# 쿼리 식에서 흔한 키워드는 검색 품질을 떨어뜨리므로 색인하지 않습니다
+_STOP_WORDS = frozenset({"by", "sum", "rate", "on", "and", "or", "the", "le", "without"})
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: str) -> List[str]:
+    """
+    텍스트를 소문자 토큰으로 나눕니다.
+
+    `http_server_requests` 같은 식별자는 전체 토큰과 `_`로 나눈 부분 토큰을 모두 만듭니다.
+    """
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token not in _STOP_WORDS:
+            tokens.append(token)
+        if "_" in token:
+            tokens.extend(part for part in token.split("_") if part and part not in _STOP_WORDS)
+    return tokens
+
+def query_terms(text: str) -> List[str]:
+    """검색어를 토큰으로 나눕니다 (식별자는 부분 토큰으로 나눠 일부만 입력해도 찾음)."""
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        parts = [part for part in token.split("_") if part] if "_" in token else [token]
+        terms.extend(part for part in parts if part not in _STOP_WORDS)
+    return terms
+
+def _datasource_refs(datasource: Any) -> Set[str]:
+    """데이터소스 참조에서 필터에 쓸 식별자(UID, 이름, 타입)를 꺼냅니다."""
+    if isinstance(datasource, dict):
+        return {str(value).lower() for value in (datasource.get("uid"), datasource.get("type")) if value}
+    if isinstance(datasource, str):
+        return {datasource.lower()}
+    return set()
+
+class IndexedDashboard:
+    """색인된 대시보드 요약"""
+
+    __slots__ = ("uid", "title", "url", "tags", "folder_id", "folder_uid", "folder_title",
+                 "is_starred", "version", "panel_titles", "datasources", "length")
+
+    def __init__(self, hit: Dict[str, Any], dashboard: Dict[str, Any], version: Optional[int]):
+        """
+        Args:
+            hit: `/api/search` 결과 항목
+            dashboard: 대시보드 모델
+            version: 대시보드 버전
+        """
+        self.uid = hit.get("uid", "")
+        self.title = hit.get("title") or dashboard.get("title", "")
+        self.url = hit.get("url", "")
+        self.tags = [str(tag) for tag in hit.get("tags") or dashboard.get("tags") or []]
+        self.folder_id = hit.get("folderId")
+        self.folder_uid = hit.get("folderUid", "")
+        self.folder_title = hit.get("folderTitle", "")
+        self.is_starred = hit.get("isStarred", False)
+        self.version = version
+        self.panel_titles = []
+        self.datasources: Set[str] = set()
+        self.length = 0
+
+    def to_result(self, score: Optional[float] = None) -> Dict[str, Any]:
+        """검색 도구 결과 형식으로 변환합니다."""
+        result = {
+            "uid": self.uid,
+            "title": self.title,
+            "url": self.url,
+            "type": "dash-db",
+            "tags": self.tags,
+            "folder_title": self.folder_title,
+            "folder_uid": self.folder_uid,
+            "is_starred": self.is_starred
+        }
+        if score is not None:
+            result["score"] = round(score, 4)
+        return result
+
+def _fields(entry: IndexedDashboard, dashboard: Dict[str, Any]) -> Iterable[Tuple[str, str]]:
+    """대시보드에서 (필드, 텍스트) 쌍을 꺼내며 패널 제목과 데이터소스를 기록합니다."""
+    yield "title", entry.title
+    yield "folder", entry.folder_title
+    for tag in entry.tags:
+        yield "tags", tag
+
+    entry.datasources |= _datasource_refs(dashboard.get("datasource"))
+    for panel in iter_panels(dashboard, include_rows=True):
+        title = panel.get("title")
+        if title:
+            entry.panel_titles.append(title)
+            yield "panel", title
+        entry.datasources |= _datasource_refs(panel.get("datasource"))
+        for target in panel.get("targets") or []:
+            entry.datasources |= _datasource_refs(target.get("datasource"))
+            for key in ("expr", "query", "rawSql", "target"):
+                value = target.get(key)
+                if isinstance(value, str) and value:
+                    yield "expr", value
+
+class DashboardIndex:
+    """
+    대시보드 전문 검색 역색인
+
+    토큰마다 {대시보드 UID: 가중 빈도} 포스팅을 두고 BM25로 순위를 매깁니다. 검색은
+    이벤트 루프 안에서 딕셔너리 조회만으로 끝나며, 마지막 쿼리 단어는 접두어로도 찾습니다.
+    """
+
+    def __init__(self, refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+                 crawl_concurrency: int = DEFAULT_CRAWL_CONCURRENCY,
+                 snapshot_path: Optional[str] = None,
+                 check_budget: int = DEFAULT_CHECK_BUDGET):
+        """
+        Args:
+            refresh_interval: 변경 확인 주기 (초)
+            crawl_concurrency: 대시보드 수집 동시 요청 수
+            snapshot_path: 워커 프로세스 사이에서 공유할 스냅숏 파일 경로
+            check_budget: 갱신 한 번에 버전 번호를 확인할 최대 대시보드 수
+        """
+        self.refresh_interval = refresh_interval
+        self.crawl_concurrency = max(1, crawl_concurrency)
+        self.check_budget = max(1, check_budget)
+        self.snapshot_path = snapshot_path
+        self.role = "standalone" if snapshot_path is None else "follower"
+        self._lock_file = None
+        self._snapshot_mtime: Optional[float] = None
+        # 색인이 바뀔 때마다 증가 (바뀌지 않았으면 스냅숏을 다시 쓰지 않음)
+        self._generation = 0
+        self._saved_generation = 0
+        self._docs: Dict[str, IndexedDashboard] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._total_length = 0
+        self._vocabulary: Optional[List[str]] = None
+        # 대시보드별 마지막 버전 확인(또는 색인) 시각 (오래된 것부터 확인)
+        self._checked: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self.crawls = 0
+        self.refreshes = 0
+        self.reindexed = 0
+        self.checks = 0
+        self.removed = 0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.last_refresh: Optional[float] = None
+        self.last_crawl_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.snapshot_loads = 0
+        self.snapshot_saves = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def ready(self) -> asyncio.Event:
+        """색인이 준비되면 설정되는 이벤트 (Python 3.9에서 다른 루프에 묶이지 않도록 처음 쓸 때 만듦)"""
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        return self._ready
+
+    # 색인 갱신
+    def add(self, hit: Dict[str, Any], dashboard: Dict[str, Any], version: Optional[int] = None):
+        """
+        대시보드를 색인에 추가합니다 (이미 있으면 교체).
+
+        Args:
+            hit: `/api/search` 결과 항목
+            dashboard: 대시보드 모델
+            version: 대시보드 버전
+        """
+        entry = IndexedDashboard(hit, dashboard, version)
+        self.remove(entry.uid)
+
+        weights: Dict[str, float] = {}
+        for field, text in _fields(entry, dashboard):
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0.0) + weight
+                entry.length += 1
+
+        for token, weight in weights.items():
+            self._postings.setdefault(token, {})[entry.uid] = weight
+        self._docs[entry.uid] = entry
+        self._doc_terms[entry.uid] = list(weights)
+        self._total_length += entry.length
+        self._vocabulary = None
+        self._generation += 1
+
+    def remove(self, uid: str):
+        """대시보드를 색인에서 제거합니다."""
+        entry = self._docs.pop(uid, None)
+        if entry is None:
+            return
+        for token in self._doc_terms.pop(uid, []):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(uid, None)
+                if not postings:
+                    del self._postings[token]
+        self._total_length -= entry.length
+        self._vocabulary = None
+        self._generation += 1
+
+    def version_of(self, uid: str) -> Optional[int]:
+        """색인된 대시보드의 버전"""
+        entry = self._docs.get(uid)
+        return entry.version if entry is not None else None
+
+    # 검색
+    def _expand(self, token: str) -> List[str]:
+        """접두어가 같은 색인 토큰 목록"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect.bisect_left(self._vocabulary, token)
+        matches = []
+        for candidate in self._vocabulary[start:start + 64]:
+            if not candidate.startswith(token):
+                break
+            matches.append(candidate)
+        return matches
+
+    def search(self, query: Optional[str] = None, tags: Optional[List[str]] = None,
+               folder_ids: Optional[List[int]] = None, folder_uids: Optional[List[str]] = None,
+               datasources: Optional[Iterable[str]] = None,
+               limit: int = 100,
+               after: Optional[Tuple[float, str, str]] = None) -> List[Tuple[IndexedDashboard, Optional[float]]]:
+        """
+        색인을 검색합니다.
+
+        결과는 `rank_key` 순서이며, `after`를 주면 그 키 뒤의 결과만 반환합니다 (keyset 페이지).
+        앞 페이지를 다시 정렬해 건너뛰지 않으므로 페이지를 넘겨도 비용이 늘지 않습니다.
+
+        Args:
+            query: 검색어 (모든 단어가 포함된 대시보드를 찾음, 마지막 단어는 접두어 일치)
+            tags: 모두 포함해야 하는 태그
+            folder_ids: 폴더 ID 필터
+            folder_uids: 폴더 UID 필터
+            datasources: 데이터소스 식별자 (UID, 이름 또는 타입 중 하나라도 사용하는 대시보드)
+            limit: 최대 결과 수
+            after: 이전 페이지 마지막 결과의 `rank_key`
+
+        Returns:
+            (대시보드, 점수) 목록 (검색어가 없으면 점수는 None이고 제목순)
+        """
+        started = time.perf_counter()
+        try:
+            wanted = {str(value).lower() for value in datasources} if datasources else None
+            return self._search(query, tags, folder_ids, folder_uids, wanted, limit,
+                                tuple(after) if after is not None else None)
+        finally:
+            self.queries += 1
+            self.query_seconds += time.perf_counter() - started
+
+    @staticmethod
+    def rank_key(entry: IndexedDashboard, score: Optional[float]) -> Tuple[float, str, str]:
+        """결과 정렬 키 (점수 내림차순, 제목, UID 순)"""
+        return (-score if score is not None else 0.0, entry.title.lower(), entry.uid)
+
+    def _search(self, query, tags, folder_ids, folder_uids, datasources, limit, after):
+        def accepted(entry: IndexedDashboard) -> bool:
+            if tags and not set(tags).issubset(entry.tags):
+                return False
+            if folder_ids and entry.folder_id not in folder_ids:
+                return False
+            if folder_uids and entry.folder_uid not in folder_uids:
+                return False
+            if datasources and datasources.isdisjoint(entry.datasources):
+                return False
+            return True
+
+        terms = query_terms(query or "")
+        if not terms:
+            entries = heapq.nsmallest(limit, (
+                (self.rank_key(entry, None), entry) for entry in self._docs.values()
+                if (after is None or self.rank_key(entry, None) > after) and accepted(entry)
+            ), key=lambda item: item[0])
+            return [(entry, None) for _, entry in entries]
+
+        count = len(self._docs)
+        average = self._total_length / count if count else 1.0
+        scores: Optional[Dict[str, float]] = None
+        for position, term in enumerate(terms):
+            variants = [term]
+            if position == len(terms) - 1:
+                variants = self._expand(term) or variants
+
+            term_scores: Dict[str, float] = {}
+            for variant in variants:
+                postings = self._postings.get(variant)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for uid, frequency in postings.items():
+                    norm = _K1 * (1 - _B + _B * self._docs[uid].length / average)
+                    score = idf * frequency * (_K1 + 1) / (frequency + norm)
+                    if score > term_scores.get(uid, 0.0):
+                        term_scores[uid] = score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {uid: score + term_scores[uid] for uid, score in scores.items() if uid in term_scores}
+            if not scores:
+                return []
+
+        ranked = heapq.nsmallest(limit, (
+            (key, self._docs[uid], score) for uid, score in scores.items()
+            for key in (self.rank_key(self._docs[uid], score),)
+            if (after is None or key > after) and accepted(self._docs[uid])
+        ), key=lambda item: item[0])
+        return [(entry, score) for _, entry, score in ranked]
+
+    # Grafana 동기화
+    async def _list_dashboards(self, client) -> List[Dict[str, Any]]:
+        """모든 대시보드 항목을 페이지 단위로 가져옵니다 (응답 캐시를 거치지 않음)."""
+        hits = []
+        async for page in client.iter_search_pages(use_cache=False):
+            hits.extend(page)
+        return hits
+
+    async def _fetch(self, client, hit: Dict[str, Any], slots: asyncio.Semaphore):
+        """대시보드 하나를 가져와 색인합니다 (응답 캐시를 밀어내지 않도록 직접 요청)."""
+        async with slots:
+            try:
+                data = await client.request("GET", f"/api/dashboards/uid/{hit['uid']}")
+            except Exception as e:
+                logger.warning(f"Failed to index dashboard {hit.get('uid')}: {e}")
+                return
+        dashboard = data.get("dashboard", {}) if isinstance(data, dict) else {}
+        meta = data.get("meta", {}) if isinstance(data, dict) else {}
+        self.add(hit, dashboard, meta.get("version", dashboard.get("version")))
+        self._checked[hit["uid"]] = time.monotonic()
+        self.reindexed += 1
+
+    async def crawl(self, client):
+        """모든 대시보드를 수집해 색인을 새로 만듭니다."""
+        started = time.monotonic()
+        hits = await self._list_dashboards(client)
+        slots = asyncio.Semaphore(self.crawl_concurrency)
+        await asyncio.gather(*(self._fetch(client, hit, slots) for hit in hits if hit.get("uid")))
+
+        listed = {hit.get("uid") for hit in hits}
+        for uid in [uid for uid in self._docs if uid not in listed]:
+            self.remove(uid)
+
+        self.crawls += 1
+        self.last_crawl_seconds = time.monotonic() - started
+        self.last_refresh = time.time()
+        logger.info(f"Indexed {len(self._docs)} dashboards in {self.last_crawl_seconds:.1f}s")
+
+    async def refresh(self, client):
+        """
+        변경된 대시보드만 다시 색인합니다.
+
+        목록에서 새로 생긴/사라진 대시보드와 제목/태그/폴더가 바뀐 대시보드는 바로 반영합니다.
+        나머지는 검색 결과로 변경 여부를 알 수 없으므로, 가장 오래전에 확인한 대시보드부터
+        `check_budget`개만 최신 버전 번호를 확인해 버전이 올라간 대시보드를 다시 가져옵니다.
+        대시보드가 많아도 갱신 한 번의 요청 수가 일정하고, 모든 대시보드를 여러 갱신에 나눠
+        차례로 확인합니다.
+        """
+        hits = await self._list_dashboards(client)
+        slots = asyncio.Semaphore(self.crawl_concurrency)
+
+        changed: List[Dict[str, Any]] = []
+        unchanged: List[Dict[str, Any]] = []
+        for hit in hits:
+            if not hit.get("uid"):
+                continue
+            entry = self._docs.get(hit["uid"])
+            if entry is not None and (
+                entry.title == hit.get("title") and entry.tags == list(hit.get("tags") or [])
+                and entry.folder_uid == hit.get("folderUid", "")
+            ):
+                unchanged.append(hit)
+            else:
+                changed.append(hit)
+        unchanged.sort(key=lambda hit: self._checked.get(hit["uid"], 0.0))
+
+        async def check(hit: Dict[str, Any]):
+            entry = self._docs[hit["uid"]]
+            async with slots:
+                try:
+                    version = await client.get_latest_dashboard_version(hit["uid"])
+                except Exception as e:
+                    logger.warning(f"Failed to check dashboard {hit['uid']}: {e}")
+                    return
+            self._checked[hit["uid"]] = time.monotonic()
+            if version is not None and version != entry.version:
+                await self._fetch(client, hit, slots)
+
+        await asyncio.gather(
+            *(self._fetch(client, hit, slots) for hit in changed),
+            *(check(hit) for hit in unchanged[:self.check_budget])
+        )
+        self.checks += min(len(unchanged), self.check_budget)
+
+        listed = {hit.get("uid") for hit in hits}
+        for uid in [uid for uid in self._docs if uid not in listed]:
+            self.remove(uid)
+            self._checked.pop(uid, None)
+            self.removed += 1
+
+        self.refreshes += 1
+        self.last_refresh = time.time()
+
+    # 워커 사이 공유
+    def _try_lead(self) -> bool:
+        """스냅숏 잠금을 얻어 수집 담당 워커가 됩니다 (이미 담당이면 참)."""
+        if self.snapshot_path is None or self._lock_file is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            # 파일 잠금이 없는 플랫폼에서는 워커마다 따로 수집합니다
+            self.role = "standalone"
+            return True
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+        lock_file = open(self.snapshot_path + ".lock", "a+b")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self.role = "leader"
+        logger.info(f"Dashboard index leader (pid {os.getpid()})")
+        return True
+
+    def _release(self):
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _snapshot_state(self) -> Dict[str, Any]:
+        return {
+            "docs": self._docs,
+            "postings": self._postings,
+            "doc_terms": self._doc_terms,
+            "total_length": self._total_length,
+            "last_refresh": self.last_refresh
+        }
+
+    def _write_snapshot(self, data: bytes):
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.snapshot_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    async def save_snapshot(self):
+        """색인을 스냅숏 파일에 씁니다 (직렬화는 이벤트 루프에서, 파일 쓰기는 스레드에서)."""
+        data = pickle.dumps(self._snapshot_state(), protocol=pickle.HIGHEST_PROTOCOL)
+        await asyncio.to_thread(self._write_snapshot, data)
+        self._saved_generation = self._generation
+        self.snapshot_saves += 1
+
+    def _read_snapshot(self) -> Optional[Tuple[float, Dict[str, Any]]]:
+        try:
+            mtime = os.stat(self.snapshot_path).st_mtime
+        except FileNotFoundError:
+            return None
+        if mtime == self._snapshot_mtime:
+            return None
+        with open(self.snapshot_path, "rb") as f:
+            return mtime, pickle.load(f)
+
+    async def load_snapshot(self) -> bool:
+        """
+        스냅숏이 바뀌었으면 불러와 색인을 교체합니다.
+
+        Returns:
+            새 스냅숏을 불러왔는지 여부
+        """
+        loaded = await asyncio.to_thread(self._read_snapshot)
+        if loaded is None:
+            return False
+        self._snapshot_mtime, state = loaded
+        self._docs = state["docs"]
+        self._postings = state["postings"]
+        self._doc_terms = state["doc_terms"]
+        self._total_length = state["total_length"]
+        self.last_refresh = state["last_refresh"]
+        self._vocabulary = None
+        self._generation += 1
+        self._saved_generation = self._generation
+        self.snapshot_loads += 1
+        self.ready.set()
+        return True
+
+    async def sync(self, client):
+        """
+        한 번 동기화합니다.
+
+        수집 담당(또는 단독) 워커는 처음에는 전체를 수집하고 이후에는 변경분만 반영합니다.
+        다른 워커가 남긴 스냅숏이 있으면 전체 수집 대신 스냅숏에서 시작합니다.
+        나머지 워커는 스냅숏만 다시 불러옵니다.
+        """
+        if not self._try_lead():
+            await self.load_snapshot()
+            return
+
+        if self.snapshot_path is not None and self.crawls == 0 and self.refreshes == 0:
+            await self.load_snapshot()
+        if self.crawls == 0 and self.snapshot_loads == 0:
+            await self.crawl(client)
+        else:
+            await self.refresh(client)
+        self.ready.set()
+
+        if self.snapshot_path is not None and self.role == "leader" and self._generation != self._saved_generation:
+            await self.save_snapshot()
+
+    async def _run(self, client):
+        while True:
+            try:
+                await self.sync(client)
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"Dashboard index sync failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self, client):
+        """백그라운드 수집/갱신 태스크를 시작합니다 (실행 중인 이벤트 루프 필요)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(client))
+
+    async def stop(self):
+        """백그라운드 태스크를 중지합니다."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """색인 통계"""
+        return {
+            "ready": self.ready.is_set(),
+            "role": self.role,
+            "snapshot_loads": self.snapshot_loads,
+            "snapshot_saves": self.snapshot_saves,
+            "dashboards": len(self._docs),
+            "terms": len(self._postings),
+            "crawls": self.crawls,
+            "refreshes": self.refreshes,
+            "reindexed": self.reindexed,
+            "version_checks": self.checks,
+            "removed": self.removed,
+            "last_crawl_seconds": self.last_crawl_seconds,
+            "last_refresh": self.last_refresh,
+            "last_error": self.last_error,
+            "queries": self.queries,
+            "avg_query_us": self.query_seconds / self.queries * 1e6 if self.queries else 0.0
+        }
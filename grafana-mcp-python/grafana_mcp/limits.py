@@ -0,0 +1,388 @@
+"""
+Grafana 요청 속도 제한과 적응형 동시성 제어
+
+요청을 엔드포인트 종류(search, dashboard, datasource, render, other)로 나눠 종류마다
+토큰 버킷 속도 제한과 AIMD 동시성 제한을 두고, 모든 종류가 함께 쓰는 전체 동시성 한도는
+우선순위 큐로 나눠 줍니다. 렌더링이 전체 한도를 채우고 있어도 빈 자리가 나면 먼저 기다리던
+가벼운 메타데이터 요청이 앞서 들어가므로 렌더링 뒤에 밀려 굶지 않습니다.
+
+AIMD: 응답이 목표 지연 시간 안에 오면 한도를 조금씩(한 번에 1/한도) 늘리고, 429/5xx,
+타임아웃, 목표 지연 초과가 나타나면 한도를 절반으로 줄여 Grafana와 렌더러가 감당할 수 있는
+수준을 스스로 찾습니다.
+"""
+import time
+import heapq
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("grafana-limits")
+
+ENDPOINT_CLASSES = ("search", "dashboard", "datasource", "render", "other")
+
+# 숫자가 작을수록 전체 한도의 빈자리를 먼저 받습니다
+PRIORITIES: Dict[str, int] = {
+    "search": 0,
+    "dashboard": 0,
+    "datasource": 1,
+    "other": 1,
+    "render": 2,
+}
+
+# 종류별 (초기 동시성 한도, 최대 동시성 한도, 목표 지연 시간(초))
+DEFAULT_CLASS_LIMITS: Dict[str, Tuple[int, int, float]] = {
+    "search": (16, 64, 2.0),
+    "dashboard": (32, 128, 2.0),
+    "datasource": (16, 64, 10.0),
+    "render": (4, 16, 30.0),
+    "other": (16, 64, 5.0),
+}
+
+DEFAULT_MAX_UPSTREAM_CONCURRENCY = 64
+
+# 한도를 연속으로 줄이지 않도록 두는 최소 간격 (초)
+_DECREASE_INTERVAL = 1.0
+
+def endpoint_class(path: str) -> str:
+    """
+    API 경로의 엔드포인트 종류를 정합니다.
+
+    Args:
+        path: API 경로 (예: /api/dashboards/uid/abc)
+
+    Returns:
+        search, dashboard, datasource, render, other 중 하나
+    """
+    if path.startswith("/render/"):
+        return "render"
+    if path.startswith("/api/search"):
+        return "search"
+    if path.startswith("/api/dashboards/"):
+        return "dashboard"
+    if path.startswith("/api/datasources") or path.startswith("/api/ds/"):
+        return "datasource"
+    return "other"
+
+def parse_rate_limits(values) -> Dict[str, float]:
+    """
+    `class=requests_per_second` 형식의 문자열 목록을 종류별 초당 요청 수로 변환합니다.
+
+    Args:
+        values: 예) ["render=2", "search=50,dashboard=100"]
+
+    Returns:
+        종류별 초당 요청 수
+    """
+    rates: Dict[str, float] = {}
+    for value in values or []:
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            name, sep, rate = item.partition("=")
+            name = name.strip()
+            if not sep:
+                raise ValueError(f"Invalid rate limit '{item}' (expected class=requests_per_second)")
+            if name not in ENDPOINT_CLASSES:
+                raise ValueError(f"Unknown endpoint class '{name}' (expected one of {', '.join(ENDPOINT_CLASSES)})")
+            rates[name] = float(rate)
+    return rates
+
+class TokenBucket:
+    """초당 `rate`개씩 채워지고 최대 `burst`개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Args:
+            rate: 초당 토큰 수 (0 이하면 제한 없음)
+            burst: 버킷 크기 (기본값: max(1, rate))
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        # 이벤트 루프가 시작되기 전에 만들어지므로 잠금은 처음 기다릴 때 만듭니다
+        # (Python 3.9의 asyncio.Lock은 만들 때의 루프에 묶임)
+        self._lock: Optional[asyncio.Lock] = None
+        self.throttled = 0
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 기다립니다 (대기 순서는 도착 순서)."""
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                self.throttled += 1
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class ConcurrencyLimiter:
+    """
+    우선순위 대기열을 가진 동시성 제한
+
+    자리가 없으면 (우선순위, 도착 순서)로 정렬된 대기열에서 기다리고, 자리가 나면 가장
+    앞선 대기자부터 자리를 넘겨받습니다.
+    """
+
+    def __init__(self, limit: float):
+        """
+        Args:
+            limit: 동시에 실행할 최대 요청 수
+        """
+        self._limit = float(max(1, limit))
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = 0
+        self.max_queue_depth = 0
+
+    @property
+    def limit(self) -> int:
+        """현재 동시성 한도"""
+        return max(1, int(self._limit))
+
+    @property
+    def queue_depth(self) -> int:
+        """자리를 기다리는 요청 수"""
+        return len(self._waiters)
+
+    async def acquire(self, priority: int = 0):
+        """자리를 얻을 때까지 기다립니다."""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._sequence += 1
+        heapq.heappush(self._waiters, (priority, self._sequence, future))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 자리를 넘겨받은 직후 취소되면 다음 대기자에게 돌려줍니다
+                self.release()
+            else:
+                self._waiters = [waiter for waiter in self._waiters if waiter[2] is not future]
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self):
+        """자리를 반납하고 한도 안에서 대기자를 깨웁니다."""
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+class AdaptiveLimiter(ConcurrencyLimiter):
+    """지연 시간과 과부하 응답에 따라 한도를 조절하는 AIMD 동시성 제한"""
+
+    def __init__(self, initial: int, maximum: int, latency_target: float,
+                 minimum: int = 1, backoff: float = 0.5):
+        """
+        Args:
+            initial: 초기 한도
+            maximum: 최대 한도
+            latency_target: 목표 지연 시간 (초, 넘으면 과부하로 간주)
+            minimum: 최소 한도
+            backoff: 과부하 때 한도에 곱할 비율
+        """
+        super().__init__(initial)
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self._last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+
+    def on_result(self, latency: float, overloaded: bool):
+        """
+        요청 결과를 반영해 한도를 조절합니다.
+
+        Args:
+            latency: 요청 지연 시간 (초)
+            overloaded: 429/5xx/타임아웃 등 과부하 신호 여부
+        """
+        if overloaded or latency > self.latency_target:
+            now = time.monotonic()
+            if now - self._last_decrease >= _DECREASE_INTERVAL:
+                self._limit = max(float(self.minimum), self._limit * self.backoff)
+                self._last_decrease = now
+                self.decreases += 1
+            return
+
+        # 한도가 실제로 차 있을 때만 늘립니다 (여유가 있는데 늘리면 한도가 의미 없이 커짐)
+        if self.in_flight + 1 >= self.limit and self._limit < self.maximum:
+            before = self.limit
+            self._limit = min(float(self.maximum), self._limit + 1.0 / self._limit)
+            if self.limit > before:
+                self.increases += 1
+                self._wake()
+
+class ClassStats:
+    """엔드포인트 종류별 대기/결과 통계"""
+
+    __slots__ = ("requests", "waits", "wait_seconds", "max_wait_seconds", "throttled", "errors")
+
+    def __init__(self):
+        self.requests = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.throttled = 0
+        self.errors = 0
+
+class Permit:
+    """얻은 실행 자리 (요청이 끝나면 `done`으로 결과를 알림)"""
+
+    __slots__ = ("endpoint", "started", "status_code", "overloaded")
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.started = time.monotonic()
+        self.status_code: Optional[int] = None
+        self.overloaded = False
+
+    def done(self, status_code: Optional[int] = None, overloaded: bool = False):
+        """
+        요청 결과를 기록합니다.
+
+        Args:
+            status_code: HTTP 상태 코드
+            overloaded: 상태 코드와 별개로 과부하를 뜻하는 실패(타임아웃 등)인지 여부
+        """
+        self.status_code = status_code
+        self.overloaded = overloaded or status_code == 429 or (status_code is not None and status_code >= 500)
+
+class GrafanaLimits:
+    """
+    Grafana로 보내는 요청의 속도와 동시성 제한
+
+    요청 하나는 종류별 토큰 버킷 → 종류별 적응형 한도 → 전체 한도(우선순위 대기열) 순서로
+    자리를 얻고, 끝나면 지연 시간과 상태 코드로 종류별 한도를 조절합니다.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None,
+                 max_concurrency: int = DEFAULT_MAX_UPSTREAM_CONCURRENCY,
+                 adaptive: bool = True,
+                 class_limits: Optional[Dict[str, Tuple[int, int, float]]] = None):
+        """
+        Args:
+            rates: 종류별 초당 요청 수 (없거나 0이면 제한 없음)
+            max_concurrency: 모든 종류를 합친 최대 동시 요청 수
+            adaptive: 종류별 한도를 지연 시간/과부하에 따라 조절할지 여부 (거짓이면 최대 한도로 고정)
+            class_limits: 종류별 (초기 한도, 최대 한도, 목표 지연 시간) (기본값을 덮어씀)
+        """
+        limits = dict(DEFAULT_CLASS_LIMITS)
+        if class_limits:
+            limits.update(class_limits)
+        rates = rates or {}
+
+        self.adaptive = adaptive
+        self.total = ConcurrencyLimiter(max_concurrency)
+        self.buckets = {name: TokenBucket(rates.get(name, 0.0)) for name in ENDPOINT_CLASSES}
+        self.limiters: Dict[str, AdaptiveLimiter] = {}
+        for name in ENDPOINT_CLASSES:
+            initial, maximum, target = limits[name]
+            self.limiters[name] = AdaptiveLimiter(initial if adaptive else maximum, maximum, target)
+        self._stats = {name: ClassStats() for name in ENDPOINT_CLASSES}
+
+    @asynccontextmanager
+    async def slot(self, path: str) -> AsyncIterator[Permit]:
+        """
+        요청 하나를 실행할 자리를 얻습니다.
+
+        Args:
+            path: API 경로
+
+        Yields:
+            결과를 기록할 Permit (기록하지 않고 예외로 끝나면 오류로 집계)
+        """
+        endpoint = endpoint_class(path)
+        stats = self._stats[endpoint]
+        limiter = self.limiters[endpoint]
+        stats.requests += 1
+
+        started = time.monotonic()
+        await self.buckets[endpoint].acquire()
+        await limiter.acquire()
+        try:
+            await self.total.acquire(PRIORITIES[endpoint])
+        except BaseException:
+            limiter.release()
+            raise
+
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            stats.waits += 1
+            stats.wait_seconds += waited
+            stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+
+        permit = Permit(endpoint)
+        try:
+            yield permit
+        except BaseException:
+            if permit.status_code is None and not permit.overloaded:
+                stats.errors += 1
+            raise
+        finally:
+            self.total.release()
+            limiter.release()
+            if permit.status_code == 429:
+                stats.throttled += 1
+            if self.adaptive and (permit.status_code is not None or permit.overloaded):
+                limiter.on_result(time.monotonic() - permit.started, permit.overloaded)
+
+    def has_capacity(self, endpoint: str) -> bool:
+        """종류별 한도와 전체 한도에 기다리는 요청 없이 빈 자리가 있는지 여부"""
+        limiter = self.limiters[endpoint]
+        return (
+            limiter.queue_depth == 0 and limiter.in_flight < limiter.limit
+            and self.total.queue_depth == 0 and self.total.in_flight < self.total.limit
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """종류별 한도, 대기열 깊이, 대기 시간 통계"""
+        classes = {}
+        for name in ENDPOINT_CLASSES:
+            limiter = self.limiters[name]
+            stats = self._stats[name]
+            classes[name] = {
+                "limit": limiter.limit,
+                "max_limit": limiter.maximum,
+                "in_flight": limiter.in_flight,
+                "queue_depth": limiter.queue_depth,
+                "max_queue_depth": limiter.max_queue_depth,
+                "rate": self.buckets[name].rate or None,
+                "rate_throttled": self.buckets[name].throttled,
+                "requests": stats.requests,
+                "waits": stats.waits,
+                "avg_wait_ms": stats.wait_seconds / stats.waits * 1000 if stats.waits else 0.0,
+                "max_wait_ms": stats.max_wait_seconds * 1000,
+                "throttled_429": stats.throttled,
+                "errors": stats.errors,
+                "increases": limiter.increases,
+                "decreases": limiter.decreases
+            }
+        return {
+            "adaptive": self.adaptive,
+            "max_concurrency": self.total.limit,
+            "in_flight": self.total.in_flight,
+            "queue_depth": self.total.queue_depth,
+            "max_queue_depth": self.total.max_queue_depth,
+            "classes": classes
+        }
@@ -0,0 +1,317 @@
+"""
+Prometheus 지표
+
+도구 호출과 Grafana 요청의 지연 시간/응답 크기 히스토그램, 진행 중 요청 수, 오류 수를
+Prometheus 텍스트 형식(0.0.4)으로 내보냅니다. SSE 전송은 FastAPI 앱의 `/metrics`로,
+STDIO 전송은 `--metrics-port`로 띄우는 작은 HTTP 서버로 제공합니다.
+
+기록은 미리 정한 버킷에 대한 `bisect` 한 번과 정수 덧셈뿐이라 항상 켜 두어도 부담이 없습니다.
+모든 기록은 이벤트 루프 스레드에서 일어나므로 잠금을 쓰지 않습니다.
+"""
+import time
+import asyncio
+import logging
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("mcp-metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 지연 시간 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# 응답 크기 버킷 (바이트)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """레이블 값 조합별로 값을 갖는 지표의 공통 부분"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def labels(self, *values: str):
+        """레이블 값 조합에 해당하는 값을 가져옵니다 (없으면 만듦)."""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+class Counter(_Metric):
+    """증가만 하는 값"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+class Gauge(Counter):
+    """오르내리는 값"""
+
+    kind = "gauge"
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class Histogram(_Metric):
+    """값의 분포 (버킷별 개수, 합계, 개수)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_value(float(bound))}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+class Registry:
+    """지표 모음"""
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self, stats: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        모든 지표를 Prometheus 텍스트 형식으로 만듭니다.
+
+        Args:
+            stats: 함께 내보낼 `stats` 요청 결과 (숫자 값만 `mcp_stats` 게이지로 내보냄)
+
+        Returns:
+            텍스트 형식 본문
+        """
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        if stats:
+            lines.extend(_stats_lines(stats))
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+def _flatten(prefix: str, value: Any, out: List[Tuple[str, float]]):
+    if isinstance(value, bool):
+        out.append((prefix, int(value)))
+    elif isinstance(value, (int, float)):
+        out.append((prefix, value))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else str(key), item, out)
+
+def _stats_lines(stats: Dict[str, Any]) -> List[str]:
+    """`stats` 결과의 숫자 값을 `mcp_stats{section, key}` 게이지로 바꿉니다."""
+    lines = [
+        "# HELP mcp_stats Numeric values reported by the stats request",
+        "# TYPE mcp_stats gauge"
+    ]
+    for section, values in stats.items():
+        flat: List[Tuple[str, float]] = []
+        _flatten("", values, flat)
+        for key, value in flat:
+            labels = _format_labels(("section", "key"), (section, key))
+            lines.append(f"mcp_stats{labels} {_format_value(value)}")
+    return lines
+
+REGISTRY = Registry()
+
+TOOL_DURATION = REGISTRY.register(Histogram(
+    "mcp_tool_duration_seconds", "Tool handler latency", ("tool",)
+))
+TOOL_IN_FLIGHT = REGISTRY.register(Gauge(
+    "mcp_tool_in_flight", "Tool calls currently running", ("tool",)
+))
+TOOL_RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "mcp_tool_response_bytes", "Encoded tool call response size", ("tool",), SIZE_BUCKETS
+))
+TOOL_ERRORS = REGISTRY.register(Counter(
+    "mcp_tool_errors_total", "Tool calls that raised, by exception type", ("tool", "error")
+))
+UPSTREAM_DURATION = REGISTRY.register(Histogram(
+    "mcp_upstream_duration_seconds", "Grafana request latency by endpoint class", ("endpoint",)
+))
+UPSTREAM_IN_FLIGHT = REGISTRY.register(Gauge(
+    "mcp_upstream_in_flight", "Grafana requests currently in flight", ("endpoint",)
+))
+UPSTREAM_RESPONSES = REGISTRY.register(Counter(
+    "mcp_upstream_responses_total", "Grafana responses by status code", ("endpoint", "code")
+))
+UPSTREAM_RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "mcp_upstream_response_bytes", "Grafana response body size", ("endpoint",), SIZE_BUCKETS
+))
+UPSTREAM_ERRORS = REGISTRY.register(Counter(
+    "mcp_upstream_errors_total", "Grafana requests that failed without a response, by exception type",
+    ("endpoint", "error")
+))
+
+enabled = True
+
+def set_enabled(value: bool):
+    """지표 기록을 켜거나 끕니다."""
+    global enabled
+    enabled = value
+
+def tool_started(tool: str) -> float:
+    """도구 호출 시작을 기록하고 시작 시각을 반환합니다."""
+    if enabled:
+        TOOL_IN_FLIGHT.labels(tool).inc()
+    return time.perf_counter()
+
+def tool_finished(tool: str, started: float, error: Optional[BaseException] = None):
+    """도구 호출 종료를 기록합니다."""
+    if not enabled:
+        return
+    TOOL_IN_FLIGHT.labels(tool).dec()
+    TOOL_DURATION.labels(tool).observe(time.perf_counter() - started)
+    if error is not None:
+        TOOL_ERRORS.labels(tool, type(error).__name__).inc()
+
+def tool_response(tool: str, size: int):
+    """인코딩된 도구 응답 크기를 기록합니다."""
+    if enabled:
+        TOOL_RESPONSE_BYTES.labels(tool).observe(size)
+
+def upstream_started(endpoint: str) -> float:
+    """Grafana 요청 시작을 기록하고 시작 시각을 반환합니다."""
+    if enabled:
+        UPSTREAM_IN_FLIGHT.labels(endpoint).inc()
+    return time.perf_counter()
+
+def upstream_finished(endpoint: str, started: float, status_code: Optional[int] = None,
+                      size: Optional[int] = None, error: Optional[BaseException] = None):
+    """
+    Grafana 요청 종료를 기록합니다.
+
+    Args:
+        endpoint: 엔드포인트 종류
+        started: `upstream_started`가 반환한 시작 시각
+        status_code: 응답 상태 코드 (응답이 없으면 None)
+        size: 응답 본문 크기
+        error: 응답 없이 실패한 경우의 예외
+    """
+    if not enabled:
+        return
+    UPSTREAM_IN_FLIGHT.labels(endpoint).dec()
+    UPSTREAM_DURATION.labels(endpoint).observe(time.perf_counter() - started)
+    if status_code is not None:
+        UPSTREAM_RESPONSES.labels(endpoint, str(status_code)).inc()
+    if size is not None:
+        UPSTREAM_RESPONSE_BYTES.labels(endpoint).observe(size)
+    if error is not None:
+        UPSTREAM_ERRORS.labels(endpoint, type(error).__name__).inc()
+
+async def serve(render, host: str, port: int) -> asyncio.AbstractServer:
+    """
+    `/metrics`만 제공하는 작은 HTTP 서버를 띄웁니다 (STDIO 전송용).
+
+    FastAPI를 불러오지 않도록 asyncio 스트림으로 직접 응답합니다.
+
+    Args:
+        render: 응답 본문(bytes)을 만드는 함수
+        host: 바인드할 호스트
+        port: 바인드할 포트
+
+    Returns:
+        실행 중인 서버
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10.0)
+            # 헤더는 읽고 버립니다
+            while (await asyncio.wait_for(reader.readline(), timeout=10.0)).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] in ("GET", "HEAD") and parts[1].split("?")[0] == "/metrics":
+                body = render()
+                status, content_type = "200 OK", CONTENT_TYPE
+            else:
+                body = b"Not Found\n"
+                status, content_type = "404 Not Found", "text/plain"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+            )
+            if parts[0] != "HEAD":
+                writer.write(body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception:
+            logger.exception("Error serving metrics")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,30 @@
+"""
+대시보드 모델의 패널 탐색 유틸리티
+"""
+from typing import Dict, Any, Iterator, List
+
+def iter_panels(dashboard: Dict[str, Any], include_rows: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    대시보드의 패널을 순서대로 순회합니다.
+
+    접힌 행(row)에 들어 있는 패널도 포함합니다.
+
+    Args:
+        dashboard: 대시보드 모델 (`dashboard` 필드 내용)
+        include_rows: 행 패널 자체도 반환할지 여부
+
+    Returns:
+        패널 딕셔너리 이터레이터
+    """
+    for panel in dashboard.get("panels") or []:
+        if panel.get("type") == "row":
+            if include_rows:
+                yield panel
+            for child in panel.get("panels") or []:
+                yield child
+        else:
+            yield panel
+
+def list_panels(dashboard: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """렌더링 가능한(행이 아닌) 패널 목록을 반환합니다."""
+    return [panel for panel in iter_panels(dashboard) if panel.get("id") is not None]
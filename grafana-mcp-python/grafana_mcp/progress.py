@@ -0,0 +1,85 @@
+"""
+도구 실행 진행 상황 알림
+
+도구 코드는 전송 방식을 모른 채 `report_progress`만 호출하고, 서버는 요청에 진행 토큰
+(`params._meta.progressToken`)이 있을 때만 컨텍스트 변수에 보고 함수를 설정해
+`notifications/progress` 알림을 STDIO 줄이나 SSE 이벤트로 보냅니다. 보고 함수가 없으면
+`report_progress`는 아무 일도 하지 않습니다.
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger("mcp-progress")
+
+# (progress, total, message) -> None
+ProgressCallback = Callable[[float, Optional[float], Optional[str]], Awaitable[None]]
+
+_reporter: ContextVar[Optional[ProgressCallback]] = ContextVar("mcp_progress_reporter", default=None)
+
+def progress_notification(token: Any, progress: float, total: Optional[float] = None,
+                          message: Optional[str] = None) -> Dict[str, Any]:
+    """
+    `notifications/progress` JSON-RPC 알림을 만듭니다.
+
+    Args:
+        token: 요청이 보낸 진행 토큰
+        progress: 지금까지의 진행량 (단조 증가)
+        total: 전체 양 (모르면 None)
+        message: 사람이 읽을 수 있는 현재 단계
+
+    Returns:
+        JSON-RPC 알림 (id 없음)
+    """
+    params: Dict[str, Any] = {"progressToken": token, "progress": progress}
+    if total is not None:
+        params["total"] = total
+    if message:
+        params["message"] = message
+    return {"jsonrpc": "2.0", "method": "notifications/progress", "params": params}
+
+def progress_token(request_data: Dict[str, Any]) -> Any:
+    """요청의 진행 토큰 (`params._meta.progressToken`, 없으면 None)"""
+    params = request_data.get("params")
+    if not isinstance(params, dict):
+        return None
+    meta = params.get("_meta")
+    return meta.get("progressToken") if isinstance(meta, dict) else None
+
+@contextmanager
+def progress_reporter(callback: Optional[ProgressCallback]) -> Iterator[None]:
+    """
+    블록 안에서 실행되는 코드(와 그 코드가 만든 태스크)의 진행 보고 함수를 설정합니다.
+
+    Args:
+        callback: 진행 상황을 받을 비동기 함수 (None이면 보고하지 않음)
+    """
+    reset = _reporter.set(callback)
+    try:
+        yield
+    finally:
+        _reporter.reset(reset)
+
+def progress_enabled() -> bool:
+    """현재 호출에 진행 보고를 받을 곳이 있는지 여부"""
+    return _reporter.get() is not None
+
+async def report_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None):
+    """
+    현재 도구 호출의 진행 상황을 보고합니다.
+
+    알림 전송에 실패해도 도구 실행은 계속됩니다.
+
+    Args:
+        progress: 지금까지의 진행량
+        total: 전체 양
+        message: 현재 단계
+    """
+    callback = _reporter.get()
+    if callback is None:
+        return
+    try:
+        await callback(progress, total, message)
+    except Exception as e:
+        logger.warning(f"Failed to send progress notification: {e}")
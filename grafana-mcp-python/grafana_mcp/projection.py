@@ -0,0 +1,153 @@
+"""
+대시보드 모델 필드 선택(projection)과 요약
+
+`panels[].title,panels[].targets[].expr` 같은 선택자로 필요한 필드만 남깁니다. 선택한 경로를
+따라 한 번만 순회하며 새 컨테이너(dict/list)만 만들고 값 자체는 복사하지 않으므로, 응답 캐시에
+들어 있는 원본을 건드리지 않으면서 직렬화할 데이터 양을 줄입니다.
+"""
+import re
+from typing import Dict, Any, Iterable, List, Optional, Union
+from .panels import iter_panels
+
+# 선택자 트리: 키 -> 하위 트리 (None이면 값 전체)
+FieldTree = Dict[str, Optional["FieldTree"]]
+
+# 요약 모드에서 쿼리 식을 자르는 길이
+SUMMARY_QUERY_LENGTH = 200
+
+_SEGMENT = re.compile(r"^(\*|[A-Za-z0-9_$@-]+)(\[\])?$")
+
+# 쿼리 식으로 취급하는 타깃 필드
+_QUERY_KEYS = ("expr", "query", "rawSql", "target")
+
+def parse_fields(fields: Union[str, Iterable[str]]) -> FieldTree:
+    """
+    선택자 목록을 트리로 만듭니다.
+
+    Args:
+        fields: 쉼표로 구분한 문자열 또는 선택자 목록. 선택자는 `.`으로 구분한 키 경로이며,
+            `[]`는 리스트의 각 항목에 나머지 경로를 적용함을 뜻합니다 (리스트는 `[]` 없이도
+            항목 단위로 처리). `*`는 모든 키와 일치합니다.
+
+    Returns:
+        선택자 트리
+    """
+    if isinstance(fields, str):
+        fields = fields.split(",")
+
+    tree: FieldTree = {}
+    for selector in fields:
+        selector = selector.strip()
+        if not selector:
+            continue
+        node = tree
+        segments = selector.split(".")
+        for position, segment in enumerate(segments):
+            match = _SEGMENT.match(segment)
+            if not match:
+                raise ValueError(f"Invalid field selector: {selector}")
+            key = match.group(1)
+            last = position == len(segments) - 1
+            if last:
+                # 더 짧은 선택자가 값 전체를 고르면 하위 선택자는 의미가 없습니다
+                node[key] = None
+            else:
+                child = node.get(key, {})
+                if child is None:
+                    break
+                node[key] = child
+                node = child
+    if not tree:
+        raise ValueError("No field selectors given")
+    return tree
+
+def project(value: Any, tree: Optional[FieldTree]) -> Any:
+    """
+    선택자 트리에 해당하는 부분만 남긴 값을 반환합니다.
+
+    Args:
+        value: 원본 값 (변경하지 않음)
+        tree: 선택자 트리 (None이면 원본 값 그대로)
+
+    Returns:
+        선택한 필드만 담은 값 (없는 키는 생략)
+    """
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    wildcard = tree.get("*", False)
+    if wildcard is not False:
+        result = {}
+        for key, item in value.items():
+            result[key] = project(item, tree[key] if key in tree else wildcard)
+        return result
+    return {key: project(value[key], subtree) for key, subtree in tree.items() if key in value}
+
+def _query_text(target: Dict[str, Any]) -> Optional[str]:
+    for key in _QUERY_KEYS:
+        text = target.get(key)
+        if isinstance(text, str) and text:
+            if len(text) > SUMMARY_QUERY_LENGTH:
+                return text[:SUMMARY_QUERY_LENGTH] + "…"
+            return text
+    return None
+
+def _datasource_label(datasource: Any) -> Optional[str]:
+    if isinstance(datasource, dict):
+        return datasource.get("uid") or datasource.get("type")
+    return datasource
+
+def summarize_dashboard(dashboard: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    대시보드를 패널 개요로 요약합니다.
+
+    Args:
+        dashboard: 대시보드 모델
+
+    Returns:
+        제목, 태그, 시간 범위, 변수 이름, 패널 목록(ID, 제목, 타입, 행, 데이터소스, 쿼리)
+    """
+    panels: List[Dict[str, Any]] = []
+    row = None
+    for panel in iter_panels(dashboard, include_rows=True):
+        if panel.get("type") == "row":
+            row = panel.get("title")
+            continue
+        queries = []
+        for target in panel.get("targets") or []:
+            if target.get("hide"):
+                continue
+            text = _query_text(target)
+            if text:
+                queries.append({"ref_id": target.get("refId"), "query": text})
+        summary = {
+            "id": panel.get("id"),
+            "title": panel.get("title", ""),
+            "type": panel.get("type", ""),
+        }
+        if row:
+            summary["row"] = row
+        datasource = _datasource_label(panel.get("datasource"))
+        if datasource:
+            summary["datasource"] = datasource
+        if queries:
+            summary["queries"] = queries
+        panels.append(summary)
+
+    return {
+        "uid": dashboard.get("uid"),
+        "title": dashboard.get("title", ""),
+        "tags": dashboard.get("tags", []),
+        "time": dashboard.get("time"),
+        "refresh": dashboard.get("refresh"),
+        "variables": [
+            variable.get("name")
+            for variable in (dashboard.get("templating") or {}).get("list") or []
+        ],
+        "panel_count": len(panels),
+        "panels": panels
+    }
@@ -0,0 +1,213 @@
+"""
+대시보드/패널 렌더링 파이프라인
+"""
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+from .client import GrafanaClient
+from .image_cache import ImageCache, CachedImage, image_cache_key, quantize_time_range, DEFAULT_TIME_BUCKET
+from .imaging import Transcoder, MIME_TYPES, DEFAULT_QUALITY, needs_transcode
+from .streaming import BlobStream
+
+logger = logging.getLogger("grafana-rendering")
+
+# Grafana 렌더러는 항상 PNG를 반환합니다
+RENDER_MIME_TYPE = "image/png"
+
+class RenderResult:
+    """렌더링 결과"""
+
+    def __init__(self, image: CachedImage, cached: bool,
+                 from_time: Optional[str], to_time: Optional[str],
+                 dashboard_version: Optional[int]):
+        self.image = image
+        self.cached = cached
+        self.from_time = from_time
+        self.to_time = to_time
+        self.dashboard_version = dashboard_version
+
+    @property
+    def image_type(self) -> str:
+        """이미지 MIME 타입"""
+        return self.image.mime_type
+
+    def blob(self) -> BlobStream:
+        """도구 결과에 넣을 지연 전송 값 (전송 계층이 인라인/스트리밍 방식을 결정)"""
+        return self.image.as_blob()
+
+class _Deadline:
+    """렌더링 요청 제한의 자리를 얻은 뒤부터 재는 패널별 제한 시간 (렌더링과 변환에 함께 적용)"""
+
+    def __init__(self, timeout: Optional[float]):
+        self.timeout = timeout
+        self.at: Optional[float] = None
+
+    def start(self):
+        if self.timeout is not None and self.at is None:
+            self.at = time.monotonic() + self.timeout
+
+    async def bound(self, awaitable: Awaitable) -> Any:
+        """남은 시간 안에 끝나기를 기다립니다 (아직 시작하지 않았으면 지금부터 잼)."""
+        if self.timeout is None:
+            return await awaitable
+        self.start()
+        return await asyncio.wait_for(awaitable, max(0.0, self.at - time.monotonic()))
+
+async def render_image(client: GrafanaClient, dashboard_uid: str, panel_id: Optional[int] = None,
+                       width: int = 1000, height: int = 500,
+                       from_time: Optional[str] = None, to_time: Optional[str] = None,
+                       theme: str = "light", image_cache: Optional[ImageCache] = None,
+                       use_cache: bool = True,
+                       time_bucket: int = DEFAULT_TIME_BUCKET,
+                       image_format: str = "png", quality: int = DEFAULT_QUALITY,
+                       max_bytes: Optional[int] = None, scale: float = 1.0,
+                       transcoder: Optional[Transcoder] = None,
+                       timeout: Optional[float] = None,
+                       dashboard_data: Optional[Dict[str, Any]] = None) -> RenderResult:
+    """
+    대시보드 또는 패널을 렌더링해 이미지 캐시에 저장합니다.
+
+    렌더링 응답은 청크 단위로 받아 원본과 Base64 파일에 바로 쓰므로 이미지 크기와 관계없이
+    메모리 사용량이 일정합니다. `use_cache`가 참이면 대시보드 버전과 양자화한 절대 시간
+    범위를 키에 포함해 캐시를 먼저 확인하고, 렌더링도 같은 절대 시간 범위로 요청하므로
+    캐시된 이미지는 키와 정확히 일치합니다.
+
+    렌더러는 PNG만 만들기 때문에 다른 포맷, 크기 상한, 렌더러가 적용하지 못한 배율은
+    `transcoder` 워커 풀에서 변환하고, 변환 결과도 별도 키로 캐시합니다.
+
+    Args:
+        client: Grafana 클라이언트
+        dashboard_uid: 대시보드 UID
+        panel_id: 패널 ID (None인 경우 전체 대시보드)
+        width: 이미지 너비
+        height: 이미지 높이
+        from_time: 시작 시간 (None이면 대시보드 기본 시간 범위)
+        to_time: 종료 시간 (None이면 대시보드 기본 시간 범위)
+        theme: 테마 (light 또는 dark)
+        image_cache: 렌더링 결과를 저장할 이미지 캐시
+        use_cache: 저장된 이미지를 재사용할지 여부 (거짓이면 저장만 하고 항상 새로 렌더링)
+        time_bucket: 상대 시간 양자화 단위 (초)
+        image_format: 출력 포맷 (png, webp, jpeg)
+        quality: 손실 포맷 품질 (1-100)
+        max_bytes: 출력 이미지 최대 크기 (바이트)
+        scale: 배율 (출력 픽셀 = 너비/높이 x scale)
+        transcoder: 이미지 변환 워커 풀
+        timeout: 렌더링과 변환을 합친 제한 시간 (초, 렌더링 요청 제한의 자리를 얻은 뒤부터 잼)
+        dashboard_data: 이미 가져온 대시보드 (주면 버전과 기본 시간 범위를 다시 가져오지 않음)
+
+    Returns:
+        렌더링 결과
+    """
+    if image_cache is None:
+        raise ValueError("Image store is not configured")
+    if image_format not in MIME_TYPES:
+        raise ValueError(f"Unsupported image format: {image_format}")
+
+    version = None
+    if use_cache:
+        # 대시보드 버전과 기본 시간 범위 확인 (응답 캐시로 대부분 가벼운 버전 확인만 발생)
+        if dashboard_data is None:
+            dashboard_data = await client.get_dashboard_by_uid(dashboard_uid)
+        dashboard = dashboard_data.get("dashboard", {}) if isinstance(dashboard_data, dict) else {}
+        meta = dashboard_data.get("meta", {}) if isinstance(dashboard_data, dict) else {}
+        version = meta.get("version", dashboard.get("version"))
+        default_time = dashboard.get("time") or {}
+
+        from_time, to_time = quantize_time_range(
+            from_time or default_time.get("from", "now-6h"),
+            to_time or default_time.get("to", "now"),
+            bucket=time_bucket
+        )
+
+    parts = dict(
+        dashboard_uid=dashboard_uid,
+        panel_id=panel_id,
+        width=width,
+        height=height,
+        theme=theme,
+        scale=scale,
+        version=version,
+        from_time=from_time,
+        to_time=to_time
+    )
+    # 다른 Grafana 인스턴스/조직의 같은 UID와 섞이지 않도록 테넌트 이름공간을 키에 넣습니다
+    if client.cache_namespace:
+        parts["tenant"] = client.cache_namespace
+    key = image_cache_key(**parts)
+    target_size = (max(1, round(width * scale)), max(1, round(height * scale))) if scale != 1.0 else None
+    variant_key = image_cache_key(
+        source=key,
+        image_format=image_format,
+        quality=quality,
+        max_bytes=max_bytes,
+        target_size=target_size
+    )
+    plain = image_format == "png" and max_bytes is None and target_size is None
+
+    if use_cache:
+        cached = await asyncio.to_thread(image_cache.get, key if plain else variant_key)
+        if cached is not None:
+            return RenderResult(cached, True, from_time, to_time, version)
+
+    image = None
+    if use_cache and not plain:
+        image = await asyncio.to_thread(image_cache.get, key)
+
+    deadline = _Deadline(timeout)
+
+    if image is None:
+        async def render() -> CachedImage:
+            return await _render_to_cache(
+                client, image_cache, key,
+                dashboard_uid=dashboard_uid,
+                panel_id=panel_id,
+                width=width,
+                height=height,
+                from_time=from_time,
+                to_time=to_time,
+                theme=theme,
+                scale=scale,
+                timeout=timeout,
+                on_slot=deadline.start
+            )
+
+        image = await _coalesced(client, ("render", key), render)
+
+    if not plain and needs_transcode(image.path, image.size, image_format, max_bytes, target_size):
+        if transcoder is None:
+            raise ValueError("Image transcoding is not configured")
+
+        source = image
+
+        async def transcode() -> CachedImage:
+            digest, raw_path, b64_path, size, encoded_size = await transcoder.transcode(
+                source.path, source.size, image_cache.tmp_dir, image_format, quality,
+                max_bytes, target_size, theme
+            )
+            return await asyncio.to_thread(
+                image_cache.commit_files, variant_key, digest, raw_path, b64_path,
+                size, encoded_size, MIME_TYPES[image_format]
+            )
+
+        image = await deadline.bound(_coalesced(client, ("transcode", variant_key), transcode))
+
+    return RenderResult(image, False, from_time, to_time, version)
+
+async def _coalesced(client: GrafanaClient, key, fn: Callable[[], Awaitable[CachedImage]]) -> CachedImage:
+    """같은 렌더링/변환이 진행 중이면 결과 파일을 공유합니다."""
+    if client.singleflight is not None:
+        return await client.singleflight.do(key, fn)
+    return await fn()
+
+async def _render_to_cache(client: GrafanaClient, image_cache: ImageCache, key: str,
+                           **render_params: Any) -> CachedImage:
+    """렌더링 응답을 스트리밍으로 받아 이미지 캐시에 씁니다."""
+    writer = await asyncio.to_thread(image_cache.writer)
+    try:
+        async for chunk in client.stream_dashboard_screenshot(**render_params):
+            writer.write(chunk)
+        return await asyncio.to_thread(image_cache.commit, key, writer, RENDER_MIME_TYPE)
+    except BaseException:
+        writer.abort()
+        raise
@@ -0,0 +1,382 @@
+"""
+Grafana 요청 재시도, 헤지 요청, 서킷 브레이커
+
+- 재시도: 멱등한 GET/HEAD 요청이 연결 오류, 타임아웃, 429/502/503/504로 실패하면 지수
+  백오프에 full jitter를 더한 간격으로 다시 보냅니다 (`Retry-After`가 있으면 따름).
+- 헤지 요청: 검색과 대시보드 조회가 최근 지연 시간의 p95보다 오래 걸리면 같은 요청을 한 번 더
+  보내고 먼저 온 응답을 사용합니다. 꼬리 지연만 줄이도록 느린 요청에만 추가 요청이 생깁니다.
+  지연 시간은 요청 제한의 자리를 얻은 뒤의 왕복 시간만 재고, 대기열에 기다리는 요청이 있으면
+  추가 요청을 보내지 않습니다.
+- 서킷 브레이커: 연결 오류, 타임아웃, 502/503/504가 연속으로 임계값에 이르면 일정 시간 동안
+  요청을 보내지 않고 바로 실패시킵니다. Grafana가 내려가 있을 때 호출마다 타임아웃을 기다리지
+  않게 합니다. 500처럼 Grafana가 직접 돌려준 오류(실패한 데이터소스 쿼리 등)는 장애로 보지
+  않습니다.
+"""
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+logger = logging.getLogger("grafana-resilience")
+
+T = TypeVar('T')
+
+# 재시도할 수 있는 상태 코드
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# 서킷 브레이커가 Grafana 장애로 보는 상태 코드 (프록시/게이트웨이가 Grafana에 닿지 못한 경우)
+OUTAGE_STATUSES = frozenset({502, 503, 504})
+
+# 헤지 요청을 보낼 엔드포인트 종류 (limits.endpoint_class 기준, 읽기 전용이고 응답이 작은 것)
+HEDGE_CLASSES = frozenset({"search", "dashboard"})
+
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BASE_DELAY = 0.1
+DEFAULT_RETRY_MAX_DELAY = 2.0
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET = 30.0
+DEFAULT_HEDGE_MIN_DELAY = 0.05
+
+# 헤지 지연을 계산하기 전까지 사용할 지연 시간과 필요한 최소 표본 수
+_HEDGE_INITIAL_DELAY = 1.0
+_HEDGE_MIN_SAMPLES = 20
+
+class CircuitOpenError(httpx.TransportError):
+    """서킷 브레이커가 열려 요청을 보내지 않았을 때 발생하는 오류"""
+
+def is_failure(error: BaseException) -> bool:
+    """
+    Grafana 자체의 장애로 볼 오류인지 여부
+
+    4xx와 500은 Grafana가 응답한 것이므로 장애가 아닙니다. `/api/ds/query`는 쿼리 하나가
+    실패해도 500과 refId별 결과를 돌려주므로, 잘못된 쿼리가 대시보드/검색까지 막지 않도록
+    연결 오류와 502/503/504만 장애로 셉니다.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in OUTAGE_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+def is_retryable(error: BaseException) -> bool:
+    """다시 보내면 성공할 수 있는 오류인지 여부"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRY_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """응답의 `Retry-After` 헤더(초)"""
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    value = error.response.headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+class RetryPolicy:
+    """지수 백오프와 full jitter를 사용하는 재시도 정책"""
+
+    def __init__(self, retries: int = DEFAULT_RETRIES, base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+                 max_delay: float = DEFAULT_RETRY_MAX_DELAY):
+        """
+        Args:
+            retries: 첫 시도 뒤 최대 재시도 횟수 (0이면 재시도하지 않음)
+            base_delay: 첫 재시도 간격의 상한 (초)
+            max_delay: 재시도 간격의 최대값 (초)
+        """
+        self.retries = max(0, retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        재시도 전에 기다릴 시간을 계산합니다.
+
+        Args:
+            attempt: 지금까지 실패한 횟수 - 1 (첫 재시도는 0)
+            error: 마지막 오류 (`Retry-After`가 있으면 그 값을 최대 `max_delay`까지 따름)
+
+        Returns:
+            대기 시간 (초)
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        retry_after = _retry_after(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 서킷 브레이커
+
+    closed: 요청을 그대로 보냄 → 연속 실패가 `threshold`에 이르면 open
+    open: `reset_timeout` 동안 바로 실패 → 시간이 지나면 half_open
+    half_open: 시험 요청 하나만 보냄 → 성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self, threshold: int = DEFAULT_BREAKER_THRESHOLD, reset_timeout: float = DEFAULT_BREAKER_RESET):
+        """
+        Args:
+            threshold: open으로 바꿀 연속 실패 횟수
+            reset_timeout: open 상태를 유지할 시간 (초)
+        """
+        self.threshold = max(1, threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opens = 0
+        self.rejected = 0
+
+    def before(self):
+        """요청을 보내도 되는지 확인합니다 (안 되면 CircuitOpenError)."""
+        if self.state == "closed":
+            return
+        remaining = self._opened_at + self.reset_timeout - time.monotonic()
+        if self.state == "open" and remaining <= 0:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(
+            f"Grafana circuit breaker is open after {self.failures} consecutive failures "
+            f"(retry in {max(0.0, remaining):.0f}s)"
+        )
+
+    def record_success(self):
+        """요청 성공(또는 Grafana가 응답한 4xx)을 기록합니다."""
+        if self.state != "closed":
+            logger.info("Grafana circuit breaker closed")
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        """Grafana 장애로 인한 실패를 기록합니다."""
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+            if self.state == "closed":
+                logger.warning(f"Grafana circuit breaker opened after {self.failures} consecutive failures")
+                self.opens += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+    def record_cancel(self):
+        """시험 요청이 결과 없이 취소되면 다른 요청이 시험할 수 있게 합니다."""
+        self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        """브레이커 상태"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "threshold": self.threshold,
+            "reset_timeout": self.reset_timeout,
+            "opens": self.opens,
+            "rejected": self.rejected
+        }
+
+class LatencyWindow:
+    """최근 지연 시간 표본에서 백분위수를 구합니다."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._cached: Optional[float] = None
+        self._added = 0
+
+    def add(self, latency: float):
+        self._samples.append(latency)
+        self._added += 1
+        # 정렬 비용을 줄이도록 몇 개가 쌓일 때마다 다시 계산합니다
+        if self._added % 10 == 0:
+            self._cached = None
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self._samples) < _HEDGE_MIN_SAMPLES:
+            return None
+        if self._cached is None:
+            ordered = sorted(self._samples)
+            self._cached = ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+        return self._cached
+
+class Hedger:
+    """
+    느린 요청에 같은 요청을 한 번 더 보내 먼저 온 응답을 사용합니다.
+
+    요청 제한의 대기 시간이 지연 시간에 섞이지 않도록 자리를 얻은 뒤 HTTP 요청만 감싸서 실행합니다.
+    """
+
+    def __init__(self, percentile: float = 0.95, min_delay: float = DEFAULT_HEDGE_MIN_DELAY):
+        """
+        Args:
+            percentile: 헤지 요청을 보낼 지연 시간 백분위수
+            min_delay: 헤지 요청을 보내기 전 최소 대기 시간 (초)
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self._windows: Dict[str, LatencyWindow] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+
+    def delay_for(self, name: str) -> float:
+        """헤지 요청을 보내기 전에 기다릴 시간"""
+        window = self._windows.get(name)
+        observed = window.percentile(self.percentile) if window is not None else None
+        return max(self.min_delay, observed if observed is not None else _HEDGE_INITIAL_DELAY)
+
+    async def run(self, name: str, fn: Callable[[], Awaitable[T]],
+                  may_hedge: Optional[Callable[[], bool]] = None) -> T:
+        """
+        요청을 실행하고, 지연 시간이 길면 한 번 더 보내 먼저 성공한 결과를 반환합니다.
+
+        Args:
+            name: 지연 시간 통계를 나눌 이름 (엔드포인트 종류)
+            fn: 요청 함수 (요청 제한의 자리를 얻은 뒤 HTTP 요청만 보내는 함수)
+            may_hedge: 추가 요청을 보내도 되는지 확인하는 함수 (거짓이면 원래 요청만 기다림)
+
+        Returns:
+            먼저 성공한 요청의 결과
+        """
+        window = self._windows.setdefault(name, LatencyWindow())
+        started = time.monotonic()
+        primary = asyncio.ensure_future(fn())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay_for(name))
+            if not done:
+                if may_hedge is None or may_hedge():
+                    self.hedged += 1
+                    tasks.add(asyncio.ensure_future(fn()))
+                else:
+                    # 대기열이 있을 때 추가 요청을 보내면 과부하 상태의 Grafana에 부하만 더합니다
+                    self.hedges_skipped += 1
+
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        window.add(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """헤지 통계"""
+        return {
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedges_skipped": self.hedges_skipped,
+            "delays_ms": {name: round(self.delay_for(name) * 1000, 1) for name in self._windows}
+        }
+
+class Resilience:
+    """
+    재시도 정책, 서킷 브레이커, 헤지 요청을 묶어 둡니다.
+
+    `execute`는 재시도와 브레이커를 적용하고, 헤지는 요청 제한의 자리를 얻은 뒤에 해야 하므로
+    클라이언트가 `hedger`를 직접 사용합니다.
+    """
+
+    def __init__(self, retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                 hedger: Optional[Hedger] = None):
+        """
+        Args:
+            retry: 재시도 정책 (None이면 재시도하지 않음)
+            breaker: 서킷 브레이커 (None이면 사용하지 않음)
+            hedger: 헤지 요청 (None이면 사용하지 않음)
+        """
+        self.retry = retry
+        self.breaker = breaker
+        self.hedger = hedger
+        self.retries = 0
+        self.retry_exhausted = 0
+
+    async def execute(self, fn: Callable[[], Awaitable[T]], idempotent: bool) -> T:
+        """
+        요청을 실행합니다.
+
+        Args:
+            fn: 요청 한 번을 보내는 함수
+            idempotent: 재시도해도 되는 요청인지 여부
+
+        Returns:
+            요청 결과
+        """
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.before()
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                if self.breaker is not None:
+                    self.breaker.record_cancel()
+                raise
+            except Exception as e:
+                if self.breaker is not None:
+                    if is_failure(e):
+                        self.breaker.record_failure()
+                    elif not isinstance(e, CircuitOpenError):
+                        self.breaker.record_success()
+
+                can_retry = idempotent and self.retry is not None and is_retryable(e)
+                if not can_retry or attempt >= self.retry.retries:
+                    if can_retry:
+                        self.retry_exhausted += 1
+                    raise
+                delay = self.retry.delay(attempt, e)
+                logger.warning(f"Retrying Grafana request in {delay:.2f}s after error: {e}")
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return result
+
+    def guard(self):
+        """재시도 없이 실행하는 요청(스트리밍 등) 전에 브레이커를 확인합니다."""
+        if self.breaker is not None:
+            self.breaker.before()
+
+    def record(self, error: Optional[BaseException] = None):
+        """`guard`로 시작한 요청의 결과를 브레이커에 기록합니다."""
+        if self.breaker is None:
+            return
+        if error is None:
+            self.breaker.record_success()
+        elif isinstance(error, (asyncio.CancelledError, GeneratorExit, asyncio.TimeoutError)):
+            # 소비자가 스트림을 일찍 닫았거나 호출자의 제한 시간이 지난 경우로, Grafana의 결과가 아닙니다
+            self.breaker.record_cancel()
+        elif is_failure(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        """재시도/브레이커/헤지 통계"""
+        return {
+            "retries": self.retries,
+            "retry_exhausted": self.retry_exhausted,
+            "max_retries": self.retry.retries if self.retry is not None else 0,
+            "breaker": self.breaker.stats() if self.breaker is not None else None,
+            "hedging": self.hedger.stats() if self.hedger is not None else None
+        }
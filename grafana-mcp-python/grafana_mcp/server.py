@@ -1,22 +1,72 @@
 """
 MCP 서버 구현
 """
-import json
 import sys
+import time
 import asyncio
 import logging
-from typing import Dict, List, Any, Callable, Optional, Union, Tuple
+from typing import Dict, List, Any, AsyncIterator, Awaitable, Callable, Optional, Set, Union, Tuple
 import uuid
 
-# FastAPI를 사용한 SSE 지원을 위해
-from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse
-import uvicorn
+from . import codec
+from . import metrics
+from . import tracing
+from . import tenants
+from .progress import progress_notification, progress_reporter, progress_token
+from .streaming import ResourceStore, find_blobs, replace_at, materialize_blobs
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mcp-server")
 
+def _sse_event(event: str, data: Any) -> str:
+    """SSE 이벤트 한 건을 만듭니다."""
+    return f"event: {event}\ndata: {_encode_response(data).decode('utf-8')}\n\n"
+
+def _sse_message(message: Union[Dict[str, Any], bytes]) -> bytes:
+    """Streamable HTTP 전송의 SSE `message` 이벤트 한 건을 만듭니다."""
+    data = message if isinstance(message, bytes) else _encode_response(message)
+    return b"event: message\ndata: " + data + b"\n\n"
+
+def _encode_response(response: Dict[str, Any]) -> bytes:
+    """
+    JSON-RPC 응답을 인코딩합니다.
+
+    도구 결과는 응답에 구조 그대로 들어가므로 직렬화할 수 없는 값이 있으면 여기서 실패합니다.
+    이때도 요청자가 응답을 받을 수 있도록 같은 `id`의 오류 응답으로 바꿉니다.
+    """
+    try:
+        return codec.dumps(response)
+    except (TypeError, ValueError) as e:
+        logger.error(f"Error encoding response: {e}")
+        return codec.dumps({
+            "jsonrpc": "2.0",
+            "id": response.get("id") if isinstance(response, dict) else None,
+            "error": {
+                "code": -32603,
+                "message": f"Error encoding response: {str(e)}"
+            }
+        })
+
+def _json_response(data: Union[Dict[str, Any], bytes]):
+    """FastAPI의 기본 직렬화(jsonable_encoder)를 거치지 않고 코덱으로 바로 인코딩한 응답"""
+    from fastapi.responses import Response
+    content = data if isinstance(data, bytes) else _encode_response(data)
+    return Response(content=content, media_type="application/json")
+
+async def _read_json(request) -> Any:
+    """요청 본문을 코덱으로 디코딩합니다."""
+    from fastapi import HTTPException
+    try:
+        return codec.loads(await request.body())
+    except codec.decode_errors():
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+async def _in_trace(awaitable: Awaitable[Any], **attributes: Any) -> Any:
+    """다른 태스크에서 실행할 요청 처리를 루트 span으로 감쌉니다."""
+    with tracing.trace("mcp.request", **attributes):
+        return await awaitable
+
 class MCPTool:
     """MCP 도구 정의"""
     def __init__(self, name: str, description: str, input_schema: Dict[str, Any]):
@@ -24,40 +74,143 @@ class MCPTool:
         self.description = description
         self.input_schema = input_schema
 
+# STDIO 전송에서 동시에 처리할 최대 요청 수 기본값
+DEFAULT_MAX_CONCURRENCY = 32
+
+# 배치 요청 하나 안에서 동시에 실행할 최대 요청 수와 배치 최대 크기 기본값
+DEFAULT_BATCH_CONCURRENCY = 8
+DEFAULT_MAX_BATCH_SIZE = 100
+
 class GrafanaMCPServer:
     """MCP 서버 구현"""
-    def __init__(self, name: str, version: str):
+    def __init__(self, name: str, version: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 batch_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
         self.name = name
         self.version = version
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_concurrency = max(1, batch_concurrency)
+        self.max_batch_size = max(1, max_batch_size)
+        self._write_lock: Optional[asyncio.Lock] = None
+        self.resource_store: Optional[ResourceStore] = None
         self.tools: Dict[str, Tuple[MCPTool, Callable]] = {}
-        self.app = FastAPI(title=f"{name} MCP Server")
-        self._setup_sse_routes()
+        # 인코딩된 도구 목록 캐시 (도구가 등록/제거되면 무효화)
+        self._tools_json: Optional[bytes] = None
+        self.stats_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        # 참이면 `grafana` 도구 인자와 X-Grafana-* 헤더로 Grafana 인스턴스/조직을 고름
+        self.tenant_routing = False
+        self._app = None
+        
+    @property
+    def app(self):
+        """SSE 전송용 FastAPI 앱 (STDIO 전송의 시작 시간을 줄이도록 처음 사용할 때 생성)"""
+        if self._app is None:
+            from fastapi import FastAPI
+            self._app = FastAPI(title=f"{self.name} MCP Server")
+            self._setup_sse_routes()
+        return self._app
         
     def add_tool(self, tool: MCPTool, handler: Callable):
         """도구와 해당 핸들러 함수를 등록합니다."""
         self.tools[tool.name] = (tool, handler)
+        self._tools_json = None
         logger.info(f"Tool registered: {tool.name}")
         
+    def remove_tool(self, name: str):
+        """등록된 도구를 제거합니다."""
+        if self.tools.pop(name, None) is not None:
+            self._tools_json = None
+        
+    def add_stats_provider(self, name: str, provider: Callable[[], Dict[str, Any]]):
+        """`stats` 요청에 포함할 통계 제공 함수를 등록합니다."""
+        self.stats_providers[name] = provider
+        
     def get_tools(self) -> List[MCPTool]:
         """등록된 모든 도구를 반환합니다."""
         return [tool for tool, _ in self.tools.values()]
     
     def _setup_sse_routes(self):
         """SSE 전송을 위한 라우트 설정"""
+        from fastapi import HTTPException, Request
+        from fastapi.responses import FileResponse, Response, StreamingResponse
+        
         @self.app.post("/v1/initialize")
         async def initialize(request: Request):
-            data = await request.json()
-            return self._handle_initialize(data)
+            data = await _read_json(request)
+            return _json_response(self._handle_initialize(data))
         
         @self.app.post("/v1/list_tools")
         async def list_tools(request: Request):
-            data = await request.json()
-            return self._handle_list_tools(data)
+            data = await _read_json(request)
+            return _json_response(self._list_tools_response(data))
         
         @self.app.post("/v1/call_tool")
         async def call_tool(request: Request):
-            data = await request.json()
-            return await self._handle_call_tool(data)
+            data = await _read_json(request)
+            with tenants.selected(self._header_selection(request)), tracing.trace("mcp.request", transport="http", **{"http.route": "/v1/call_tool"}):
+                if isinstance(data, list):
+                    # 이 경로의 배치는 모두 도구 호출입니다
+                    batch = [{**item, "method": "call_tool"} if isinstance(item, dict) else item for item in data]
+                    response = await self._dispatch_batch(batch)
+                    return _json_response(response) if response is not None else Response(status_code=202)
+                return _json_response(await self._handle_call_tool(data))
+        
+        @self.app.post("/v1/call_tool/stream")
+        async def call_tool_stream(request: Request):
+            data = await _read_json(request)
+            selection = self._header_selection(request)
+            return StreamingResponse(self._stream_call_tool(data, selection), media_type="text/event-stream")
+        
+        @self.app.get("/v1/resources/{token}")
+        async def get_resource(token: str):
+            blob = self.resource_store.get(token) if self.resource_store else None
+            if blob is None:
+                raise HTTPException(status_code=404, detail="Resource not found or expired")
+            return FileResponse(blob.path, media_type=blob.mime_type)
+        
+        @self.app.get("/v1/stats")
+        async def stats():
+            return _json_response(self._handle_stats({})["result"])
+        
+        @self.app.get("/metrics")
+        async def prometheus_metrics():
+            return Response(content=self.metrics_text(), media_type=metrics.CONTENT_TYPE)
+        
+        @self.app.post("/mcp")
+        async def mcp(request: Request):
+            data = await _read_json(request)
+            selection = self._header_selection(request)
+            notification = False
+            if isinstance(data, list):
+                tokens = [progress_token(item) for item in data if isinstance(item, dict)]
+                handle = lambda report_for: self._dispatch_batch(data, report_for)
+            elif isinstance(data, dict):
+                # 알림(id 없음)도 STDIO/배치와 같이 실행하고, 응답 본문 없이 202로 답합니다
+                notification = "id" not in data
+                tokens = [progress_token(data)]
+                handle = lambda report_for: self._dispatch_item(data, report_for)
+            else:
+                raise HTTPException(status_code=400, detail="Expected a JSON-RPC request object or batch array")
+            
+            # 스트리밍 응답은 이 함수가 끝난 뒤 실행되므로 헤더의 테넌트 선택을 처리 함수에 묶어 둡니다
+            async def dispatch(report_for: Callable[[Any], Optional[Callable]]):
+                with tenants.selected(selection):
+                    return await handle(report_for)
+            
+            # 진행 토큰이 있고 클라이언트가 이벤트 스트림을 받을 수 있으면 SSE로 응답합니다
+            streaming = "text/event-stream" in request.headers.get("accept", "")
+            if not streaming or notification or all(token is None for token in tokens):
+                with tracing.trace("mcp.request", transport="http", **{"http.route": "/mcp"}):
+                    response = await dispatch(lambda token: None)
+                    if notification or response is None:
+                        return Response(status_code=202)
+                    return _json_response(response)
+            return StreamingResponse(self._stream_dispatch(dispatch), media_type="text/event-stream")
+        
+        @self.app.get("/mcp")
+        async def mcp_stream():
+            # 서버가 먼저 보내는 메시지가 없으므로 별도 이벤트 스트림은 열지 않습니다
+            return Response(status_code=405, headers={"Allow": "POST"})
     
     def _handle_initialize(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """초기화 요청 처리"""
@@ -72,104 +225,448 @@ class GrafanaMCPServer:
             }
         }
     
-    def _handle_list_tools(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
-        """도구 목록 요청 처리"""
-        tools_data = []
-        for tool_name, (tool, _) in self.tools.items():
-            tools_data.append({
+    def _tools_data(self) -> List[Dict[str, Any]]:
+        return [
+            {
                 "name": tool.name,
                 "description": tool.description,
-                "input_schema": tool.input_schema
-            })
-        
+                "input_schema": self._input_schema(tool)
+            }
+            for tool, _ in self.tools.values()
+        ]
+    
+    def _input_schema(self, tool: MCPTool) -> Dict[str, Any]:
+        """테넌트 선택을 받으면 `grafana` 인자를 더한 입력 스키마"""
+        if not self.tenant_routing:
+            return tool.input_schema
+        return {
+            **tool.input_schema,
+            "properties": {**tool.input_schema.get("properties", {}), tenants.ARGUMENT: tenants.ARGUMENT_SCHEMA}
+        }
+    
+    def _header_selection(self, request) -> Optional[Dict[str, Any]]:
+        """HTTP 요청 헤더의 테넌트 선택 (테넌트 선택을 받지 않으면 None)"""
+        from fastapi import HTTPException
+        if not self.tenant_routing:
+            return None
+        try:
+            return tenants.from_headers(request.headers)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    def _handle_list_tools(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """도구 목록 요청 처리"""
         return {
             "jsonrpc": "2.0",
             "id": request_data.get("id"),
             "result": {
-                "tools": tools_data
+                "tools": self._tools_data()
+            }
+        }
+    
+    def _list_tools_response(self, request_data: Dict[str, Any]) -> bytes:
+        """
+        인코딩된 도구 목록 응답을 반환합니다.
+        
+        도구 목록은 한 번만 인코딩해 두고, 요청마다 `id`만 바꿔 응답 바이트를 이어 붙입니다.
+        """
+        if self._tools_json is None:
+            self._tools_json = codec.dumps(self._tools_data())
+        return b"".join((
+            b'{"jsonrpc":"2.0","id":',
+            codec.dumps(request_data.get("id")),
+            b',"result":{"tools":',
+            self._tools_json,
+            b'}}'
+        ))
+    
+    def _handle_stats(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """서버 통계 요청 처리 (캐시 적중률 등)"""
+        stats = {}
+        for name, provider in self.stats_providers.items():
+            try:
+                stats[name] = provider()
+            except Exception as e:
+                logger.exception(f"Error collecting stats: {name}")
+                stats[name] = {"error": str(e)}
+        
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "result": stats
+        }
+    
+    def _tool_not_found(self, request_data: Dict[str, Any], tool_name: Any) -> Dict[str, Any]:
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "error": {
+                "code": -32601,
+                "message": f"Tool not found: {tool_name}"
+            }
+        }
+    
+    def _tool_error(self, request_data: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "error": {
+                "code": -32000,
+                "message": f"Error calling tool: {str(error)}"
             }
         }
     
-    async def _handle_call_tool(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _invoke_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """도구 핸들러를 실행하고 결과를 그대로 반환합니다."""
+        _, handler = self.tools[tool_name]
+        selection = None
+        if self.tenant_routing and isinstance(arguments, dict) and tenants.ARGUMENT in arguments:
+            arguments = dict(arguments)
+            selection = tenants.from_argument(arguments.pop(tenants.ARGUMENT))
+        started = metrics.tool_started(tool_name)
+        error: Optional[BaseException] = None
+        try:
+            # 비동기 또는 동기 핸들러 지원
+            with tenants.selected(selection), tracing.span("tool.handle"):
+                if asyncio.iscoroutinefunction(handler):
+                    return await handler(arguments)
+                return handler(arguments)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            metrics.tool_finished(tool_name, started, error)
+    
+    def metrics_text(self) -> bytes:
+        """Prometheus 텍스트 형식의 지표 (등록된 통계의 숫자 값 포함)"""
+        return metrics.REGISTRY.render(self._handle_stats({})["result"])
+    
+    async def _handle_call_tool(self, request_data: Dict[str, Any]) -> Union[Dict[str, Any], bytes]:
         """도구 호출 요청 처리"""
         params = request_data.get("params", {})
         tool_name = params.get("name")
         arguments = params.get("arguments", {})
         
         if tool_name not in self.tools:
-            return {
-                "jsonrpc": "2.0",
-                "id": request_data.get("id"),
-                "error": {
-                    "code": -32601,
-                    "message": f"Tool not found: {tool_name}"
-                }
-            }
+            return self._tool_not_found(request_data, tool_name)
         
-        try:
-            _, handler = self.tools[tool_name]
-            # 비동기 또는 동기 핸들러 지원
-            if asyncio.iscoroutinefunction(handler):
-                result = await handler(arguments)
-            else:
-                result = handler(arguments)
+        profile = tracing.profiler.begin(tool_name) if tracing.profiler is not None else None
+        started = time.perf_counter()
+        with tracing.span("call_tool", **{"mcp.tool": tool_name}) as span:
+            try:
+                result = await self._invoke_tool(tool_name, arguments)
                 
-            # 결과가 문자열이 아니면 JSON으로 직렬화
-            if not isinstance(result, str):
-                result = json.dumps(result)
+                # 이미지 같은 지연 전송 값은 Base64 문자열로 채움
+                with tracing.span("encode_blobs"):
+                    result = await materialize_blobs(result)
                 
-            return {
-                "jsonrpc": "2.0",
-                "id": request_data.get("id"),
-                "result": {
-                    "content": result
-                }
-            }
+                # 구조화된 결과는 문자열로 미리 직렬화하지 않고 응답에 그대로 넣어 한 번만 인코딩합니다
+                # (응답 크기를 기록하도록 여기서 인코딩해 bytes로 반환)
+                with tracing.span("serialize") as serialize_span:
+                    response = _encode_response({
+                        "jsonrpc": "2.0",
+                        "id": request_data.get("id"),
+                        "result": {
+                            "content": result
+                        }
+                    })
+                    if serialize_span is not None:
+                        serialize_span.set_attribute("mcp.response.bytes", len(response))
+                metrics.tool_response(tool_name, len(response))
+                return response
+            except Exception as e:
+                logger.exception(f"Error calling tool {tool_name}")
+                if span is not None:
+                    span.error = f"{type(e).__name__}: {e}"
+                return self._tool_error(request_data, e)
+            finally:
+                if profile is not None:
+                    path = tracing.profiler.end(
+                        profile, time.perf_counter() - started, span.trace_id if span is not None else None
+                    )
+                    if path is not None and span is not None:
+                        span.set_attribute("mcp.profile.file", path)
+    
+    async def _stream_call_tool(self, request_data: Dict[str, Any],
+                                selection: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """
+        도구 호출 결과를 SSE 이벤트로 스트리밍합니다.
+        
+        결과 안의 이미지 같은 바이너리 값은 `chunk` 이벤트로 Base64 청크를 나눠 보내고,
+        마지막 `result` 이벤트에는 해당 위치에 크기와 MIME 타입만 담긴 JSON-RPC 응답을
+        보냅니다. 청크는 `path`로 결과 안의 위치를 알려주며 순서대로 이어 붙이면 됩니다.
+        """
+        params = request_data.get("params", {})
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        
+        if tool_name not in self.tools:
+            yield _sse_event("result", self._tool_not_found(request_data, tool_name))
+            return
+        
+        try:
+            with tenants.selected(selection):
+                result = await self._invoke_tool(tool_name, arguments)
         except Exception as e:
             logger.exception(f"Error calling tool {tool_name}")
-            return {
+            yield _sse_event("result", self._tool_error(request_data, e))
+            return
+        
+        try:
+            for path, blob in find_blobs(result):
+                placeholder = {"streamed": True, "mime_type": blob.mime_type, "size": blob.size}
+                if path:
+                    replace_at(result, path, placeholder)
+                else:
+                    result = placeholder
+                async for chunk in blob.aiter_base64():
+                    yield _sse_event("chunk", {"path": list(path), "data": chunk})
+        except Exception as e:
+            logger.exception(f"Error streaming result of {tool_name}")
+            yield _sse_event("result", self._tool_error(request_data, e))
+            return
+        
+        yield _sse_event("result", {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "result": {
+                "content": result
+            }
+        })
+    
+    async def _stream_dispatch(self, dispatch: Callable[[Callable], Awaitable[Any]]) -> AsyncIterator[bytes]:
+        """
+        요청을 처리하면서 진행 알림을 SSE 이벤트로 보내고, 마지막에 응답을 보냅니다.
+        
+        클라이언트가 연결을 끊으면 진행 중인 도구 실행도 취소합니다.
+        
+        Args:
+            dispatch: 진행 토큰별 보고 함수를 만드는 함수를 받아 응답을 반환하는 함수
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def report_for(token: Any) -> Optional[Callable]:
+            if token is None:
+                return None
+            
+            async def report(progress: float, total: Optional[float], message: Optional[str]):
+                queue.put_nowait(progress_notification(token, progress, total, message))
+            return report
+        
+        task = asyncio.create_task(_in_trace(dispatch(report_for), transport="http", streaming=True))
+        try:
+            while not task.done():
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield _sse_message(getter.result())
+                else:
+                    getter.cancel()
+            while not queue.empty():
+                yield _sse_message(queue.get_nowait())
+            response = task.result()
+            if response is not None:
+                yield _sse_message(response)
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    async def _dispatch_one(self, request_data: Dict[str, Any],
+                            report_for: Callable[[Any], Optional[Callable]]) -> Union[Dict[str, Any], bytes]:
+        """요청의 진행 토큰에 맞는 보고 함수를 설정하고 요청을 처리합니다."""
+        with progress_reporter(report_for(progress_token(request_data))), \
+                tracing.span("dispatch", **{"rpc.method": request_data.get("method")}):
+            return await self._dispatch(request_data)
+    
+    def _invalid_request(self, request_id: Any, message: str = "Invalid Request") -> Dict[str, Any]:
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {
+                "code": -32600,
+                "message": message
+            }
+        }
+    
+    async def _dispatch_item(self, item: Any,
+                             report_for: Callable[[Any], Optional[Callable]] = lambda token: None
+                             ) -> Union[Dict[str, Any], bytes, None]:
+        """
+        단일 메시지나 배치 항목 하나를 처리합니다.
+        
+        객체가 아니면 `Invalid Request`를 반환하고, `id`가 없는 알림은 실행만 하고 None을 반환합니다.
+        
+        Args:
+            item: 요청 객체
+            report_for: 진행 토큰별 보고 함수를 만드는 함수
+            
+        Returns:
+            응답 (응답하지 않으면 None)
+        """
+        if not isinstance(item, dict):
+            return self._invalid_request(None)
+        try:
+            response = await self._dispatch_one(item, report_for)
+        except Exception as e:
+            logger.exception("Error processing request")
+            response = {
                 "jsonrpc": "2.0",
-                "id": request_data.get("id"),
+                "id": item.get("id"),
                 "error": {
-                    "code": -32000,
-                    "message": f"Error calling tool: {str(e)}"
+                    "code": -32603,
+                    "message": f"Internal error: {str(e)}"
                 }
             }
+        return response if "id" in item else None
+    
+    async def _dispatch_batch(self, batch: List[Any],
+                              report_for: Callable[[Any], Optional[Callable]] = lambda token: None) -> Optional[bytes]:
+        """
+        JSON-RPC 배치 요청을 처리합니다.
+        
+        배치 안의 요청은 `batch_concurrency`개까지 동시에 실행하고, 응답은 요청 순서대로 하나의
+        배열로 인코딩합니다. `id`가 없는 알림은 실행만 하고 응답에 넣지 않습니다.
+        
+        Args:
+            batch: 요청 객체 목록
+            report_for: 진행 토큰별 보고 함수를 만드는 함수
+            
+        Returns:
+            인코딩된 응답 배열 (응답할 요청이 없으면 None)
+        """
+        if not batch:
+            return _encode_response(self._invalid_request(None, "Empty batch"))
+        if len(batch) > self.max_batch_size:
+            return _encode_response(self._invalid_request(
+                None, f"Batch too large: {len(batch)} requests (max {self.max_batch_size})"
+            ))
+        
+        slots = asyncio.Semaphore(self.batch_concurrency)
+        
+        async def run(item: Any) -> Union[Dict[str, Any], bytes, None]:
+            async with slots:
+                return await self._dispatch_item(item, report_for)
+        
+        responses = await asyncio.gather(*(run(item) for item in batch))
+        parts = [
+            response if isinstance(response, bytes) else _encode_response(response)
+            for response in responses if response is not None
+        ]
+        if not parts:
+            return None
+        return b"[" + b",".join(parts) + b"]"
+    
+    async def _dispatch(self, request_data: Dict[str, Any]) -> Union[Dict[str, Any], bytes]:
+        """JSON-RPC 메서드에 맞는 핸들러로 요청을 전달합니다 (미리 인코딩된 응답은 bytes)."""
+        method = request_data.get("method")
+        
+        if method == "initialize":
+            return self._handle_initialize(request_data)
+        elif method == "list_tools":
+            return self._list_tools_response(request_data)
+        elif method == "call_tool":
+            return await self._handle_call_tool(request_data)
+        elif method == "stats":
+            return self._handle_stats(request_data)
+        
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "error": {
+                "code": -32601,
+                "message": f"Method not found: {method}"
+            }
+        }
+    
+    async def _write_response(self, response: Union[Dict[str, Any], bytes]):
+        """응답을 한 줄로 stdout에 씁니다. 동시에 끝난 요청의 출력이 섞이지 않도록 직렬화합니다."""
+        with tracing.span("write") as span:
+            line = (response if isinstance(response, bytes) else _encode_response(response)) + b"\n"
+            if span is not None:
+                span.set_attribute("mcp.response.bytes", len(line))
+            async with self._write_lock:
+                # 인코딩된 바이트를 그대로 쓰고, 바이트 버퍼가 없는 stdout(테스트 등)이면 문자열로 씁니다
+                out = getattr(sys.stdout, "buffer", None)
+                if out is not None:
+                    sys.stdout.flush()
+                    out.write(line)
+                    out.flush()
+                else:
+                    sys.stdout.write(line.decode("utf-8"))
+                    sys.stdout.flush()
+    
+    def _stdio_reporter(self, token: Any) -> Optional[Callable]:
+        """진행 토큰이 있으면 진행 알림을 stdout에 한 줄씩 쓰는 보고 함수를 만듭니다."""
+        if token is None:
+            return None
+        
+        async def report(progress: float, total: Optional[float], message: Optional[str]):
+            await self._write_response(progress_notification(token, progress, total, message))
+        return report
+    
+    async def _process_line(self, line: Union[bytes, str]):
+        """
+        한 줄의 요청(또는 배치 배열)을 처리하고 응답을 씁니다.
+        
+        단일 메시지도 배치 항목과 같은 규칙을 따릅니다 (알림에는 응답하지 않음).
+        진행 토큰이 있는 요청은 응답 전에 진행 알림 줄도 씁니다.
+        """
+        try:
+            with tracing.trace("mcp.request", transport="stdio"):
+                with tracing.span("decode", **{"mcp.request.bytes": len(line)}):
+                    request_data = codec.loads(line)
+                if isinstance(request_data, list):
+                    response = await self._dispatch_batch(request_data, self._stdio_reporter)
+                    if response is not None:
+                        await self._write_response(response)
+                    return
+                response = await self._dispatch_item(request_data, self._stdio_reporter)
+                if response is not None:
+                    await self._write_response(response)
+        except codec.decode_errors():
+            logger.error("Invalid JSON input")
+        except Exception:
+            logger.exception("Error processing request")
     
     async def _handle_stdin_stdout(self):
-        """STDIO 전송을 사용한 요청/응답 처리"""
-        while True:
+        """
+        STDIO 전송을 사용한 요청/응답 처리
+        
+        입력을 계속 읽으면서 각 요청을 별도 태스크로 실행합니다. 응답은 완료 순서대로
+        JSON-RPC `id`와 함께 기록되며, 동시 실행 수가 `max_concurrency`에 도달하면
+        슬롯이 빌 때까지 다음 줄을 읽지 않습니다 (backpressure).
+        """
+        loop = asyncio.get_running_loop()
+        self._write_lock = asyncio.Lock()
+        slots = asyncio.Semaphore(self.max_concurrency)
+        pending: Set[asyncio.Task] = set()
+        
+        # 바이트 버퍼가 있으면 디코딩 없이 바로 코덱에 넘깁니다
+        stdin = getattr(sys.stdin, "buffer", sys.stdin)
+        
+        async def run(line: Union[bytes, str]):
             try:
-                line = await asyncio.get_event_loop().run_in_executor(None, sys.stdin.readline)
-                if not line:
-                    break
-                    
-                request_data = json.loads(line)
-                method = request_data.get("method")
-                
-                if method == "initialize":
-                    response = self._handle_initialize(request_data)
-                elif method == "list_tools":
-                    response = self._handle_list_tools(request_data)
-                elif method == "call_tool":
-                    response = await self._handle_call_tool(request_data)
-                else:
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_data.get("id"),
-                        "error": {
-                            "code": -32601,
-                            "message": f"Method not found: {method}"
-                        }
-                    }
-                
-                # 응답 전송
-                print(json.dumps(response), flush=True)
-                
-            except json.JSONDecodeError:
-                logger.error("Invalid JSON input")
-            except Exception as e:
-                logger.exception("Error processing request")
+                await self._process_line(line)
+            finally:
+                slots.release()
+        
+        while True:
+            await slots.acquire()
+            line = await loop.run_in_executor(None, stdin.readline)
+            if not line:
+                slots.release()
+                break
+            if not line.strip():
+                slots.release()
+                continue
+            
+            task = asyncio.create_task(run(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        
+        # 입력이 끝나도 진행 중인 요청의 응답은 모두 보냅니다
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
     
     async def start_stdio(self):
         """STDIO 전송을 사용하여 서버를 시작합니다."""
@@ -178,5 +675,6 @@ class GrafanaMCPServer:
     
     def start_sse(self, host: str = "localhost", port: int = 8000):
         """SSE 전송을 사용하여 서버를 시작합니다."""
+        import uvicorn
         logger.info(f"Starting MCP server with SSE transport on {host}:{port}")
         uvicorn.run(self.app, host=host, port=port) 
\ No newline at end of file
@@ -0,0 +1,289 @@
+"""
+워커 프로세스 사이에서 공유하는 응답 캐시 (SQLite)
+
+SSE 전송을 여러 uvicorn 워커로 실행하면 워커마다 메모리 캐시를 따로 가지므로 같은 대시보드를
+워커 수만큼 다시 받게 됩니다. `SharedCache`는 메모리 캐시(L1) 뒤에 두는 2단계 캐시로,
+WAL 모드의 SQLite 파일 하나에 인코딩된 응답을 저장해 모든 워커가 함께 사용합니다.
+
+이 캐시는 이벤트 루프에서 바로 호출되므로 루프를 오래 막지 않도록 읽기는 아주 짧은 잠금
+대기 시간으로 하고 잠겨 있으면 캐시 실패로 처리합니다. 쓰기는 모두 전용 스레드의 큐로 넘겨
+다른 워커와 쓰기 잠금을 다투는 동안에도 요청 처리가 멈추지 않습니다.
+"""
+import os
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("grafana-shared-cache")
+
+DEFAULT_SHARED_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# 몇 번 저장할 때마다 용량을 확인할지
+_EVICT_EVERY = 64
+
+# 이벤트 루프에서 읽을 때의 잠금 대기 시간 (초, 넘으면 캐시 실패)
+_READ_BUSY_TIMEOUT = 0.05
+# 쓰기 스레드의 잠금 대기 시간 (초)
+_WRITE_BUSY_TIMEOUT = 5.0
+# 처리를 기다리는 쓰기가 이보다 많으면 새 저장은 버립니다 (무효화는 버리지 않음)
+_MAX_PENDING_WRITES = 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    version INTEGER,
+    expires_at REAL NOT NULL
+)
+"""
+
+class SharedCache:
+    """
+    여러 프로세스가 함께 쓰는 SQLite 캐시
+
+    값은 인코딩된 바이트로 저장하고 만료 시각은 벽시계 시간(`time.time()`)을 씁니다.
+    SQLite 오류는 캐시 실패로만 취급하므로 요청 처리를 막지 않습니다.
+
+    저장/재검증/무효화는 쓰기 스레드가 순서대로 처리합니다. 무효화가 처리되기 전에는 그 키(또는
+    엔드포인트)를 읽어도 캐시 실패로 돌려주므로 무효화한 값을 다시 읽지 않습니다.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_SHARED_CACHE_MAX_BYTES):
+        """
+        Args:
+            path: SQLite 파일 경로 (디렉터리가 없으면 만듦)
+            max_bytes: 저장할 값의 최대 총 크기 (넘으면 오래 저장된 항목부터 제거)
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=_WRITE_BUSY_TIMEOUT, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        # 스키마를 만든 뒤부터는 읽기만 하므로 잠금을 오래 기다리지 않습니다
+        self._conn.execute(f"PRAGMA busy_timeout={int(_READ_BUSY_TIMEOUT * 1000)}")
+        self._writes = 0
+
+        # 처리를 기다리는 무효화 (키/엔드포인트 → 개수)
+        self._pending_lock = threading.Lock()
+        self._pending_keys: Dict[str, int] = {}
+        self._pending_endpoints: Dict[str, int] = {}
+        self._queue: "queue.Queue[Optional[Tuple[Callable[..., None], Tuple]]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="grafana-shared-cache", daemon=True)
+        self._writer.start()
+
+        self.hits = 0
+        self.misses = 0
+        self.busy = 0
+        self.dropped = 0
+        self.errors = 0
+        self.evictions = 0
+
+    def _execute(self, sql: str, params: Tuple = ()) -> Optional[sqlite3.Cursor]:
+        with self._lock:
+            try:
+                return self._conn.execute(sql, params)
+            except sqlite3.OperationalError as e:
+                if "locked" in str(e) or "busy" in str(e):
+                    # 다른 워커가 잠그고 있으면 기다리지 않고 캐시 실패로 처리합니다
+                    self.busy += 1
+                    return None
+                self.errors += 1
+                logger.warning(f"Shared cache error: {e}")
+                return None
+            except sqlite3.Error as e:
+                self.errors += 1
+                logger.warning(f"Shared cache error: {e}")
+                return None
+
+    # 쓰기 스레드
+    def _write_loop(self):
+        conn = sqlite3.connect(self.path, timeout=_WRITE_BUSY_TIMEOUT, isolation_level=None)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                operation, args = item
+                try:
+                    operation(conn, *args)
+                except sqlite3.Error as e:
+                    self.errors += 1
+                    logger.warning(f"Shared cache error: {e}")
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Shared cache writer error: {e}")
+        finally:
+            conn.close()
+
+    def _submit(self, operation: Callable[..., None], *args, droppable: bool = False) -> bool:
+        if droppable and self._queue.qsize() >= _MAX_PENDING_WRITES:
+            self.dropped += 1
+            return False
+        self._queue.put((operation, args))
+        return True
+
+    @staticmethod
+    def _adjust(pending: Dict[str, int], name: str, delta: int):
+        count = pending.get(name, 0) + delta
+        if count > 0:
+            pending[name] = count
+        else:
+            pending.pop(name, None)
+
+    def _is_pending(self, key: str, endpoint: Optional[str]) -> bool:
+        with self._pending_lock:
+            return key in self._pending_keys or (endpoint is not None and endpoint in self._pending_endpoints)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        큐에 있는 쓰기가 모두 처리될 때까지 기다립니다 (블로킹).
+
+        Returns:
+            제한 시간 안에 모두 처리했는지 여부
+        """
+        done = threading.Event()
+        self._queue.put((lambda conn: done.set(), ()))
+        return done.wait(timeout)
+
+    # 캐시 연산
+    def get(self, key: str, endpoint: Optional[str] = None) -> Optional[Tuple[bytes, Optional[int], float]]:
+        """
+        만료되지 않은 값을 가져옵니다.
+
+        Args:
+            key: 캐시 키
+            endpoint: 엔드포인트 이름 (처리를 기다리는 엔드포인트 무효화 확인용)
+
+        Returns:
+            (인코딩된 값, 버전, 만료 시각) 또는 None
+        """
+        if self._is_pending(key, endpoint):
+            self.misses += 1
+            return None
+        cursor = self._execute(
+            "SELECT value, version, expires_at FROM entries WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        )
+        row = cursor.fetchone() if cursor is not None else None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return bytes(row[0]), row[1], row[2]
+
+    def set(self, key: str, endpoint: str, value: bytes, version: Optional[int], expires_at: float):
+        """
+        값을 저장합니다 (이미 있으면 교체, 쓰기 스레드에서 처리).
+
+        Args:
+            key: 캐시 키
+            endpoint: 엔드포인트 이름 (엔드포인트 단위 무효화에 사용)
+            value: 인코딩된 값
+            version: 재검증에 사용할 버전
+            expires_at: 만료 시각 (`time.time()` 기준)
+        """
+        if len(value) > self.max_bytes:
+            return
+        self._submit(self._apply_set, key, endpoint, value, version, expires_at, droppable=True)
+
+    def _apply_set(self, conn: sqlite3.Connection, key: str, endpoint: str, value: bytes,
+                   version: Optional[int], expires_at: float):
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, endpoint, value, size, version, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, endpoint, value, len(value), version, expires_at)
+        )
+        self._writes += 1
+        if self._writes % _EVICT_EVERY == 0:
+            self._apply_evict(conn)
+
+    def touch(self, key: str, expires_at: float):
+        """재검증에 성공한 항목의 만료 시각을 늦춥니다."""
+        self._submit(self._apply_touch, key, expires_at, droppable=True)
+
+    @staticmethod
+    def _apply_touch(conn: sqlite3.Connection, key: str, expires_at: float):
+        conn.execute("UPDATE entries SET expires_at = ? WHERE key = ?", (expires_at, key))
+
+    def delete(self, key: str):
+        """항목 하나를 지웁니다."""
+        with self._pending_lock:
+            self._adjust(self._pending_keys, key, 1)
+        self._submit(self._apply_delete, key)
+
+    def _apply_delete(self, conn: sqlite3.Connection, key: str):
+        try:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        finally:
+            with self._pending_lock:
+                self._adjust(self._pending_keys, key, -1)
+
+    def delete_endpoint(self, endpoint: str):
+        """엔드포인트에 속한 모든 항목을 지웁니다."""
+        with self._pending_lock:
+            self._adjust(self._pending_endpoints, endpoint, 1)
+        self._submit(self._apply_delete_endpoint, endpoint)
+
+    def _apply_delete_endpoint(self, conn: sqlite3.Connection, endpoint: str):
+        try:
+            conn.execute("DELETE FROM entries WHERE endpoint = ?", (endpoint,))
+        finally:
+            with self._pending_lock:
+                self._adjust(self._pending_endpoints, endpoint, -1)
+
+    def evict(self):
+        """만료된 항목과 용량을 넘는 항목을 지웁니다 (쓰기 스레드에서 처리)."""
+        self._submit(self._apply_evict)
+
+    def _apply_evict(self, conn: sqlite3.Connection):
+        """만료된 항목을 지우고, 용량을 넘으면 가장 먼저 저장된 항목부터 지웁니다."""
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # INSERT OR REPLACE는 새 rowid를 받으므로 rowid 순서가 저장 순서입니다
+        excess = total - self.max_bytes
+        doomed = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM entries ORDER BY rowid").fetchall():
+            if excess <= 0:
+                break
+            doomed.append((rowid,))
+            excess -= size
+        conn.executemany("DELETE FROM entries WHERE rowid = ?", doomed)
+        self.evictions += len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        """공유 캐시 통계"""
+        cursor = self._execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+        row = cursor.fetchone() if cursor is not None else None
+        entries, size = row if row is not None else (None, None)
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "busy": self.busy,
+            "pending_writes": self._queue.qsize(),
+            "dropped_writes": self.dropped,
+            "evictions": self.evictions,
+            "errors": self.errors
+        }
+
+    def close(self):
+        """남은 쓰기를 처리하고 데이터베이스 연결을 닫습니다."""
+        self._queue.put(None)
+        self._writer.join(timeout=_WRITE_BUSY_TIMEOUT * 2)
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,81 @@
+"""
+동일한 진행 중 요청을 하나로 합치는 single-flight 유틸리티
+"""
+import asyncio
+import json
+import logging
+from typing import Dict, Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+logger = logging.getLogger("grafana-singleflight")
+
+T = TypeVar('T')
+
+def request_key(method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                json_data: Optional[Any] = None) -> Hashable:
+    """
+    (메서드, 경로, 매개변수, 본문)으로 요청 키를 만듭니다.
+
+    매개변수와 본문은 키 순서와 무관하게 같은 요청이 같은 키를 갖도록 정렬해 직렬화합니다.
+    """
+    params_key = json.dumps(params, sort_keys=True, default=str) if params else ""
+    body_key = json.dumps(json_data, sort_keys=True, default=str) if json_data is not None else ""
+    return (method.upper(), path, params_key, body_key)
+
+class SingleFlight:
+    """
+    같은 키의 동시 호출을 하나의 실행으로 합칩니다.
+
+    첫 호출이 실제 작업을 태스크로 실행하고, 그 태스크가 끝나기 전에 들어온 같은 키의
+    호출은 결과(또는 예외)를 공유합니다. 한 호출자가 취소되어도 다른 호출자가 기다리는
+    작업은 취소되지 않습니다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        키에 해당하는 작업을 실행하거나 진행 중인 작업의 결과를 기다립니다.
+
+        Args:
+            key: 요청 키
+            fn: 실제 작업을 수행하는 코루틴 함수
+
+        Returns:
+            작업 결과
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.collapsed += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finish(key, t))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 호출자가 취소된 경우에도 "exception was never retrieved" 경고가 나지 않도록 예외를 소비합니다
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        """현재 진행 중인 고유 요청 수"""
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        """합쳐진 호출 수 등 통계를 반환합니다."""
+        return {
+            "calls": self.calls,
+            "upstream_requests": self.executions,
+            "collapsed": self.collapsed,
+            "in_flight": self.in_flight,
+        }
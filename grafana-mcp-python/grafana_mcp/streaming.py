@@ -0,0 +1,210 @@
+"""
+대용량 바이너리 결과(이미지) 스트리밍 유틸리티
+"""
+import os
+import hmac
+import json
+import mmap
+import time
+import base64
+import hashlib
+import asyncio
+import logging
+from typing import Any, AsyncIterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger("mcp-streaming")
+
+# Base64 경계가 맞도록 3의 배수로 읽습니다 (48 KiB -> 64 KiB Base64)
+DEFAULT_CHUNK_SIZE = 48 * 1024
+DEFAULT_RESOURCE_TTL = 300.0
+
+class Base64Encoder:
+    """
+    바이트 청크를 순서대로 받아 Base64로 점진적으로 인코딩합니다.
+
+    3바이트 단위로 끊어 인코딩하고 남은 바이트는 다음 청크와 합치므로, 결과를 이어 붙이면
+    전체 데이터를 한 번에 인코딩한 것과 같습니다.
+    """
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        """청크를 추가하고 지금까지 인코딩 가능한 부분을 반환합니다."""
+        data = self._pending + chunk if self._pending else chunk
+        usable = len(data) - (len(data) % 3)
+        self._pending = data[usable:]
+        return base64.b64encode(data[:usable]) if usable else b""
+
+    def finish(self) -> bytes:
+        """남은 바이트를 패딩과 함께 인코딩합니다."""
+        pending, self._pending = self._pending, b""
+        return base64.b64encode(pending) if pending else b""
+
+class BlobStream:
+    """
+    도구 결과 안에 들어가는 지연 전송 바이너리 값
+
+    데이터는 디스크 파일에 있고, 전송 방식에 따라 한 번에 Base64 문자열로 읽거나
+    (`read_base64`) 일정한 크기의 Base64 청크로 흘려보냅니다 (`aiter_base64`).
+    """
+
+    def __init__(self, path: str, mime_type: str, size: int, b64_path: Optional[str] = None):
+        """
+        Args:
+            path: 원본 바이너리 파일 경로
+            mime_type: MIME 타입
+            size: 원본 크기 (바이트)
+            b64_path: 미리 인코딩된 Base64 파일 경로 (있으면 재인코딩하지 않음)
+        """
+        self.path = path
+        self.mime_type = mime_type
+        self.size = size
+        self.b64_path = b64_path
+
+    def hold(self, until: float):
+        """
+        파일의 수정 시각을 `until`로 미뤄 그때까지 이미지 캐시 정리에서 빠지게 합니다.
+
+        Args:
+            until: 파일을 남겨 둘 시각 (epoch 초)
+        """
+        for path in (self.path, self.b64_path):
+            if path:
+                try:
+                    os.utime(path, (until, until))
+                except OSError:
+                    pass
+
+    async def read_base64(self) -> str:
+        """전체 데이터를 Base64 문자열로 읽습니다."""
+        if self.b64_path:
+            return await asyncio.to_thread(read_ascii, self.b64_path)
+        raw = await asyncio.to_thread(_read_bytes, self.path)
+        return base64.b64encode(raw).decode("ascii")
+
+    async def aiter_base64(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[str]:
+        """일정한 크기의 Base64 청크를 순서대로 반환합니다 (메모리 사용량은 청크 크기로 고정)."""
+        chunk_size -= chunk_size % 3
+        if self.b64_path:
+            # 이미 인코딩된 파일은 4의 배수로 잘라 그대로 전달
+            source, size = self.b64_path, chunk_size // 3 * 4
+            encoder = None
+        else:
+            source, size = self.path, chunk_size
+            encoder = Base64Encoder()
+
+        f = await asyncio.to_thread(open, source, "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    break
+                if encoder is not None:
+                    chunk = encoder.feed(chunk)
+                if chunk:
+                    yield chunk.decode("ascii")
+            if encoder is not None:
+                tail = encoder.finish()
+                if tail:
+                    yield tail.decode("ascii")
+        finally:
+            f.close()
+
+def read_ascii(path: str) -> str:
+    """ASCII 파일을 메모리 매핑으로 읽어 중간 bytes 복사 없이 문자열로 만듭니다."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(memoryview(mm), "ascii")
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def find_blobs(value: Any, path: Tuple[Union[str, int], ...] = ()) -> List[Tuple[Tuple[Union[str, int], ...], BlobStream]]:
+    """결과 객체 안의 모든 BlobStream과 그 경로를 찾습니다."""
+    found = []
+    if isinstance(value, BlobStream):
+        found.append((path, value))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            found.extend(find_blobs(item, path + (key,)))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            found.extend(find_blobs(item, path + (index,)))
+    return found
+
+def replace_at(value: Any, path: Tuple[Union[str, int], ...], replacement: Any):
+    """경로가 가리키는 위치의 값을 바꿉니다."""
+    for part in path[:-1]:
+        value = value[part]
+    value[path[-1]] = replacement
+
+async def materialize_blobs(result: Any) -> Any:
+    """결과 안의 BlobStream을 Base64 문자열로 바꿔 JSON으로 직렬화할 수 있게 합니다."""
+    if isinstance(result, BlobStream):
+        return await result.read_base64()
+    for path, blob in find_blobs(result):
+        replace_at(result, path, await blob.read_base64())
+    return result
+
+class ResourceStore:
+    """
+    짧은 시간 동안 URL로 내려받을 수 있는 파일 리소스 저장소
+
+    이미지를 응답에 넣는 대신 `/v1/resources/{token}` URL만 반환할 때 사용합니다.
+    파일 자체는 렌더링 캐시가 관리하고, 토큰에는 파일 정보와 만료 시각을 서명해 담으므로
+    같은 비밀 키를 가진 다른 워커 프로세스도 저장 상태 없이 토큰을 확인할 수 있습니다.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, ttl: float = DEFAULT_RESOURCE_TTL,
+                 secret: Optional[bytes] = None):
+        """
+        Args:
+            base_url: 리소스 URL 앞에 붙일 서버 주소 (예: http://localhost:8000)
+            ttl: 리소스 유효 시간 (초)
+            secret: 토큰 서명 키 (여러 워커가 공유해야 함, None이면 프로세스마다 새로 만듦)
+        """
+        self.base_url = base_url
+        self.ttl = ttl
+        self._secret = secret or os.urandom(32)
+
+    def _sign(self, payload: bytes) -> bytes:
+        return base64.urlsafe_b64encode(hmac.new(self._secret, payload, hashlib.sha256).digest()[:18])
+
+    def register(self, blob: BlobStream) -> str:
+        """
+        리소스를 등록하고 URL을 반환합니다.
+
+        Args:
+            blob: 제공할 파일
+
+        Returns:
+            리소스 URL (base_url이 없으면 경로만)
+        """
+        expires_at = int(time.time() + self.ttl)
+        # 토큰이 끝날 때까지 캐시 정리가 파일을 지우지 않도록 붙잡아 둡니다 (모든 워커에 적용)
+        blob.hold(expires_at)
+        info = json.dumps([blob.path, blob.mime_type, blob.size, blob.b64_path, expires_at],
+                          separators=(",", ":")).encode("utf-8")
+        payload = base64.urlsafe_b64encode(info).rstrip(b"=")
+        token = (payload + b"." + self._sign(payload)).decode("ascii")
+        path = f"/v1/resources/{token}"
+        return f"{self.base_url.rstrip('/')}{path}" if self.base_url else path
+
+    def get(self, token: str) -> Optional[BlobStream]:
+        """서명이 맞고 만료되지 않은 리소스를 찾습니다."""
+        payload, _, signature = token.encode("ascii", "ignore").partition(b".")
+        if not signature or not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        try:
+            path, mime_type, size, b64_path, expires_at = json.loads(
+                base64.urlsafe_b64decode(payload + b"=" * (-len(payload) % 4))
+            )
+        except ValueError:
+            return None
+        if expires_at <= time.time() or not os.path.exists(path):
+            return None
+        return BlobStream(path, mime_type, size, b64_path)
@@ -0,0 +1,354 @@
+"""
+여러 Grafana 인스턴스/조직을 한 서버에서 제공하기 위한 테넌트 선택과 클라이언트 풀
+
+요청은 HTTP 헤더(`X-Grafana-Instance`, `X-Grafana-Org-Id`, `X-Grafana-Url` +
+`X-Grafana-Api-Key`)나 도구 인자 `grafana`(`{"instance": ..., "org_id": ...}`)로 테넌트를
+고릅니다. 선택은 컨텍스트 변수에 담겨 도구 코드까지 전달되고, `GrafanaContext.client`가
+그에 맞는 클라이언트를 `ClientPool`에서 꺼냅니다.
+
+도구 인자로는 서버에 등록된 인스턴스 이름과 조직만 고를 수 있습니다. 등록하지 않은 URL은 API
+키와 함께 헤더로만 받고, 서버가 그 주소로 요청을 보내 응답을 돌려주게 되므로 허용 목록
+(`url_allowed`)에 있는 주소만 받습니다. 서버의 API 키로 다른 조직을 고르는 것도 따로 켜야 합니다.
+"""
+import time
+import asyncio
+import hashlib
+import logging
+from urllib.parse import urlsplit
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger("grafana-tenants")
+
+# 테넌트를 고르는 도구 인자 이름
+ARGUMENT = "grafana"
+
+# 도구 입력 스키마에 추가하는 `grafana` 인자 스키마
+ARGUMENT_SCHEMA = {
+    "type": "object",
+    "description": "Grafana instance and organization to use (defaults to the server's own)",
+    "properties": {
+        "instance": {"type": "string", "description": "Configured Grafana instance name"},
+        "org_id": {"type": "integer", "description": "Grafana organization ID"}
+    },
+    "additionalProperties": False
+}
+
+DEFAULT_MAX_TENANTS = 32
+DEFAULT_TENANT_IDLE_TIMEOUT = 300.0
+DEFAULT_TENANT_MAX_CONNECTIONS = 10
+
+_selection: ContextVar[Optional[Dict[str, Any]]] = ContextVar("grafana_tenant_selection", default=None)
+# 현재 `selected` 블록이 빌린 (풀, 클라이언트) 목록
+_borrowed: ContextVar[Optional[List[Tuple["ClientPool", Any]]]] = ContextVar("grafana_tenant_leases", default=None)
+
+class Tenant:
+    """Grafana URL, 조직, 자격 증명 조합 (클라이언트 풀의 키)"""
+
+    __slots__ = ("url", "org_id", "api_key")
+
+    def __init__(self, url: str, org_id: Optional[int], api_key: str):
+        self.url = url.rstrip("/")
+        self.org_id = org_id
+        self.api_key = api_key
+
+    @property
+    def key(self) -> Tuple[str, Optional[int], str]:
+        return (self.url, self.org_id, self.api_key)
+
+    @property
+    def namespace(self) -> str:
+        """
+        공유 캐시 키에 붙일 이름공간
+
+        자격 증명마다 볼 수 있는 대시보드가 다를 수 있으므로 API 키까지 포함합니다.
+        """
+        raw = f"{self.url}\0{self.org_id}\0{self.api_key}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()[:16]
+
+    @property
+    def label(self) -> str:
+        """통계와 로그에 쓰는 이름 (API 키 제외)"""
+        return f"{self.url} org={self.org_id}" if self.org_id is not None else self.url
+
+def _parse_org_id(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid Grafana org id: {value!r}")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid Grafana org id: {value!r}")
+
+def _origin(url: str) -> Tuple[str, str, Optional[int], str]:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    try:
+        port = parts.port or {"http": 80, "https": 443}.get(scheme)
+    except ValueError:
+        raise ValueError(f"Invalid Grafana URL: {url}")
+    return scheme, (parts.hostname or "").lower(), port, parts.path.rstrip("/")
+
+def url_allowed(url: str, allowlist: Iterable[str]) -> bool:
+    """
+    헤더로 받은 Grafana URL이 허용 목록에 있는지 확인합니다.
+
+    스킴, 호스트, 포트가 같고 경로가 허용한 경로 아래에 있어야 합니다
+    (예: `https://grafana.example.com`은 `https://grafana.example.com/sub`도 허용).
+
+    Args:
+        url: 요청이 고른 URL
+        allowlist: 허용한 Grafana URL 목록
+
+    Returns:
+        허용 여부
+    """
+    scheme, host, port, path = _origin(url)
+    if scheme not in ("http", "https") or not host:
+        return False
+    for allowed in allowlist:
+        allowed_scheme, allowed_host, allowed_port, allowed_path = _origin(allowed)
+        if (scheme, host, port) != (allowed_scheme, allowed_host, allowed_port):
+            continue
+        if path == allowed_path or path.startswith(allowed_path + "/"):
+            return True
+    return False
+
+def from_argument(value: Any) -> Optional[Dict[str, Any]]:
+    """
+    도구 인자 `grafana`를 테넌트 선택으로 바꿉니다.
+
+    Args:
+        value: `{"instance": 이름, "org_id": 조직 ID}` (둘 다 선택)
+
+    Returns:
+        선택 (값이 없으면 None)
+    """
+    if value is None:
+        return None
+    if not isinstance(value, dict):
+        raise ValueError(f"'{ARGUMENT}' must be an object with 'instance' and/or 'org_id'")
+    unknown = set(value) - {"instance", "org_id"}
+    if unknown:
+        raise ValueError(f"Unknown '{ARGUMENT}' fields: {', '.join(sorted(unknown))}")
+    selection: Dict[str, Any] = {}
+    if value.get("instance") is not None:
+        selection["instance"] = str(value["instance"])
+    org_id = _parse_org_id(value.get("org_id"))
+    if org_id is not None:
+        selection["org_id"] = org_id
+    return selection or None
+
+def from_headers(headers: Mapping[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    HTTP 요청 헤더에서 테넌트 선택을 읽습니다.
+
+    `X-Grafana-Url`은 `X-Grafana-Api-Key`와 함께 있어야 합니다.
+
+    Returns:
+        선택 (관련 헤더가 없으면 None)
+    """
+    selection: Dict[str, Any] = {}
+    instance = headers.get("x-grafana-instance")
+    if instance:
+        selection["instance"] = instance
+    org_id = _parse_org_id(headers.get("x-grafana-org-id"))
+    if org_id is not None:
+        selection["org_id"] = org_id
+    url = headers.get("x-grafana-url")
+    api_key = headers.get("x-grafana-api-key")
+    if url and not api_key:
+        raise ValueError("X-Grafana-Url requires X-Grafana-Api-Key")
+    if url:
+        selection["url"] = url
+    if api_key:
+        selection["api_key"] = api_key
+    return selection or None
+
+@contextmanager
+def selected(selection: Optional[Dict[str, Any]]) -> Iterator[None]:
+    """
+    블록 안에서 실행되는 코드의 테넌트 선택을 설정합니다.
+
+    바깥 선택(예: 헤더)이 있으면 안쪽 선택(예: 도구 인자)의 값이 그 위에 덮어씁니다.
+    블록 안에서 `ClientPool`이 내준 클라이언트는 블록이 끝날 때 반납합니다.
+    """
+    if not selection:
+        yield
+        return
+    outer = _selection.get()
+    token = _selection.set({**outer, **selection} if outer else selection)
+    leases: List[Tuple[ClientPool, Any]] = []
+    leases_token = _borrowed.set(leases)
+    try:
+        yield
+    finally:
+        _borrowed.reset(leases_token)
+        _selection.reset(token)
+        for pool, client in leases:
+            pool.release(client)
+
+def current_selection() -> Optional[Dict[str, Any]]:
+    """현재 요청의 테넌트 선택 (없으면 None)"""
+    return _selection.get()
+
+class ClientPool:
+    """
+    테넌트별 Grafana 클라이언트 풀
+
+    테넌트마다 연결 풀이 따로 있는 클라이언트를 만들어 두고, `idle_timeout` 동안 쓰이지 않거나
+    `max_clients`를 넘으면 가장 오래 쓰이지 않은 것부터 내보냅니다.
+
+    `selected` 블록 안에서 꺼낸 클라이언트는 블록이 끝날 때까지 빌린 것으로 셉니다. 내보낸
+    클라이언트는 빌린 곳이 모두 반납하면 닫고, 닫히기 전까지는 `max_clients`에 포함하므로
+    풀이 가진 연결 풀의 수는 항상 `max_clients` 이하입니다.
+    """
+
+    def __init__(self, factory: Callable[[Tenant], Any], max_clients: int = DEFAULT_MAX_TENANTS,
+                 idle_timeout: float = DEFAULT_TENANT_IDLE_TIMEOUT):
+        """
+        Args:
+            factory: 테넌트의 클라이언트를 만드는 함수
+            max_clients: 동시에 유지할 최대 클라이언트 수 (닫히기를 기다리는 클라이언트 포함)
+            idle_timeout: 쓰이지 않은 클라이언트를 내보낼 시간 (초)
+        """
+        self.factory = factory
+        self.max_clients = max(1, max_clients)
+        self.idle_timeout = idle_timeout
+        self._clients: "OrderedDict[Tuple, Tuple[Tenant, Any, float]]" = OrderedDict()
+        # 내보냈지만 아직 빌린 곳이 있어 닫지 못한 클라이언트 (테넌트 키 → (테넌트, 클라이언트))
+        self._retiring: Dict[Tuple, Tuple[Tenant, Any]] = {}
+        # 클라이언트별 빌린 횟수
+        self._leases: Dict[int, int] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self.created = 0
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+        self.revived = 0
+
+    def get(self, tenant: Tenant) -> Any:
+        """
+        테넌트의 클라이언트를 가져옵니다 (없으면 만듦).
+
+        `selected` 블록 안에서 호출하면 블록이 끝날 때까지 클라이언트를 빌린 것으로 셉니다.
+
+        Raises:
+            RuntimeError: 모든 자리가 요청을 처리 중인 클라이언트로 차 있는 경우
+        """
+        now = time.monotonic()
+        self._close_drained()
+        self._evict_idle(now)
+        key = tenant.key
+        item = self._clients.get(key)
+        if item is not None:
+            client = item[1]
+            self._clients[key] = (tenant, client, now)
+            self._clients.move_to_end(key)
+            self._lease(client)
+            return client
+
+        retired = self._retiring.pop(key, None)
+        if retired is not None:
+            # 아직 닫히지 않았으면 새로 만들지 않고 다시 씁니다
+            client = retired[1]
+            self.revived += 1
+        else:
+            self._make_room()
+            client = self.factory(tenant)
+            self.created += 1
+            logger.info(f"Created Grafana client for {tenant.label}")
+        self._clients[key] = (tenant, client, now)
+        self._lease(client)
+        return client
+
+    def _make_room(self):
+        while self._clients and len(self._clients) + len(self._retiring) >= self.max_clients:
+            _, (old, old_client, _) = self._clients.popitem(last=False)
+            self.evicted_lru += 1
+            self._retire(old, old_client)
+        if len(self._retiring) >= self.max_clients:
+            raise RuntimeError(
+                f"All {self.max_clients} Grafana tenant clients are busy; try again later"
+            )
+
+    def _evict_idle(self, now: float):
+        while self._clients:
+            key, (tenant, client, last_used) = next(iter(self._clients.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._clients[key]
+            self.evicted_idle += 1
+            self._retire(tenant, client)
+
+    def _lease(self, client: Any):
+        leases = _borrowed.get()
+        if leases is None or any(c is client for _, c in leases):
+            return
+        leases.append((self, client))
+        self._leases[id(client)] = self._leases.get(id(client), 0) + 1
+
+    def release(self, client: Any):
+        """빌린 클라이언트를 반납합니다 (내보낸 클라이언트는 마지막 반납 때 닫음)."""
+        count = self._leases.get(id(client), 0) - 1
+        if count > 0:
+            self._leases[id(client)] = count
+            return
+        self._leases.pop(id(client), None)
+        for key, (_, retired) in list(self._retiring.items()):
+            if retired is client:
+                self._close(key)
+
+    def _retire(self, tenant: Tenant, client: Any):
+        logger.info(f"Evicting Grafana client for {tenant.label}")
+        self._retiring[tenant.key] = (tenant, client)
+        if not self._leases.get(id(client)):
+            self._close(tenant.key)
+
+    def _close_drained(self):
+        for key, (_, client) in list(self._retiring.items()):
+            if not self._leases.get(id(client)):
+                self._close(key)
+
+    def _close(self, key: Tuple):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 이벤트 루프 밖이면 다음 `get` 또는 `aclose`에서 닫습니다
+            return
+        _, client = self._retiring.pop(key)
+        task = loop.create_task(client.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def aclose(self):
+        """모든 클라이언트를 닫습니다."""
+        clients = [client for _, client, _ in self._clients.values()]
+        clients.extend(client for _, client in self._retiring.values())
+        self._retiring.clear()
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """풀 통계"""
+        now = time.monotonic()
+        return {
+            "clients": len(self._clients),
+            "max_clients": self.max_clients,
+            "idle_timeout": self.idle_timeout,
+            "created": self.created,
+            "evicted_idle": self.evicted_idle,
+            "evicted_lru": self.evicted_lru,
+            "retiring": len(self._retiring),
+            "leased": sum(self._leases.values()),
+            "revived": self.revived,
+            "tenants": [
+                {"tenant": tenant.label, "idle_seconds": round(now - last_used, 1)}
+                for tenant, _, last_used in self._clients.values()
+            ]
+        }
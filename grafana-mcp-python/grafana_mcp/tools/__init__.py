@@ -1,8 +1,37 @@
 """
 Grafana MCP 도구 모음
+
+도구 카테고리 모듈은 활성화된 카테고리만 처음 사용할 때 불러와 서버 시작 시간을 줄입니다.
 """
+import importlib
+from types import ModuleType
+from typing import Dict
+
+# 카테고리 이름 -> 표시 이름 (모듈 이름은 카테고리 이름과 같음)
+TOOL_CATEGORIES: Dict[str, str] = {
+    "search": "검색",
+    "dashboard": "대시보드",
+    "query": "쿼리",
+}
+
+__all__ = list(TOOL_CATEGORIES) + ["TOOL_CATEGORIES", "load_category"]
+
+def load_category(name: str) -> ModuleType:
+    """
+    도구 카테고리 모듈을 불러옵니다.
+
+    Args:
+        name: 카테고리 이름
 
-from . import search
-from . import dashboard
+    Returns:
+        `add_tools(server)`를 제공하는 모듈
+    """
+    if name not in TOOL_CATEGORIES:
+        raise ValueError(f"Unknown tool category: {name}")
+    return importlib.import_module(f".{name}", __name__)
 
-__all__ = ["search", "dashboard"] 
\ No newline at end of file
+def __getattr__(name: str) -> ModuleType:
+    # `tools.search`처럼 속성으로 접근하면 그때 모듈을 불러옵니다
+    if name in TOOL_CATEGORIES:
+        return load_category(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,11 +2,13 @@
 MCP 도구 구현을 위한 기본 클래스
 """
 from typing import Dict, Any, Callable, TypeVar, Generic, Type, Optional, get_type_hints
-from pydantic import BaseModel, create_model, Field
+from pydantic import BaseModel, TypeAdapter, ValidationError, create_model, Field
 import inspect
+import asyncio
 import json
 import logging
 from ..server import MCPTool
+from .. import tracing
 
 logger = logging.getLogger("mcp-tools")
 
@@ -16,32 +18,39 @@ R = TypeVar('R')
 class Tool(Generic[T, R]):
     """MCP 도구 구현을 위한 기본 클래스."""
     
-    def __init__(self, name: str, description: str, param_model: Type[T], handler: Callable[[Dict[str, Any]], R]):
+    def __init__(self, name: str, description: str, param_model: Type[T], handler: Callable[[T], R]):
         self.name = name
         self.description = description
         self.param_model = param_model
         self.handler = handler
+        self.is_async = inspect.iscoroutinefunction(handler)
+        # 검증기와 JSON 스키마는 등록 시 한 번만 만들고 호출마다 재사용합니다
+        self.validator = TypeAdapter(param_model)
+        self.input_schema = self.validator.json_schema()
         
     def to_mcp_tool(self) -> MCPTool:
         """MCP 도구 정의로 변환합니다."""
-        # pydantic 모델에서 JSON 스키마 생성
-        schema = self.param_model.model_json_schema()
-        
-        # MCP 도구 형식으로 변환
         return MCPTool(
             name=self.name,
             description=self.description,
-            input_schema=schema
+            input_schema=self.input_schema
         )
         
-    def handle(self, args: Dict[str, Any]) -> R:
+    async def handle(self, args: Dict[str, Any]) -> R:
         """매개변수로 도구 호출을 처리합니다."""
         try:
-            # pydantic을 사용하여 매개변수 파싱
-            parsed_params = self.param_model(**args)
+            # 미리 만든 검증기로 인자를 바로 모델로 변환 (dict 재생성 없음)
+            with tracing.span("validate"):
+                parsed_params = self.validator.validate_python(args or {})
             
-            # 핸들러 호출
-            return self.handler(parsed_params.model_dump())
+            # 핸들러 호출 (동기 핸들러는 이벤트 루프를 막지 않도록 스레드에서 실행)
+            with tracing.span("handler", **{"code.function": getattr(self.handler, "__name__", None)}):
+                if self.is_async:
+                    return await self.handler(parsed_params)
+                return await asyncio.to_thread(self.handler, parsed_params)
+        except ValidationError:
+            # 잘못된 인자는 호출자 오류이므로 스택 트레이스 없이 그대로 전달합니다
+            raise
         except Exception as e:
             logger.exception(f"Error handling tool {self.name}")
             raise
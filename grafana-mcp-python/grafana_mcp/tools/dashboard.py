@@ -1,21 +1,36 @@
 """
 대시보드 관련 도구
 """
-from typing import Dict, Any, List, Optional
+import asyncio
+from typing import Dict, Any, List, Literal, Optional, Union
 from pydantic import BaseModel, Field
-import base64
 from ..context import grafana_context
+from ..limits import DEFAULT_CLASS_LIMITS
+from ..rendering import render_image
+from ..panels import list_panels
+from ..projection import parse_fields, project, summarize_dashboard
+from ..diff import diff_models
+from ..progress import report_progress
 from ..server import GrafanaMCPServer
 from .base import create_tool
 
 class GetDashboardByUIDParams(BaseModel):
     """UID로 대시보드 가져오기 매개변수"""
     uid: str = Field(..., description="조회할 대시보드의 UID")
+    fields: Optional[Union[str, List[str]]] = Field(
+        None,
+        description="반환할 대시보드 필드 선택자 (예: 'title,panels[].title,panels[].targets[].expr')"
+    )
+    view: Literal["full", "summary"] = Field(
+        "full", description="반환 형식 (full: 대시보드 모델, summary: 패널 개요)"
+    )
 
-def get_dashboard_by_uid(params: Dict[str, Any]) -> Dict[str, Any]:
+async def get_dashboard_by_uid(params: GetDashboardByUIDParams) -> Dict[str, Any]:
     """
     UID로 대시보드 가져오기
     
+    `fields`로 필요한 필드만 고르거나 `view="summary"`로 패널 개요만 받아 응답 크기를 줄일 수 있습니다.
+    
     Arguments:
         params: 대시보드 UID 매개변수
         
@@ -26,17 +41,26 @@ def get_dashboard_by_uid(params: Dict[str, Any]) -> Dict[str, Any]:
     if not client:
         raise ValueError("Grafana client is not initialized")
     
-    uid = params.get("uid")
+    uid = params.uid
     if not uid:
         raise ValueError("Dashboard UID is required")
     
-    dashboard_data = client.get_dashboard_by_uid(uid)
+    # 잘못된 선택자는 요청 전에 거릅니다
+    field_tree = parse_fields(params.fields) if params.fields else None
+    
+    dashboard_data = await client.get_dashboard_by_uid(uid)
     
     # 결과 정리 및 변환
     if "dashboard" in dashboard_data:
         dashboard = dashboard_data["dashboard"]
         meta = dashboard_data.get("meta", {})
         
+        # 캐시된 원본을 바꾸지 않도록 선택한 경로의 컨테이너만 새로 만듭니다
+        if params.view == "summary":
+            dashboard = summarize_dashboard(dashboard)
+        elif field_tree is not None:
+            dashboard = project(dashboard, field_tree)
+        
         return {
             "dashboard": dashboard,
             "meta": {
@@ -55,6 +79,97 @@ def get_dashboard_by_uid(params: Dict[str, Any]) -> Dict[str, Any]:
     
     return dashboard_data
 
+# diff_dashboard가 한 번에 가져오는 최대 버전 기록 수
+HISTORY_LIMIT = 100
+
+class DiffDashboardParams(BaseModel):
+    """대시보드 버전 비교 매개변수"""
+    uid: str = Field(..., description="대시보드 UID")
+    from_version: int = Field(..., ge=1, description="기준 버전 (이전에 받아 둔 대시보드의 meta.version)")
+    to_version: Optional[int] = Field(None, ge=1, description="비교할 버전 (없으면 최신 버전)")
+    include_history: bool = Field(True, description="두 버전 사이의 버전 기록(작성자, 시각, 메시지) 포함")
+    max_changes: int = Field(200, ge=1, le=5000, description="반환할 최대 변경 수")
+
+def _format_version(version: Dict[str, Any]) -> Dict[str, Any]:
+    """Grafana 버전 기록 항목을 도구 결과 형식으로 변환합니다."""
+    return {
+        "version": version.get("version"),
+        "created": version.get("created", ""),
+        "created_by": version.get("createdBy", ""),
+        "message": version.get("message", "")
+    }
+
+async def diff_dashboard(params: DiffDashboardParams) -> Dict[str, Any]:
+    """
+    대시보드의 두 버전 비교
+    
+    전체 모델 대신 바뀐 필드만 반환합니다. 최신 버전과 비교할 때 기준 버전이 이미 최신이면
+    가벼운 버전 확인 요청 하나만 보내고 빈 차이를 반환하며, 버전별 모델은 캐시하므로 같은
+    버전을 다시 비교해도 모델을 새로 받지 않습니다.
+    
+    버전 기록은 최신 버전부터 `HISTORY_LIMIT`개까지만 가져옵니다. 그 안에 두 버전 사이의 기록이
+    모두 들어오지 않으면 `history_truncated`가 참입니다.
+    
+    Arguments:
+        params: 비교 매개변수
+        
+    Returns:
+        변경 목록과 버전 기록
+    """
+    client = grafana_context.client
+    if not client:
+        raise ValueError("Grafana client is not initialized")
+    
+    uid = params.uid
+    if not uid:
+        raise ValueError("Dashboard UID is required")
+    
+    latest = None
+    to_version = params.to_version
+    if to_version is None:
+        latest = await client.get_latest_dashboard_version(uid)
+        if latest is None:
+            raise ValueError(f"Dashboard {uid} has no version history")
+        to_version = latest
+    
+    result = {
+        "uid": uid,
+        "from_version": params.from_version,
+        "to_version": to_version,
+        "latest_version": latest,
+        "changed": False,
+        "changes": [],
+        "summary": {"add": 0, "remove": 0, "replace": 0},
+        "truncated": False
+    }
+    if to_version == params.from_version:
+        if params.include_history:
+            result["versions"] = []
+            result["history_truncated"] = False
+        return result
+    
+    old, new = await asyncio.gather(
+        client.get_dashboard_version(uid, params.from_version),
+        client.get_dashboard_version(uid, to_version)
+    )
+    result.update(diff_models(old, new, max_changes=params.max_changes))
+    result["changed"] = bool(result["changes"])
+    
+    if params.include_history:
+        # 최신 버전까지 비교할 때는 필요한 만큼만 가져옵니다 (버전 기록은 최신 버전부터 반환됨)
+        low, high = sorted((params.from_version, to_version))
+        limit = min(HISTORY_LIMIT, high - low + 1) if latest is not None else HISTORY_LIMIT
+        versions = await client.get_dashboard_versions(uid, limit=limit)
+        result["versions"] = [
+            _format_version(version) for version in versions
+            if isinstance(version.get("version"), int) and low < version["version"] <= high
+        ]
+        # 가져온 기록이 꽉 찼는데 기준 버전 바로 다음까지 내려가지 못했으면 그 사이 기록이 빠진 것입니다
+        numbers = [version["version"] for version in versions if isinstance(version.get("version"), int)]
+        result["history_truncated"] = len(versions) >= limit and (not numbers or min(numbers) > low + 1)
+    
+    return result
+
 class DashboardScreenshotParams(BaseModel):
     """대시보드 스크린샷 매개변수"""
     dashboard_uid: str = Field(..., description="대시보드 UID")
@@ -64,8 +179,40 @@ class DashboardScreenshotParams(BaseModel):
     from_time: Optional[str] = Field(None, description="시작 시간 (예: 'now-6h')")
     to_time: Optional[str] = Field(None, description="종료 시간 (예: 'now')")
     theme: str = Field("light", description="테마 (light 또는 dark)")
+    image_format: Literal["png", "webp", "jpeg"] = Field(
+        "png", description="이미지 포맷 (webp/jpeg는 서버에서 변환하며 PNG보다 훨씬 작음)"
+    )
+    quality: int = Field(80, ge=1, le=100, description="webp/jpeg 품질 (1-100)")
+    max_bytes: Optional[int] = Field(
+        None, gt=0, description="이미지 최대 크기 (바이트, 넘으면 품질과 해상도를 낮춤)"
+    )
+    scale: float = Field(1.0, ge=0.1, le=4.0, description="배율 (출력 픽셀 = 너비/높이 x scale)")
+    delivery: Literal["inline", "url"] = Field(
+        "inline", description="이미지 전달 방식 (inline: Base64 포함, url: 잠시 유효한 다운로드 URL, SSE 전송 전용)"
+    )
+
+def _check_delivery(delivery: str):
+    """렌더링 전에 전달 방식을 사용할 수 있는지 확인합니다."""
+    if delivery == "url" and grafana_context.resources is None:
+        raise ValueError("URL delivery is only available with the SSE transport")
 
-def get_dashboard_screenshot(params: Dict[str, Any]) -> Dict[str, Any]:
+def _image_options(params) -> Dict[str, Any]:
+    """출력 포맷/크기 관련 매개변수를 렌더링 옵션으로 변환합니다."""
+    return {
+        "image_format": params.image_format,
+        "quality": params.quality,
+        "max_bytes": params.max_bytes,
+        "scale": params.scale
+    }
+
+def _deliver(result, delivery: str) -> Dict[str, Any]:
+    """렌더링 결과를 요청한 전달 방식에 맞는 필드로 변환합니다."""
+    if delivery == "url":
+        return {"resource_url": grafana_context.resources.register(result.blob())}
+    # 인라인 이미지는 전송 계층이 Base64로 채우거나 청크로 스트리밍합니다
+    return {"image_data": result.blob()}
+
+async def get_dashboard_screenshot(params: DashboardScreenshotParams) -> Dict[str, Any]:
     """
     대시보드 스크린샷 가져오기
     
@@ -79,42 +226,176 @@ def get_dashboard_screenshot(params: Dict[str, Any]) -> Dict[str, Any]:
     if not client:
         raise ValueError("Grafana client is not initialized")
     
-    dashboard_uid = params.get("dashboard_uid")
+    dashboard_uid = params.dashboard_uid
     if not dashboard_uid:
         raise ValueError("Dashboard UID is required")
     
+    _check_delivery(params.delivery)
+    
     # 선택적 매개변수
-    panel_id = params.get("panel_id")
-    width = params.get("width", 1000)
-    height = params.get("height", 500)
-    from_time = params.get("from_time")
-    to_time = params.get("to_time")
-    theme = params.get("theme", "light")
-    
-    # 스크린샷 요청
-    image_data = client.get_dashboard_screenshot(
+    panel_id = params.panel_id
+    width = params.width
+    height = params.height
+    from_time = params.from_time
+    to_time = params.to_time
+    theme = params.theme
+    
+    # 스크린샷 요청 (이미지 캐시 적중 시 렌더링과 Base64 인코딩을 건너뜀)
+    await report_progress(0, 1, "Rendering")
+    result = await render_image(
+        client,
         dashboard_uid=dashboard_uid,
         panel_id=panel_id,
         width=width,
         height=height,
         from_time=from_time,
         to_time=to_time,
-        theme=theme
+        theme=theme,
+        **_image_options(params),
+        **grafana_context.render_options()
     )
-    
-    # 바이너리 이미지를 Base64로 인코딩
-    encoded_image = base64.b64encode(image_data).decode("utf-8")
-    
-    # 이미지 타입 추정 (Grafana는 보통 PNG 반환)
-    image_type = "image/png"
+    await report_progress(1, 1, "Cached image" if result.cached else "Rendered")
     
     return {
-        "image_data": encoded_image,
-        "image_type": image_type,
+        **_deliver(result, params.delivery),
+        "image_type": result.image_type,
+        "image_size": result.image.size,
         "dashboard_uid": dashboard_uid,
         "panel_id": panel_id,
         "width": width,
-        "height": height
+        "height": height,
+        "from_time": result.from_time,
+        "to_time": result.to_time,
+        "cached": result.cached
+    }
+
+class RenderDashboardPanelsParams(BaseModel):
+    """여러 패널 동시 렌더링 매개변수"""
+    dashboard_uid: str = Field(..., description="대시보드 UID")
+    panel_ids: Optional[List[int]] = Field(None, description="렌더링할 패널 ID 목록 (없으면 모든 패널)")
+    width: int = Field(1000, description="이미지 너비")
+    height: int = Field(500, description="이미지 높이")
+    from_time: Optional[str] = Field(None, description="시작 시간 (예: 'now-6h')")
+    to_time: Optional[str] = Field(None, description="종료 시간 (예: 'now')")
+    theme: str = Field("light", description="테마 (light 또는 dark)")
+    image_format: Literal["png", "webp", "jpeg"] = Field(
+        "png", description="이미지 포맷 (webp/jpeg는 서버에서 변환하며 PNG보다 훨씬 작음)"
+    )
+    quality: int = Field(80, ge=1, le=100, description="webp/jpeg 품질 (1-100)")
+    max_bytes: Optional[int] = Field(
+        None, gt=0, description="이미지 최대 크기 (바이트, 넘으면 품질과 해상도를 낮춤)"
+    )
+    scale: float = Field(1.0, ge=0.1, le=4.0, description="배율 (출력 픽셀 = 너비/높이 x scale)")
+    concurrency: Optional[int] = Field(
+        None, ge=1, le=64, description="동시에 렌더링할 최대 패널 수 (기본값: 렌더링 요청의 현재 동시성 한도)"
+    )
+    panel_timeout: float = Field(
+        60.0, gt=0, description="패널 하나의 렌더링 제한 시간 (초, 차례를 기다린 시간은 제외)"
+    )
+    delivery: Literal["inline", "url"] = Field(
+        "inline", description="이미지 전달 방식 (inline: Base64 포함, url: 잠시 유효한 다운로드 URL, SSE 전송 전용)"
+    )
+
+def _render_concurrency(client) -> int:
+    """렌더링 요청의 현재 동시성 한도 (요청 제한이 없으면 기본 초기 한도)"""
+    if client.limits is not None:
+        return client.limits.limiters["render"].limit
+    return DEFAULT_CLASS_LIMITS["render"][0]
+
+async def render_dashboard_panels(params: RenderDashboardPanelsParams) -> Dict[str, Any]:
+    """
+    대시보드의 여러 패널을 동시에 렌더링
+    
+    일부 패널이 실패하거나 제한 시간을 넘겨도 성공한 패널의 결과는 그대로 반환합니다.
+    
+    Arguments:
+        params: 렌더링 매개변수
+        
+    Returns:
+        패널별 Base64 이미지와 실패 목록
+    """
+    client = grafana_context.client
+    if not client:
+        raise ValueError("Grafana client is not initialized")
+    
+    _check_delivery(params.delivery)
+    
+    dashboard_data = await client.get_dashboard_by_uid(params.dashboard_uid)
+    panels = list_panels(dashboard_data.get("dashboard", {}))
+    
+    if params.panel_ids is not None:
+        wanted = set(params.panel_ids)
+        panels = [panel for panel in panels if panel.get("id") in wanted]
+        missing = wanted - {panel.get("id") for panel in panels}
+    else:
+        missing = set()
+    
+    slots = asyncio.Semaphore(params.concurrency or _render_concurrency(client))
+    done = 0
+    
+    async def render(panel: Dict[str, Any]):
+        nonlocal done
+        async with slots:
+            try:
+                # 제한 시간은 렌더링 요청이 Grafana 요청 제한의 자리를 얻은 뒤부터 재며 변환까지 포함합니다
+                return await render_image(
+                    client,
+                    dashboard_uid=params.dashboard_uid,
+                    panel_id=panel["id"],
+                    width=params.width,
+                    height=params.height,
+                    from_time=params.from_time,
+                    to_time=params.to_time,
+                    theme=params.theme,
+                    timeout=params.panel_timeout,
+                    # 버전 확인은 패널마다 하지 않고 위에서 한 번 가져온 대시보드를 씁니다
+                    dashboard_data=dashboard_data,
+                    **_image_options(params),
+                    **grafana_context.render_options()
+                )
+            finally:
+                # 패널이 끝날 때마다 (성공/실패 모두) 진행 상황을 보냅니다
+                done += 1
+                await report_progress(done, len(panels), f"Panel {panel['id']} finished")
+    
+    await report_progress(0, len(panels), f"Rendering {len(panels)} panels")
+    outcomes = await asyncio.gather(*(render(panel) for panel in panels), return_exceptions=True)
+    
+    rendered = []
+    errors = [
+        {"panel_id": panel_id, "title": "", "error": "Panel not found"}
+        for panel_id in sorted(missing)
+    ]
+    for panel, outcome in zip(panels, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            errors.append({
+                "panel_id": panel["id"],
+                "title": panel.get("title", ""),
+                "error": f"Render timed out after {params.panel_timeout}s"
+            })
+        elif isinstance(outcome, BaseException):
+            errors.append({
+                "panel_id": panel["id"],
+                "title": panel.get("title", ""),
+                "error": str(outcome) or type(outcome).__name__
+            })
+        else:
+            rendered.append({
+                "panel_id": panel["id"],
+                "title": panel.get("title", ""),
+                **_deliver(outcome, params.delivery),
+                "image_type": outcome.image_type,
+                "image_size": outcome.image.size,
+                "cached": outcome.cached
+            })
+    
+    return {
+        "dashboard_uid": params.dashboard_uid,
+        "width": params.width,
+        "height": params.height,
+        "panels": rendered,
+        "errors": errors,
+        "partial": bool(errors)
     }
 
 def add_tools(server: GrafanaMCPServer):
@@ -126,6 +407,13 @@ def add_tools(server: GrafanaMCPServer):
         handler=get_dashboard_by_uid
     )
     
+    # 대시보드 버전 비교 도구
+    diff_dashboard_tool = create_tool(
+        name="diff_dashboard",
+        description="Grafana 대시보드의 두 버전(또는 지정한 버전과 최신 버전)의 구조적 차이와 버전 기록 조회",
+        handler=diff_dashboard
+    )
+    
     # 대시보드 스크린샷 도구
     get_screenshot_tool = create_tool(
         name="get_dashboard_screenshot",
@@ -133,6 +421,15 @@ def add_tools(server: GrafanaMCPServer):
         handler=get_dashboard_screenshot
     )
     
+    # 여러 패널 동시 렌더링 도구
+    render_panels_tool = create_tool(
+        name="render_dashboard_panels",
+        description="Grafana 대시보드의 모든 패널(또는 선택한 패널)을 동시에 렌더링",
+        handler=render_dashboard_panels
+    )
+    
     # 도구 등록
     server.add_tool(get_dashboard_tool.to_mcp_tool(), get_dashboard_tool.handle)
-    server.add_tool(get_screenshot_tool.to_mcp_tool(), get_screenshot_tool.handle) 
\ No newline at end of file
+    server.add_tool(diff_dashboard_tool.to_mcp_tool(), diff_dashboard_tool.handle)
+    server.add_tool(get_screenshot_tool.to_mcp_tool(), get_screenshot_tool.handle)
+    server.add_tool(render_panels_tool.to_mcp_tool(), render_panels_tool.handle) 
\ No newline at end of file
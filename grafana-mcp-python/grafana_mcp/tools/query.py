@@ -0,0 +1,193 @@
+"""
+패널 데이터 쿼리 도구
+"""
+import re
+import time
+import asyncio
+from typing import Dict, Any, Literal, Optional
+from pydantic import BaseModel, Field
+from ..context import grafana_context
+from ..client import GrafanaClient
+from ..frames import decode_results, downsample, DEFAULT_MAX_POINTS
+from ..image_cache import resolve_time
+from ..panels import iter_panels
+from ..progress import report_progress
+from ..server import GrafanaMCPServer
+from .base import create_tool
+
+# $var, ${var}, ${var:format}, [[var]] 형태의 템플릿 변수 (내장 변수 $__*는 Grafana가 처리)
+_VARIABLE = re.compile(r"\$\{(\w+)(?::\w+)?\}|\$(\w+)|\[\[(\w+)\]\]")
+
+# 패널 자체의 데이터소스가 아니라 쿼리별 데이터소스를 사용하는 경우
+_MIXED_DATASOURCE = "-- Mixed --"
+
+class QueryPanelDataParams(BaseModel):
+    """패널 데이터 쿼리 매개변수"""
+    dashboard_uid: str = Field(..., description="대시보드 UID")
+    panel_id: int = Field(..., description="패널 ID")
+    from_time: Optional[str] = Field(None, description="시작 시간 (없으면 대시보드 기본 시간 범위)")
+    to_time: Optional[str] = Field(None, description="종료 시간 (없으면 대시보드 기본 시간 범위)")
+    variables: Optional[Dict[str, str]] = Field(
+        None, description="템플릿 변수 값 (없으면 대시보드에 저장된 현재 값 사용)"
+    )
+    max_points: int = Field(
+        DEFAULT_MAX_POINTS, ge=10, le=100000, description="시계열당 최대 점 개수 (초과하면 다운샘플링)"
+    )
+    downsample: Literal["lttb", "minmax", "none"] = Field(
+        "lttb", description="다운샘플링 방식 (lttb: 모양 보존, minmax: 구간별 최솟값/최댓값 보존, none: 사용 안 함)"
+    )
+
+def _variable_values(dashboard: Dict[str, Any], overrides: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """대시보드 템플릿 변수의 현재 값을 모으고 요청한 값으로 덮어씁니다."""
+    values = {}
+    for variable in (dashboard.get("templating") or {}).get("list") or []:
+        name = variable.get("name")
+        current = (variable.get("current") or {}).get("value")
+        if not name or current is None:
+            continue
+        if isinstance(current, list):
+            if current == ["$__all"]:
+                current = variable.get("allValue") or ".*"
+            else:
+                current = current[0] if len(current) == 1 else "(" + "|".join(map(str, current)) + ")"
+        elif current == "$__all":
+            current = variable.get("allValue") or ".*"
+        values[name] = str(current)
+    values.update(overrides or {})
+    return values
+
+def _interpolate(value: Any, variables: Dict[str, str]) -> Any:
+    """문자열 안의 템플릿 변수를 값으로 바꿉니다 (모르는 변수는 그대로 둠)."""
+    if isinstance(value, str):
+        def replace(match):
+            name = match.group(1) or match.group(2) or match.group(3)
+            return variables.get(name, match.group(0))
+        return _VARIABLE.sub(replace, value)
+    if isinstance(value, dict):
+        return {key: _interpolate(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_interpolate(item, variables) for item in value]
+    return value
+
+async def _resolve_datasource(client: GrafanaClient, datasource: Any,
+                              variables: Dict[str, str]) -> Dict[str, Any]:
+    """
+    패널/쿼리의 데이터소스 참조를 `{"type", "uid"}`로 바꿉니다.
+
+    이름 문자열, 변수로 지정된 UID, 생략된 참조(기본 데이터소스)를 모두 처리하며,
+    데이터소스 목록은 응답 캐시를 거치므로 대부분 추가 요청이 없습니다.
+    """
+    if isinstance(datasource, dict) and datasource.get("uid"):
+        uid = _interpolate(datasource["uid"], variables)
+        if uid == datasource["uid"] and not uid.startswith("$"):
+            return {"type": datasource.get("type"), "uid": uid}
+        reference = uid
+    elif isinstance(datasource, str) and datasource != "default":
+        reference = _interpolate(datasource, variables)
+    else:
+        reference = None
+
+    for item in await client.list_datasources():
+        if reference is None:
+            if item.get("isDefault"):
+                return {"type": item.get("type"), "uid": item.get("uid")}
+        elif reference in (item.get("uid"), item.get("name")):
+            return {"type": item.get("type"), "uid": item.get("uid")}
+
+    raise ValueError(f"Datasource not found: {reference or 'default'}")
+
+def _interval_ms(from_time: str, to_time: str, max_points: int) -> int:
+    """시간 범위와 점 개수로 쿼리 간격(밀리초)을 계산합니다."""
+    now = time.time()
+    start = resolve_time(from_time, now)
+    end = resolve_time(to_time, now)
+    if start is None or end is None or end <= start:
+        return 15000
+    return max(1000, (end - start) // max_points)
+
+async def query_panel_data(params: QueryPanelDataParams) -> Dict[str, Any]:
+    """
+    패널의 쿼리를 실행해 데이터를 열 단위로 반환
+
+    패널의 모든 쿼리를 한 번의 `/api/ds/query` 요청으로 실행하고, 시계열은 `max_points`
+    이하로 다운샘플링합니다.
+
+    Arguments:
+        params: 쿼리 매개변수
+
+    Returns:
+        프레임 목록 (필드 메타데이터와 열 배열)과 쿼리별 오류
+    """
+    client = grafana_context.client
+    if not client:
+        raise ValueError("Grafana client is not initialized")
+
+    await report_progress(0, 3, "Loading dashboard")
+    dashboard_data = await client.get_dashboard_by_uid(params.dashboard_uid)
+    dashboard = dashboard_data.get("dashboard", {})
+
+    panel = next((p for p in iter_panels(dashboard) if p.get("id") == params.panel_id), None)
+    if panel is None:
+        raise ValueError(f"Panel not found: {params.panel_id}")
+
+    targets = [target for target in panel.get("targets") or [] if not target.get("hide")]
+    if not targets:
+        raise ValueError(f"Panel {params.panel_id} has no queries")
+
+    default_time = dashboard.get("time") or {}
+    from_time = params.from_time or default_time.get("from", "now-6h")
+    to_time = params.to_time or default_time.get("to", "now")
+    variables = _variable_values(dashboard, params.variables)
+    interval_ms = _interval_ms(from_time, to_time, params.max_points)
+
+    panel_datasource = panel.get("datasource")
+    if isinstance(panel_datasource, dict) and panel_datasource.get("uid") == _MIXED_DATASOURCE:
+        panel_datasource = None
+
+    queries = []
+    for index, target in enumerate(targets):
+        query = _interpolate(target, variables)
+        query["datasource"] = await _resolve_datasource(
+            client, target.get("datasource") or panel_datasource, variables
+        )
+        query["refId"] = target.get("refId") or chr(ord("A") + index)
+        query["intervalMs"] = interval_ms
+        query["maxDataPoints"] = params.max_points
+        queries.append(query)
+
+    await report_progress(1, 3, f"Querying {len(queries)} queries")
+    response = await client.query_datasources(queries, from_time, to_time)
+    await report_progress(2, 3, "Decoding frames")
+
+    def decode() -> Dict[str, Any]:
+        frames, errors = decode_results(response if isinstance(response, dict) else {})
+        return {
+            "frames": [downsample(frame, params.max_points, params.downsample).to_dict() for frame in frames],
+            "errors": errors
+        }
+
+    # 큰 응답의 디코딩과 다운샘플링이 이벤트 루프를 막지 않도록 스레드에서 실행
+    decoded = await asyncio.to_thread(decode)
+    await report_progress(3, 3, f"Decoded {len(decoded['frames'])} frames")
+
+    return {
+        "dashboard_uid": params.dashboard_uid,
+        "panel_id": params.panel_id,
+        "title": panel.get("title", ""),
+        "from_time": from_time,
+        "to_time": to_time,
+        **decoded,
+        "partial": bool(decoded["errors"])
+    }
+
+def add_tools(server: GrafanaMCPServer):
+    """서버에 쿼리 관련 도구 추가"""
+    # 패널 데이터 쿼리 도구
+    query_tool = create_tool(
+        name="query_panel_data",
+        description="Grafana 패널의 쿼리를 실행해 데이터를 열 단위로 조회 (큰 시계열은 max_points 이하로 다운샘플링)",
+        handler=query_panel_data
+    )
+    
+    # 도구 등록
+    server.add_tool(query_tool.to_mcp_tool(), query_tool.handle)
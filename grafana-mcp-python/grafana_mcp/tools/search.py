@@ -1,39 +1,193 @@
 """
 대시보드 검색 도구
 """
-from typing import Dict, Any, List, Optional
+import json
+import base64
+import hashlib
+from typing import Dict, Any, List, Literal, Optional, Tuple
 from pydantic import BaseModel, Field
 from ..context import grafana_context
 from ..server import GrafanaMCPServer
 from .base import create_tool
 
+# 최대 페이지 크기
+MAX_PAGE_SIZE = 5000
+
 class SearchDashboardsParams(BaseModel):
     """대시보드 검색 매개변수"""
     query: Optional[str] = Field(None, description="검색 쿼리 텍스트")
     tags: Optional[List[str]] = Field(None, description="필터링할 태그 목록")
     folder_ids: Optional[List[int]] = Field(None, description="필터링할 폴더 ID 목록")
     limit: int = Field(100, description="반환할 결과 수 제한 (기본값: 100)")
+    folder_uids: Optional[List[str]] = Field(None, description="필터링할 폴더 UID 목록 (로컬 색인 전용)")
+    datasource: Optional[str] = Field(
+        None, description="이 데이터소스(UID, 이름 또는 타입)를 사용하는 대시보드만 검색 (로컬 색인 전용)"
+    )
+    mode: Literal["auto", "index", "api"] = Field(
+        "auto", description="검색 방식 (auto: 로컬 색인이 준비되었으면 색인, 아니면 Grafana API / index / api)"
+    )
+    page_size: Optional[int] = Field(
+        None, ge=1, le=MAX_PAGE_SIZE, description="페이지 크기 (지정하면 {items, next_cursor} 형식으로 페이지 단위 반환)"
+    )
+    cursor: Optional[str] = Field(None, description="이전 응답의 next_cursor (다음 페이지 조회)")
+
+def _format_hit(dash: Dict[str, Any]) -> Dict[str, Any]:
+    """Grafana 검색 결과 항목을 도구 결과 형식으로 변환합니다."""
+    return {
+        "uid": dash.get("uid", ""),
+        "title": dash.get("title", ""),
+        "url": dash.get("url", ""),
+        "type": dash.get("type", ""),
+        "tags": dash.get("tags", []),
+        "folder_title": dash.get("folderTitle", ""),
+        "folder_uid": dash.get("folderUid", ""),
+        "is_starred": dash.get("isStarred", False)
+    }
+
+def _fingerprint(params: SearchDashboardsParams) -> str:
+    """커서가 같은 검색 조건에서만 쓰이도록 조건을 요약합니다."""
+    conditions = [params.query, params.tags, params.folder_ids, params.folder_uids, params.datasource]
+    return hashlib.sha1(json.dumps(conditions, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+def _encode_cursor(mode: str, page: int, page_size: int, fingerprint: str,
+                   after: Optional[Tuple[float, str, str]] = None) -> str:
+    cursor = {"m": mode, "p": page, "s": page_size, "f": fingerprint}
+    if after is not None:
+        cursor["k"] = list(after)
+    data = json.dumps(cursor, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str, fingerprint: str) -> Tuple[str, int, int, Optional[Tuple[float, str, str]]]:
+    """커서를 (검색 방식, 페이지, 페이지 크기, 색인 검색을 이어갈 정렬 키)로 해석합니다."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        mode, page, page_size = data["m"], int(data["p"]), int(data["s"])
+        after = data.get("k")
+        if after is not None:
+            score, title, uid = after
+            after = (float(score), str(title), str(uid))
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if mode not in ("index", "api") or page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError("Invalid cursor")
+    if mode == "index" and after is None:
+        raise ValueError("Invalid cursor")
+    if data.get("f") != fingerprint:
+        raise ValueError("Cursor does not match the search conditions")
+    return mode, page, page_size, after
+
+async def _datasource_aliases(client, datasource: str) -> List[str]:
+    """데이터소스 이름과 UID를 모두 필터 값으로 사용할 수 있게 합니다."""
+    aliases = [datasource]
+    try:
+        for item in await client.list_datasources():
+            if datasource in (item.get("uid"), item.get("name")):
+                aliases.extend(value for value in (item.get("uid"), item.get("name")) if value)
+    except Exception:
+        pass
+    return aliases
+
+async def _search_index(client, params: SearchDashboardsParams, limit: int,
+                        after: Optional[Tuple[float, str, str]] = None) -> List[Tuple[Any, Optional[float]]]:
+    """로컬 색인으로 검색합니다 (패널 제목과 쿼리 식까지 검색, 점수순)."""
+    datasources = await _datasource_aliases(client, params.datasource) if params.datasource else None
+    return grafana_context.index.search(
+        query=params.query,
+        tags=params.tags,
+        folder_ids=params.folder_ids,
+        folder_uids=params.folder_uids,
+        datasources=datasources,
+        limit=limit,
+        after=after
+    )
+
+def _search_mode(params: SearchDashboardsParams) -> str:
+    """요청과 색인 상태로 실제 검색 방식(index 또는 api)을 정합니다."""
+    index = grafana_context.index
+    if params.mode == "index" and index is None:
+        raise ValueError("Search index is not enabled (start the server with --search-index)")
+    if params.mode == "index" and not index.ready.is_set():
+        raise ValueError("Search index is still being built")
+    if params.mode != "api" and index is not None and index.ready.is_set():
+        return "index"
+    if params.datasource or params.folder_uids:
+        raise ValueError("datasource and folder_uids filters require the search index")
+    return "api"
 
-def search_dashboards(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+async def _search_page(client, params: SearchDashboardsParams) -> Dict[str, Any]:
+    """
+    검색 결과의 한 페이지와 다음 페이지 커서를 반환합니다.
+
+    첫 페이지에서 정한 검색 방식과 페이지 크기를 커서에 담아, 중간에 색인이 준비되어도
+    같은 방식으로 끝까지 순회합니다.
+
+    색인 검색의 커서는 마지막 결과의 정렬 키를 담아 그 뒤부터 이어가므로(keyset), 페이지 사이에
+    색인이 갱신되어도 같은 대시보드가 두 번 나오지 않습니다. 다만 갱신으로 점수나 제목이 바뀐
+    대시보드는 정렬 위치가 달라져 이미 지난 위치로 옮겨 가면 나오지 않을 수 있습니다.
+    """
+    fingerprint = _fingerprint(params)
+    after = None
+    if params.cursor:
+        mode, page, page_size, after = _decode_cursor(params.cursor, fingerprint)
+    else:
+        mode, page, page_size = _search_mode(params), 1, params.page_size
+
+    if mode == "index":
+        if grafana_context.index is None:
+            raise ValueError("Search index is not enabled (start the server with --search-index)")
+        # 다음 페이지가 있는지 알기 위해 한 개 더 가져옵니다
+        results = await _search_index(client, params, page_size + 1, after)
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        items = [entry.to_result(score) for entry, score in results]
+        after = grafana_context.index.rank_key(*results[-1]) if results else None
+    else:
+        hits = await client.search_dashboards_page(
+            query=params.query,
+            tags=params.tags,
+            folder_ids=params.folder_ids,
+            page=page,
+            page_size=page_size
+        )
+        items = [_format_hit(dash) for dash in hits]
+        # Grafana는 전체 개수를 알려주지 않으므로 꽉 찬 페이지면 다음 페이지가 있다고 봅니다
+        has_more = len(hits) >= page_size
+        after = None
+
+    return {
+        "items": items,
+        "next_cursor": _encode_cursor(mode, page + 1, page_size, fingerprint, after) if has_more else None
+    }
+
+async def search_dashboards(params: SearchDashboardsParams) -> Any:
     """
     대시보드 검색 도구
     
+    `page_size`나 `cursor`를 주면 `{"items": [...], "next_cursor": ...}` 형식으로 한 페이지씩
+    반환하고, 없으면 `limit`개까지의 목록을 반환합니다.
+    
     Arguments:
         params: 검색 매개변수
         
     Returns:
-        검색된 대시보드 목록
+        검색된 대시보드 목록 또는 페이지
     """
     client = grafana_context.client
     if not client:
         raise ValueError("Grafana client is not initialized")
     
-    query = params.get("query")
-    tags = params.get("tags")
-    folder_ids = params.get("folder_ids")
-    limit = params.get("limit", 100)
+    if params.cursor or params.page_size:
+        return await _search_page(client, params)
+    
+    if _search_mode(params) == "index":
+        return [entry.to_result(score) for entry, score in await _search_index(client, params, params.limit)]
     
-    results = client.search_dashboards(
+    query = params.query
+    tags = params.tags
+    folder_ids = params.folder_ids
+    limit = params.limit
+    
+    results = await client.search_dashboards(
         query=query,
         tags=tags,
         folder_ids=folder_ids,
@@ -41,20 +195,7 @@ def search_dashboards(params: Dict[str, Any]) -> List[Dict[str, Any]]:
     )
     
     # 결과 정리 및 변환
-    formatted_results = []
-    for dash in results:
-        formatted_results.append({
-            "uid": dash.get("uid", ""),
-            "title": dash.get("title", ""),
-            "url": dash.get("url", ""),
-            "type": dash.get("type", ""),
-            "tags": dash.get("tags", []),
-            "folder_title": dash.get("folderTitle", ""),
-            "folder_uid": dash.get("folderUid", ""),
-            "is_starred": dash.get("isStarred", False)
-        })
-    
-    return formatted_results
+    return [_format_hit(dash) for dash in results]
 
 def add_tools(server: GrafanaMCPServer):
     """서버에 검색 도구 추가"""
@@ -0,0 +1,401 @@
+"""
+요청 단위 추적(span)과 느린 호출 프로파일링
+
+`--trace-file`을 지정하면 요청 하나를 루트 span으로 두고 디스패치, 인자 검증, 도구 실행,
+Grafana 요청, Base64 인코딩, 직렬화, 출력 쓰기를 하위 span으로 기록합니다. 트레이스 하나가
+끝날 때마다 OTLP/JSON(`ExportTraceServiceRequest`) 한 줄을 파일에 덧붙이므로
+OpenTelemetry Collector의 `otlpjsonfile` 수신기나 다른 OTLP 도구로 그대로 읽을 수 있습니다.
+
+`--profile-slow-calls`를 지정하면 도구 호출이 진행되는 동안 이벤트 루프를 일정 간격으로
+표본 추출하고, 호출이 임계값보다 오래 걸렸을 때만 스택 프로파일을 folded 형식
+(`flamegraph.pl`, speedscope 호환) 파일로 남깁니다.
+
+추적이 꺼져 있으면 `span`은 미리 만든 빈 컨텍스트 관리자를 반환하므로 비용이 거의 없습니다.
+"""
+import os
+import sys
+import time
+import queue
+import atexit
+import random
+import asyncio
+import logging
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from . import codec
+
+logger = logging.getLogger("mcp-tracing")
+
+# OTLP span 종류
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP 상태 코드
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+DEFAULT_PROFILE_INTERVAL = 0.005
+
+_current: ContextVar[Optional["Span"]] = ContextVar("mcp_current_span", default=None)
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    """OTLP/JSON 속성 한 개"""
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+class Span:
+    """진행 중이거나 끝난 span 한 개"""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "error", "trace", "_token")
+
+    def __init__(self, name: str, kind: int, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.span_id = os.urandom(8).hex()
+        if parent is None:
+            self.trace_id = os.urandom(16).hex()
+            self.parent_id = ""
+            # 루트 span이 트레이스에 속한 span을 모아 두었다가 끝날 때 한꺼번에 내보냅니다
+            self.trace: List["Span"] = []
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.trace = parent.trace
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        """속성을 추가합니다."""
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc is not None and not isinstance(exc, (asyncio.CancelledError, GeneratorExit)):
+            self.error = f"{exc_type.__name__}: {exc}"
+        elif isinstance(exc, asyncio.CancelledError):
+            self.error = "cancelled"
+        _current.reset(self._token)
+        self.trace.append(self)
+        if not self.parent_id and _exporter is not None:
+            _exporter.export(self.trace)
+        return False
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(key, value) for key, value in self.attributes.items() if value is not None],
+            "status": {"code": _STATUS_ERROR, "message": self.error} if self.error else {"code": _STATUS_OK}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class _NoopSpan:
+    """추적하지 않을 때 쓰는 빈 컨텍스트 관리자 (`as` 값은 None)"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopSpan()
+
+class OTLPFileExporter:
+    """끝난 트레이스를 OTLP/JSON 한 줄씩 파일에 덧붙입니다 (쓰기는 별도 스레드)."""
+
+    def __init__(self, path: str, service_name: str = "grafana-mcp"):
+        """
+        Args:
+            path: 출력 파일 경로 (여러 프로세스가 같은 파일에 덧붙여도 줄 단위로 섞이지 않음)
+            service_name: 리소스의 `service.name`
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._resource = {"attributes": [
+            _attribute("service.name", service_name),
+            _attribute("process.pid", os.getpid())
+        ]}
+        self._queue: "queue.SimpleQueue[Optional[List[Span]]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="mcp-trace-writer", daemon=True)
+        self._thread.start()
+        self.traces = 0
+        self.spans = 0
+        self.errors = 0
+
+    def export(self, trace: List[Span]):
+        """트레이스 하나를 쓰기 대기열에 넣습니다."""
+        self._queue.put(trace)
+
+    def _encode(self, trace: List[Span]) -> bytes:
+        return codec.dumps({"resourceSpans": [{
+            "resource": self._resource,
+            "scopeSpans": [{
+                "scope": {"name": "grafana_mcp"},
+                "spans": [span.to_otlp() for span in trace]
+            }]
+        }]}) + b"\n"
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                return
+            try:
+                # 줄 하나를 write 한 번으로 써서 O_APPEND로 다른 프로세스와 섞이지 않게 합니다
+                os.write(self._fd, self._encode(trace))
+                self.traces += 1
+                self.spans += len(trace)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Failed to write trace: {e}")
+
+    def close(self):
+        """대기 중인 트레이스를 모두 쓰고 파일을 닫습니다."""
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        os.close(self._fd)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "traces": self.traces, "spans": self.spans, "errors": self.errors}
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+def _thread_stack(frame) -> List[str]:
+    """실행 중인 스레드 프레임의 스택 (바깥쪽부터)"""
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+def _await_stack(task: asyncio.Task) -> List[str]:
+    """멈춰 있는 태스크가 기다리는 await 체인 (바깥쪽부터)"""
+    stack = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "ag_frame", None)
+        if frame is None:
+            # 코루틴이 아닌 Future 등에서 끝남
+            stack.append(f"<await {type(awaitable).__name__}>")
+            break
+        stack.append(_frame_label(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "ag_await", None)
+    return stack
+
+class _CallProfile:
+    __slots__ = ("name", "task", "samples")
+
+    def __init__(self, name: str, task: Optional[asyncio.Task]):
+        self.name = name
+        self.task = task
+        self.samples: Counter = Counter()
+
+class SlowCallProfiler:
+    """
+    도구 호출을 표본 추출해 느린 호출의 스택 프로파일만 남기는 프로파일러
+
+    표본마다 호출의 태스크가 이벤트 루프에서 실행 중이면 루프 스레드의 스택(`[running]`)을,
+    기다리는 중이면 태스크의 await 체인(`[waiting]`)을 기록합니다. 도구가 따로 만든 하위
+    태스크와 스레드(동기 핸들러)는 기다리는 위치까지만 보입니다.
+    """
+
+    def __init__(self, threshold: float, directory: str, interval: float = DEFAULT_PROFILE_INTERVAL):
+        """
+        Args:
+            threshold: 프로파일을 남길 최소 호출 시간 (초)
+            directory: 프로파일 파일을 쓸 디렉터리
+            interval: 표본 추출 간격 (초)
+        """
+        self.threshold = threshold
+        self.directory = directory
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+        self._active: Dict[int, _CallProfile] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self.profiled = 0
+        self.written = 0
+
+    def begin(self, name: str) -> _CallProfile:
+        """현재 태스크에서 시작하는 호출의 표본 추출을 시작합니다."""
+        if self._thread is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread = threading.get_ident()
+            self._thread = threading.Thread(target=self._run, name="mcp-profiler", daemon=True)
+            self._thread.start()
+        profile = _CallProfile(name, asyncio.current_task())
+        self._active[id(profile)] = profile
+        self._wake.set()
+        return profile
+
+    def end(self, profile: _CallProfile, duration: float, trace_id: Optional[str] = None) -> Optional[str]:
+        """
+        호출의 표본 추출을 끝내고, 느린 호출이면 프로파일을 파일로 씁니다.
+
+        Returns:
+            프로파일 파일 경로 (남기지 않았으면 None)
+        """
+        self._active.pop(id(profile), None)
+        self.profiled += 1
+        if duration < self.threshold or not profile.samples:
+            return None
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{profile.name}-{trace_id[:8] if trace_id else os.getpid()}.folded"
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in profile.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            logger.warning(f"Failed to write profile {path}: {e}")
+            return None
+        self.written += 1
+        logger.info(f"Slow call {profile.name} took {duration * 1000:.0f}ms, profile written to {path}")
+        return path
+
+    def _sample(self):
+        try:
+            running = asyncio.current_task(self._loop)
+        except RuntimeError:
+            running = None
+        loop_frame = sys._current_frames().get(self._loop_thread)
+        for profile in list(self._active.values()):
+            try:
+                if profile.task is not None and profile.task is running and loop_frame is not None:
+                    stack = ["[running]"] + _thread_stack(loop_frame)
+                elif profile.task is not None:
+                    stack = ["[waiting]"] + _await_stack(profile.task)
+                else:
+                    continue
+            except Exception:
+                # 다른 스레드가 실행 중인 스택을 읽으므로 중간에 바뀌면 그 표본은 버립니다
+                continue
+            profile.samples[";".join(stack)] += 1
+
+    def _run(self):
+        while not self._stopped:
+            if not self._active:
+                self._wake.clear()
+                self._wake.wait()
+                continue
+            time.sleep(self.interval)
+            self._sample()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "directory": self.directory,
+            "calls_sampled": self.profiled,
+            "profiles_written": self.written
+        }
+
+_exporter: Optional[OTLPFileExporter] = None
+_sample_rate = 1.0
+profiler: Optional[SlowCallProfiler] = None
+
+def configure(trace_file: Optional[str] = None, sample_rate: float = 1.0,
+              profile_threshold: float = 0.0, profile_dir: Optional[str] = None,
+              profile_interval: float = DEFAULT_PROFILE_INTERVAL):
+    """
+    추적과 느린 호출 프로파일링을 설정합니다.
+
+    Args:
+        trace_file: OTLP/JSON 출력 파일 (None이면 추적하지 않음)
+        sample_rate: 추적할 요청의 비율 (0~1)
+        profile_threshold: 프로파일을 남길 최소 도구 호출 시간 (초, 0이면 프로파일링하지 않음)
+        profile_dir: 프로파일 파일 디렉터리
+        profile_interval: 프로파일 표본 추출 간격 (초)
+    """
+    global _exporter, _sample_rate, profiler
+    shutdown()
+    _sample_rate = sample_rate
+    if trace_file:
+        _exporter = OTLPFileExporter(trace_file)
+        logger.info(f"Writing OTLP/JSON traces to {trace_file}")
+    if profile_threshold > 0 and profile_dir:
+        profiler = SlowCallProfiler(profile_threshold, profile_dir, profile_interval)
+    if _exporter is not None or profiler is not None:
+        atexit.register(shutdown)
+
+def shutdown():
+    """남은 트레이스를 쓰고 추적과 프로파일러를 끕니다."""
+    global _exporter, profiler
+    if _exporter is not None:
+        _exporter.close()
+        _exporter = None
+    if profiler is not None:
+        profiler.stop()
+        profiler = None
+
+def enabled() -> bool:
+    """추적이 켜져 있는지 여부"""
+    return _exporter is not None
+
+def current_span() -> Optional[Span]:
+    """현재 span (추적 중이 아니면 None)"""
+    return _current.get()
+
+def trace(name: str, kind: int = SPAN_KIND_SERVER, **attributes: Any):
+    """
+    요청 하나의 루트 span을 시작합니다 (표본 비율에 따라 추적하지 않을 수 있음).
+
+    이미 추적 중인 요청 안(예: 배치의 요청)에서 부르면 하위 span이 됩니다.
+    """
+    if _exporter is None:
+        return _NOOP
+    parent = _current.get()
+    if parent is None and _sample_rate < 1.0 and random.random() >= _sample_rate:
+        return _NOOP
+    return Span(name, kind, parent, attributes)
+
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any):
+    """추적 중인 요청 안에서 하위 span을 시작합니다 (추적 중이 아니면 아무것도 하지 않음)."""
+    parent = _current.get()
+    if parent is None:
+        return _NOOP
+    return Span(name, kind, parent, attributes)
+
+def stats() -> Dict[str, Any]:
+    """추적/프로파일러 통계"""
+    return {
+        "enabled": _exporter is not None,
+        "sample_rate": _sample_rate,
+        "exporter": _exporter.stats() if _exporter is not None else None,
+        "profiler": profiler.stats() if profiler is not None else None
+    }
@@ -0,0 +1,284 @@
+"""
+시작 시 Grafana 연결과 자주 쓰는 대시보드 미리 준비
+
+서버가 뜬 직후 첫 `get_dashboard_by_uid`나 렌더링은 TCP/TLS 연결부터 맺어야 해서 항상 느립니다.
+`Warmup`은 백그라운드 태스크로 연결 풀에 연결을 미리 열고, 지정한 UID/태그의 대시보드나
+최근에 많이 본 대시보드를 응답 캐시에 넣고, 원하면 앞쪽 패널을 미리 렌더링해 이미지 캐시에
+넣어 둡니다. 요청 처리는 기다리지 않고 바로 시작합니다.
+
+최근에 본 대시보드는 `RecentDashboards`가 Grafana URL별로 기록해 두었다가 종료할 때 파일로
+저장하고, 다음 시작 때 불러와 준비 대상으로 씁니다.
+"""
+import os
+import time
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import codec
+from .panels import list_panels
+
+logger = logging.getLogger("grafana-warmup")
+
+DEFAULT_WARMUP_CONCURRENCY = 4
+# 기록해 둘 최근 대시보드 수 (Grafana URL별)
+DEFAULT_RECENT_MAX_ENTRIES = 200
+
+# 준비 작업이 보내는 요청은 최근 접근 기록에 남기지 않습니다
+_warming: ContextVar[bool] = ContextVar("grafana_warming", default=False)
+
+class RecentDashboards:
+    """
+    최근에 조회한 대시보드 기록
+
+    UID별 마지막 조회 시각과 조회 수를 메모리에 두고 `save`에서 파일에 합쳐 씁니다. 여러 워커가
+    같은 파일을 쓰더라도 저장할 때마다 파일의 기록과 합치므로 서로의 기록을 지우지 않습니다.
+    """
+
+    def __init__(self, path: Optional[str], base_url: str, max_entries: int = DEFAULT_RECENT_MAX_ENTRIES):
+        """
+        Args:
+            path: 기록 파일 경로 (None이면 저장하지 않음)
+            base_url: 기록을 구분할 Grafana URL
+            max_entries: 유지할 최대 대시보드 수
+        """
+        self.path = path
+        self.base_url = base_url.rstrip("/")
+        self.max_entries = max_entries
+        self._entries: Dict[str, List[float]] = {}
+        self._dirty = False
+        self.load()
+
+    def _read(self) -> Dict[str, Any]:
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, "rb") as f:
+                data = codec.loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot read recent dashboards from {self.path}: {e}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def load(self):
+        """파일에서 이 Grafana URL의 기록을 불러옵니다."""
+        entries = self._read().get(self.base_url)
+        if isinstance(entries, dict):
+            for uid, value in entries.items():
+                if isinstance(value, list) and len(value) == 2:
+                    self._merge(uid, float(value[0]), int(value[1]))
+
+    def _merge(self, uid: str, last_access: float, hits: int):
+        current = self._entries.get(uid)
+        if current is None:
+            self._entries[uid] = [last_access, hits]
+        else:
+            current[0] = max(current[0], last_access)
+            current[1] = max(current[1], hits)
+
+    def record(self, uid: str):
+        """대시보드 조회를 기록합니다 (준비 작업 중의 조회는 제외)."""
+        if _warming.get():
+            return
+        entry = self._entries.get(uid)
+        if entry is None:
+            self._entries[uid] = [time.time(), 1]
+        else:
+            entry[0] = time.time()
+            entry[1] += 1
+        self._dirty = True
+
+    def top(self, limit: int) -> List[str]:
+        """최근에 조회한 순서대로 대시보드 UID를 반환합니다."""
+        ranked = sorted(self._entries.items(), key=lambda item: item[1][0], reverse=True)
+        return [uid for uid, _ in ranked[:limit]]
+
+    def save(self):
+        """변경된 기록을 파일의 기록과 합쳐 저장합니다."""
+        if self.path is None or not self._dirty:
+            return
+        data = self._read()
+        stored = data.get(self.base_url)
+        if isinstance(stored, dict):
+            for uid, value in stored.items():
+                if isinstance(value, list) and len(value) == 2:
+                    self._merge(uid, float(value[0]), int(value[1]))
+        data[self.base_url] = {uid: self._entries[uid] for uid in self.top(self.max_entries)}
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(codec.dumps(data))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Cannot save recent dashboards to {self.path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class Warmup:
+    """
+    시작 시 연결 풀과 캐시를 미리 채우는 백그라운드 작업
+
+    순서는 연결 열기 → 대상 대시보드 결정 → 대시보드 가져오기 → 앞쪽 패널 렌더링입니다.
+    각 단계의 실패는 기록만 하고 다음 대상으로 넘어가며, 요청은 일반 요청과 같은 속도/동시성
+    제한을 거칩니다.
+    """
+
+    def __init__(self, dashboard_uids: Sequence[str] = (), tags: Sequence[str] = (),
+                 recent: int = 0, connections: int = 0, render_panels: int = 0,
+                 concurrency: int = DEFAULT_WARMUP_CONCURRENCY,
+                 recent_dashboards: Optional[RecentDashboards] = None):
+        """
+        Args:
+            dashboard_uids: 미리 가져올 대시보드 UID
+            tags: 이 태그가 붙은 대시보드를 미리 가져옴
+            recent: 최근에 조회한 대시보드 중 미리 가져올 수
+            connections: 미리 열어 둘 연결 수
+            render_panels: 대시보드마다 미리 렌더링할 앞쪽 패널 수 (0이면 렌더링하지 않음)
+            concurrency: 동시에 준비할 대시보드/패널 수
+            recent_dashboards: 최근 조회 기록
+        """
+        self.dashboard_uids = list(dashboard_uids)
+        self.tags = list(tags)
+        self.recent = recent
+        self.connections = connections
+        self.render_panels = render_panels
+        self.concurrency = max(1, concurrency)
+        self.recent_dashboards = recent_dashboards
+        self._task: Optional[asyncio.Task] = None
+        self.state = "idle"
+        self.opened_connections = 0
+        self.dashboards = 0
+        self.rendered_panels = 0
+        self.failures = 0
+        self.seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """할 일이 있는지 여부"""
+        return bool(self.connections or self.dashboard_uids or self.tags or self.recent)
+
+    async def _open_connections(self, client):
+        """가벼운 요청을 동시에 보내 연결 풀에 연결을 엽니다 (HTTP/2면 연결 하나에 합쳐짐)."""
+        async def ping():
+            try:
+                await client.request("GET", "/api/health", coalesce=False)
+                return True
+            except Exception as e:
+                logger.warning(f"Warm-up connection to Grafana failed: {e}")
+                return False
+
+        results = await asyncio.gather(*(ping() for _ in range(self.connections)))
+        self.opened_connections = sum(results)
+        self.failures += len(results) - self.opened_connections
+
+    async def _targets(self, client) -> List[str]:
+        """준비할 대시보드 UID (지정한 UID → 태그 → 최근 조회 순, 중복 제거)"""
+        uids = list(self.dashboard_uids)
+        for tag in self.tags:
+            try:
+                async for hit in client.iter_dashboards(tags=[tag]):
+                    if hit.get("uid"):
+                        uids.append(hit["uid"])
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Warm-up search for tag '{tag}' failed: {e}")
+        if self.recent and self.recent_dashboards is not None:
+            uids.extend(self.recent_dashboards.top(self.recent))
+        return list(dict.fromkeys(uids))
+
+    async def _prepare(self, client, uid: str, render_options: Dict[str, Any], slots: asyncio.Semaphore):
+        async with slots:
+            try:
+                data = await client.get_dashboard_by_uid(uid)
+                self.dashboards += 1
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Warm-up fetch of dashboard {uid} failed: {e}")
+                return
+        if self.render_panels <= 0:
+            return
+
+        # 도구 기본값(1000x500, light, PNG, 대시보드 기본 시간 범위)과 같은 캐시 키로 렌더링합니다
+        # (rendering이 client를 불러오고 client가 이 모듈을 불러오므로 여기서 불러옵니다)
+        from .rendering import render_image
+        dashboard = data.get("dashboard", {}) if isinstance(data, dict) else {}
+        for panel in list_panels(dashboard)[:self.render_panels]:
+            async with slots:
+                try:
+                    await render_image(client, dashboard_uid=uid, panel_id=panel["id"], **render_options)
+                    self.rendered_panels += 1
+                except Exception as e:
+                    self.failures += 1
+                    logger.warning(f"Warm-up render of dashboard {uid} panel {panel['id']} failed: {e}")
+
+    async def run(self, client, render_options: Dict[str, Any]):
+        """
+        준비 작업을 한 번 실행합니다.
+
+        Args:
+            client: Grafana 클라이언트
+            render_options: `render_image`에 넘길 저장소 관련 인자
+        """
+        token = _warming.set(True)
+        started = time.monotonic()
+        self.state = "running"
+        try:
+            if self.connections > 0:
+                await self._open_connections(client)
+
+            uids = await self._targets(client)
+            if self.render_panels > 0 and not render_options.get("use_cache"):
+                # 이미지 캐시가 없으면 렌더링 결과가 남지 않습니다
+                logger.info("Image cache is disabled, skipping warm-up renders")
+                self.render_panels = 0
+            slots = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(*(self._prepare(client, uid, render_options, slots) for uid in uids))
+            self.state = "done"
+        except asyncio.CancelledError:
+            self.state = "cancelled"
+            raise
+        except Exception as e:
+            self.state = "failed"
+            logger.warning(f"Warm-up failed: {e}")
+        finally:
+            self.seconds = time.monotonic() - started
+            _warming.reset(token)
+        logger.info(
+            f"Warm-up finished in {self.seconds:.1f}s: {self.opened_connections} connections, "
+            f"{self.dashboards} dashboards, {self.rendered_panels} panels, {self.failures} failures"
+        )
+
+    def start(self, client, render_options: Dict[str, Any]):
+        """백그라운드 준비 태스크를 시작합니다 (실행 중인 이벤트 루프 필요)."""
+        if self.enabled and self._task is None:
+            self.state = "running"
+            self._task = asyncio.get_running_loop().create_task(self.run(client, render_options))
+
+    async def stop(self):
+        """진행 중인 준비 작업을 중지합니다."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """준비 작업 통계"""
+        return {
+            "state": self.state,
+            "connections": self.opened_connections,
+            "dashboards": self.dashboards,
+            "rendered_panels": self.rendered_panels,
+            "failures": self.failures,
+            "seconds": round(self.seconds, 3),
+            "recent_dashboards": len(self.recent_dashboards) if self.recent_dashboards is not None else 0
+        }